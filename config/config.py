@@ -1,4 +1,5 @@
 import logging
+import threading
 import json
 
 from pathlib import Path
@@ -13,10 +14,146 @@ class Config():
     transportation: dict[str, list[str]] = field(default_factory=dict)
     submission: dict[str, list[str]] = field(default_factory=dict)
     dispatch: dict[str, list[str]] = field(default_factory=dict)
-    inbound: dict[str, list[str]] = field(default_factory=dict)
-    outbound: dict[str, list[str]] = field(default_factory=dict)
+    inventory: dict[str, any] = field(default_factory=dict)
     
     datapath: str = field(default='./data')
+    discovery: dict[str, any] = field(default_factory=lambda: {
+        "patterns": ["*淘天平台线路时效分析*.xlsx", "*线路达成率*.xlsx", "*线路罚款*.csv", "*超时库存*.xlsx"],
+        "reference": ["./config/城市对应中心基础表1119.xlsx"],
+        "labels": {
+            "gpt": ["各环节延误量", "城市线路汇总-日"],
+            "routing": ["未达成车签明细", "线路罚款"],
+            "transportation": ["未达成车签明细", "线路罚款"],
+            "center": ["进港", "出港", "城市对应中心"],
+            "submission": ["交件"],
+            "dispatch": ["派签"]
+        },
+        "manifest": ".manifest.json",
+        "digest": True
+    })
+    scheduler: dict[str, any] = field(default_factory=lambda: {
+        "workers": 4
+    })
+    backfill: dict[str, any] = field(default_factory=lambda: {
+        "workers": 2
+    })
+    watch: dict[str, any] = field(default_factory=lambda: {
+        "interval": 10,
+        "settle": 2
+    })
+    backend: dict[str, any] = field(default_factory=lambda: {
+        "engine": "pandas",
+        "threads": None,
+        "memory_limit": None,
+        "temp_directory": ".duckdb"
+    })
+    prefetch: dict[str, any] = field(default_factory=lambda: {
+        "enabled": False,
+        "workers": 4
+    })
+    reader: dict[str, any] = field(default_factory=lambda: {
+        "engine": "auto",
+        "chunk_size": 50000,
+        "csv": {
+            "engine": "c",
+            "chunksize": None,
+            "dtype": {}
+        }
+    })
+    schema: dict[str, any] = field(default_factory=lambda: {
+        "strict": False,
+        "columns": {
+            "车签": "string",
+            "电子车签": "string",
+            "线路名称": "string",
+            "车型": "category",
+            "事件类型": "category",
+            "始发影响清场": "category",
+            "是否路由频次延误": "category",
+            "是否干线运输延误": "category",
+            "最晚发车时间": {"type": "datetime", "format": "mixed"},
+            "未达成量": "int32",
+            "揽收城市": "string",
+            "签收城市": "string",
+            "标准": "category",
+            "达成率(%)": "percent",
+            "与第一差值(%)": "percent",
+            "影响量": "int32",
+            "延误量最大3环节": "string",
+            "线路未达成量": "int32",
+            "路由延误量": "int32",
+            "网点交件延误量": "int32",
+            "中心出港操作延误量": "int32",
+            "干线运输延误量": "int32",
+            "中心进港操作延误量": "int32",
+            "网点派签延误量": "int32",
+            "责任网点": "string",
+            "交件延误量": "int32",
+            "延误量": "int32",
+            "城市": "string",
+            "揽收城市名称": "string",
+            "进港超时库存": "int32",
+            "出港超时库存": "int32",
+            "清场超时库存票数": "int32",
+            "清场超时库存占比": "percent",
+            "发车超时库存票数": "int32",
+            "超时库存占比": "percent"
+        }
+    })
+    cache: dict[str, any] = field(default_factory=lambda: {
+        "enabled": True,
+        "rebuild": False,
+        "dir": ".cache",
+        "max_age_days": 7,
+        "max_size_mb": 1024
+    })
+    history: dict[str, any] = field(default_factory=lambda: {
+        "enabled": True,
+        "dir": ".history",
+        "skip_existing": True,
+        "inputs": True
+    })
+    memo: dict[str, any] = field(default_factory=lambda: {
+        "enabled": True,
+        "dir": ".memo",
+        "max_size_mb": 256
+    })
+    run_report: dict[str, any] = field(default_factory=lambda: {
+        "enabled": True,
+        "dir": ".runs",
+        "keep": 90
+    })
+    lookup: dict[str, any] = field(default_factory=lambda: {
+        "duplicates": "first"
+    })
+    top_n: dict[str, int] = field(default_factory=lambda: {
+        "submission": 5,
+        "dispatch": 5
+    })
+    thresholds: dict[str, float] = field(default_factory=lambda: {
+        "路由占比": 0.05,
+        "干线运输占比": 0.05,
+        "中心进港操作占比": 0.05,
+        "中心出港操作占比": 0.05,
+        "网点交件占比": 0.05
+    })
+    categories: dict[str, list[str]] = field(default_factory=lambda: {
+        "route": ["城市线路名称", "城市线路", "城市到城市线路名称"],
+        "center": ["责任中心", "发货中心", "车签始发中心", "车签目的中心", "中心名称", "责任中心名称"]
+    })
+    writer: dict[str, any] = field(default_factory=lambda: {
+        "date_format": "yyyy-mm-dd hh:mm:ss",
+        "header_format": {"bold": True, "border": 1, "align": "center", "valign": "top"},
+        "width_sample_rows": 100,
+        "max_width": 50,
+        "chunk_rows": 10000,
+        "num_formats": {
+            "占比": "0.00%",
+            "达成率(%)": "0.00\"%\"",
+            "与第一差值(%)": "0.00\"%\"",
+            "库存比例": "0.00\"%\""
+        }
+    })
     log_config: dict[str, any] = field(default_factory=lambda: {
         "log_file": "./logs/app.log",
         "level": "INFO",
@@ -24,6 +161,28 @@ class Config():
         "backup_count": 10
     })
     
+    @classmethod
+    def instance(cls, json_path: str | Path = './config/config.json') -> 'Config':
+        """获取进程内共享的配置实例, 同一个配置文件只在第一次调用时读取
+
+        Args:
+            json_path (str | Path, optional): json文件的文件路径. Defaults to './config/config.json'.
+
+        Returns:
+            Config: Config类实例对象
+        """
+        
+        key = str(Path(json_path).resolve())
+        config = _instances.get(key)
+        if config is None:
+            with _lock:
+                config = _instances.get(key)
+                if config is None:
+                    config = _instances[key] = cls.from_json(json_path)
+        
+        return config
+    
+    
     @classmethod
     def from_json(cls, json_path: str | Path = './config/config.json') -> 'Config':
         """读取json文件中的配置信息, 并加载到默认类中
@@ -106,4 +265,29 @@ class Config():
         # 重要：不要关闭传播（默认就是 True）
         # app_logger.propagate = True  # 这是默认值
         
-        return logger
\ No newline at end of file
+        return logger
+
+
+# Config.instance() 缓存的配置实例, 以配置文件的绝对路径为键
+_instances: dict[str, Config] = dict()
+_lock: threading.Lock = threading.Lock()
+
+
+class LazyConfig():
+    """配置的类属性描述符, 在第一次访问时才读取配置文件, 各个类共用同一个实例
+
+    用法: config: Config = LazyConfig()
+    """
+    
+    def __init__(self, json_path: str | Path = './config/config.json'):
+        """初始化 LazyConfig 描述符
+
+        Args:
+            json_path (str | Path, optional): json文件的文件路径. Defaults to './config/config.json'.
+        """
+        
+        self.json_path: str | Path = json_path
+    
+    
+    def __get__(self, obj: object, owner: type) -> Config:
+        return Config.instance(self.json_path)
@@ -1,7 +1,13 @@
+import time
+
+# 启动计时的起点, 需要在其他导入之前记录
+START: float = time.perf_counter()
+
+import argparse
 import logging
+import multiprocessing
 
 from config.config import Config
-from src.main_process import MainProcess
 
 import warnings
 
@@ -14,16 +20,46 @@ warnings.filterwarnings(
 
 
 if __name__ == "__main__":
-    config: Config = Config.from_json()
+    # 打包后的可执行文件在 Windows 上使用进程池时需要
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="淘天线路时效报表")
+    parser.add_argument("--backfill", action="store_true", help="补跑模式: 逐个处理数据文件夹下按日期命名的子文件夹")
+    parser.add_argument("--workers", type=int, default=None, help="补跑时同时处理的天数")
+    parser.add_argument("--watch", action="store_true", help="监听模式: 数据文件夹中的文件变化时只重新制作受影响的报表")
+    parser.add_argument("--interval", type=float, default=None, help="监听模式的轮询间隔(秒)")
+    parser.add_argument("--startup-time", action="store_true", help="只测量启动耗时: 输出各启动阶段的耗时后退出")
+    args = parser.parse_args()
+
+    timings: list[tuple[str, float]] = [("解释器与基础模块", time.perf_counter() - START)]
+
+    config: Config = Config.instance()
     config.setup_logger()
-    
+
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
-    
+
     logger.info("-"*50)
     logger.info("程序启动")
-    
-    mainprocess: MainProcess = MainProcess()
-    mainprocess.run()
-    
+    timings.append(("读取配置并输出第一行日志", time.perf_counter() - START))
+
+    # pandas 与各报表模块较重, 在第一行日志之后再导入
+    from src.main_process import MainProcess
+    timings.append(("导入报表流程模块", time.perf_counter() - START))
+
+    if args.startup_time:
+        for name, elapsed in timings:
+            logger.info(f"启动耗时 {name}: {elapsed:.3f} 秒")
+        MainProcess.load_reports()
+        logger.info(f"启动耗时 导入全部报表类: {time.perf_counter() - START:.3f} 秒")
+    else:
+        mainprocess: MainProcess = MainProcess()
+        if args.watch:
+            from src.watcher import Watcher
+            Watcher(args.interval).run()
+        elif args.backfill:
+            mainprocess.backfill(args.workers)
+        else:
+            mainprocess.run()
+
     logger.info("-"*50)
-    logger.info("程序结束")
\ No newline at end of file
+    logger.info("程序结束")
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import logging
+import threading
+import importlib.util
+
+from config.config import Config, LazyConfig
+
+
+class Backend():
+    """报表制作后端的选择与结果类型还原, DuckBackend 与 PolarsBackend 共用
+
+    pandas 为默认后端; duckdb 与 polars 为可选依赖, 未安装时回退到 pandas.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    ENGINES: tuple[str, ...] = ("pandas", "duckdb", "polars")
+
+    _engine: str | None = None
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def resolve(cls, engine: str | None = None) -> str:
+        """确定实际使用的报表制作后端, 指定的后端未安装时回退到 pandas
+
+        Args:
+            engine (str | None, optional): 配置的后端, 可选 pandas / duckdb / polars, 为空时使用配置文件中的值. Defaults to None.
+
+        Returns:
+            str: 实际使用的后端
+
+        Raises:
+            ValueError: 不支持的后端名称
+        """
+
+        if engine is None:
+            if Backend._engine is None:
+                Backend._engine = cls.resolve(cls.config.backend['engine'])
+            return Backend._engine
+
+        if engine not in cls.ENGINES:
+            raise ValueError(f"不支持的报表制作后端: {engine}, 可选 {list(cls.ENGINES)}")
+
+        if engine != "pandas" and importlib.util.find_spec(engine) is None:
+            cls.logger.warning(f"未安装 {engine}, 报表制作后端回退到 pandas.")
+            return "pandas"
+        return engine
+
+
+    @staticmethod
+    def restore(df: pd.DataFrame, dtypes: dict[str, object]) -> pd.DataFrame:
+        """把查询结果的列类型还原为 pandas 流程中的类型
+
+        整数列含空值时与 pandas 的左连接一样使用 float64.
+
+        Args:
+            df (pd.DataFrame): 查询结果
+            dtypes (dict[str, object]): 列名对应的类型
+
+        Returns:
+            pd.DataFrame: 还原类型后的数据
+        """
+
+        for col, dtype in dtypes.items():
+            if col not in df.columns:
+                continue
+            if isinstance(dtype, pd.CategoricalDtype) and isinstance(df[col].dtype, pd.CategoricalDtype):
+                # 无序分类的类别相同但顺序不同时 dtype 也判为相等, 需要按类别顺序重新编码
+                current = df[col].dtype
+                if not current.categories.equals(dtype.categories) or current.ordered != dtype.ordered:
+                    df[col] = df[col].cat.set_categories(dtype.categories, ordered=dtype.ordered)
+                continue
+            if df[col].dtype == dtype:
+                continue
+            if isinstance(dtype, np.dtype) and dtype.kind in "iu" and df[col].isna().any():
+                dtype = np.dtype("float64")
+            df[col] = df[col].astype(dtype)
+
+        return df
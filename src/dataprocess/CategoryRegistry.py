@@ -0,0 +1,93 @@
+import pandas as pd
+import logging
+import threading
+
+from config.config import Config, LazyConfig
+
+
+class CategoryRegistry():
+    """运行内共享的分类编码表, 同一业务域(线路、中心)的各列共用一套类别
+
+    类别按字典序排列, 排序结果与按字符串排序一致; 新的取值出现时类别集合随之扩充,
+    已编码的数据通过 align 对齐到最新的类别集合.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, domains: dict[str, list[str]] | None = None):
+        """初始化 CategoryRegistry 类实例
+
+        Args:
+            domains (dict[str, list[str]] | None, optional): 业务域对应的列名, 为空时使用配置文件中的值. Defaults to None.
+        """
+
+        domains = domains if domains is not None else self.config.categories
+        self.column_domain: dict[str, str] = {col: domain for domain, cols in domains.items() for col in cols}
+        self.dtypes: dict[str, pd.CategoricalDtype] = {domain: pd.CategoricalDtype([]) for domain in domains}
+        self.lock: threading.Lock = threading.Lock()
+
+
+    def _extend(self, domain: str, values: pd.Series) -> pd.CategoricalDtype:
+        """将新出现的取值加入业务域的类别集合
+
+        Args:
+            domain (str): 业务域
+            values (pd.Series): 已转换为字符串的列数据
+
+        Returns:
+            pd.CategoricalDtype: 最新的类别类型
+        """
+
+        uniques = pd.Index(values.dropna().unique())
+
+        with self.lock:
+            dtype = self.dtypes[domain]
+            new = uniques.difference(dtype.categories)
+            if len(new):
+                categories = dtype.categories.append(new).astype(str).sort_values()
+                dtype = pd.CategoricalDtype(categories)
+                self.dtypes[domain] = dtype
+            return dtype
+
+
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """将属于业务域的列编码为共享类别
+
+        Args:
+            df (pd.DataFrame): 数据
+
+        Returns:
+            pd.DataFrame: 编码后的数据
+        """
+
+        for col in df.columns:
+            domain = self.column_domain.get(col)
+            if domain is None:
+                continue
+            values = df[col].astype(str).where(df[col].notna())
+            dtype = self._extend(domain, values)
+            df[col] = values.astype(dtype)
+
+        return df
+
+
+    def align(self, df: pd.DataFrame) -> pd.DataFrame:
+        """将已编码的列对齐到业务域最新的类别集合, 使各表之间可以直接按编码关联
+
+        Args:
+            df (pd.DataFrame): 数据
+
+        Returns:
+            pd.DataFrame: 对齐后的数据
+        """
+
+        for col in df.columns:
+            domain = self.column_domain.get(col)
+            if domain is None or not isinstance(df[col].dtype, pd.CategoricalDtype):
+                continue
+            dtype = self.dtypes[domain]
+            if df[col].dtype != dtype:
+                df[col] = df[col].cat.set_categories(dtype.categories)
+
+        return df
@@ -0,0 +1,154 @@
+import pandas as pd
+import logging
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+
+
+class ColumnSchema():
+    """按配置文件中的列类型转换并校验解析得到的数据
+
+    支持的类型: string、category、int32、float32、datetime(可指定 format)与 percent.
+    string 列在解析时就以字符串读取, 其余类型在解析后统一转换; 线路、中心等业务域列由 CategoryRegistry 编码, 不在这里声明.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    TYPES: set[str] = {"string", "category", "int32", "float32", "datetime", "percent"}
+    # int32 的取值范围
+    INT32_MIN: int = -2**31
+    INT32_MAX: int = 2**31 - 1
+
+    def __init__(self, settings: dict | None = None):
+        """初始化 ColumnSchema 类实例
+
+        Args:
+            settings (dict | None, optional): 包含 strict 与 columns 的设置, 为空时使用配置文件中的值. Defaults to None.
+
+        Raises:
+            ValueError: 不支持的列类型
+        """
+
+        settings = settings if settings is not None else self.config.schema
+        self.strict: bool = settings.get('strict', False)
+        self.columns: dict[str, dict] = dict()
+        for col, spec in settings.get('columns', dict()).items():
+            spec = {"type": spec} if isinstance(spec, str) else dict(spec)
+            if spec.get('type') not in self.TYPES:
+                raise ValueError(f"列 {col} 的类型不受支持: {spec.get('type')}, 可选 {sorted(self.TYPES)}")
+            self.columns[col] = spec
+
+
+    def parse_dtypes(self, columns: list[str] | None = None) -> dict[str, str]:
+        """解析时即可使用的列类型, 目前为 string 列, 避免类型推断把车签等编号读成数值
+
+        Args:
+            columns (list[str] | None, optional): 文件中需要解析的列, 为空时返回全部 string 列. Defaults to None.
+
+        Returns:
+            dict[str, str]: 列名对应的 pandas 类型
+        """
+
+        return {
+            col: "str" for col, spec in self.columns.items()
+            if spec['type'] == "string" and (columns is None or col in columns)
+        }
+
+
+    @staticmethod
+    def to_string(s: pd.Series) -> pd.Series:
+        """转换为字符串列, 空值保持为空
+
+        Args:
+            s (pd.Series): 数据
+
+        Returns:
+            pd.Series: 转换后的数据
+        """
+
+        if s.dtype.kind == "f":
+            # 含空值的编号列会被读成浮点数, 整数值去掉末尾的 .0
+            return s.map(lambda v: str(int(v)) if v.is_integer() else str(v), na_action="ignore")
+        return s.astype(str).where(s.notna())
+
+
+    def _convert(self, s: pd.Series, spec: dict) -> tuple[pd.Series, pd.Series]:
+        """按类型转换单列
+
+        Args:
+            s (pd.Series): 数据
+            spec (dict): 列类型设置
+
+        Returns:
+            tuple[pd.Series, pd.Series]: 转换后的数据与无法转换的行(原值非空但转换后为空)
+        """
+
+        kind = spec['type']
+
+        if kind == "string":
+            if not pd.api.types.is_string_dtype(s):
+                s = self.to_string(s)
+            return s, pd.Series(False, index=s.index)
+
+        if kind == "category":
+            return s.astype("category"), pd.Series(False, index=s.index)
+
+        if kind == "datetime":
+            if pd.api.types.is_datetime64_any_dtype(s):
+                return s, pd.Series(False, index=s.index)
+            values = pd.to_datetime(s, format=spec.get('format'), errors="coerce")
+            return values, s.notna() & values.isna()
+
+        if kind == "percent" and not pd.api.types.is_numeric_dtype(s):
+            # "95.5%" 形式的文本去掉百分号, 数值保持原有的刻度
+            s = s.where(s.isna(), s.astype(str).str.strip().str.rstrip("%"))
+
+        values = pd.to_numeric(s, errors="coerce")
+        if kind == "int32":
+            values = values.mask((values % 1 != 0) | (values < self.INT32_MIN) | (values > self.INT32_MAX))
+            bad = s.notna() & values.isna()
+            values = values.astype("int32") if values.notna().all() else values.astype("Int32")
+        elif kind == "float32":
+            bad = s.notna() & values.isna()
+            values = values.astype("float32")
+        else:
+            bad = s.notna() & values.isna()
+            values = values.astype("float64")
+
+        return values, bad
+
+
+    def apply(self, df: pd.DataFrame, name: str = "") -> pd.DataFrame:
+        """转换并校验数据中已声明类型的列, 未声明的列保持原样
+
+        Args:
+            df (pd.DataFrame): 数据
+            name (str, optional): 文件名, 用于日志. Defaults to "".
+
+        Returns:
+            pd.DataFrame: 转换后的数据, 无法转换的值置为空
+
+        Raises:
+            ValueError: strict 模式下存在无法转换的值
+        """
+
+        declared = [col for col in df.columns if col in self.columns]
+        if not declared:
+            return df
+
+        # 浅拷贝后整列替换, 不修改传入的数据
+        df = df.copy(deep=False)
+        for col in declared:
+            spec = self.columns[col]
+            values, bad = self._convert(df[col], spec)
+            if bad.any():
+                examples = df.loc[bad, col].astype(str).unique()[:3].tolist()
+                message = f"{Path(name).name} 的列 {col} 中有 {int(bad.sum())} 个值无法转换为 {spec['type']}, 例如 {examples}"
+                if self.strict:
+                    raise ValueError(message)
+                self.logger.warning(message + ", 已置为空.")
+            df[col] = values
+
+        return df
@@ -0,0 +1,132 @@
+import pandas as pd
+import logging
+import codecs
+import csv
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+from src.dataprocess.StreamReader import StreamReader
+
+
+class CsvReader():
+    """CSV 读取器, 自动识别编码, 只解析需要的列并使用显式的列类型
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    # 编码识别时读取的字节数
+    SNIFF_BYTES: int = 64 * 1024
+
+    def __init__(self):
+        """初始化 CsvReader 类实例
+        """
+
+        self.settings: dict = self.config.reader['csv']
+
+
+    @classmethod
+    def sniff_encoding(cls, path: Path) -> str:
+        """识别文件编码: 带 BOM 的 UTF-8、UTF-8 或 GBK
+
+        GBK 使用其超集 gb18030 解码.
+
+        Args:
+            path (Path): 文件路径
+
+        Returns:
+            str: 编码名称
+        """
+
+        with open(path, "rb") as f:
+            head = f.read(cls.SNIFF_BYTES)
+
+        if head.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig"
+
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        except UnicodeDecodeError:
+            return "gb18030"
+        return "utf-8"
+
+
+    @staticmethod
+    def _header(path: Path, encoding: str, skiprows: int) -> list[str]:
+        """读取表头
+
+        Args:
+            path (Path): 文件路径
+            encoding (str): 编码
+            skiprows (int): 表头之前需要跳过的行数
+
+        Returns:
+            list[str]: 列名列表
+        """
+
+        with open(path, "r", encoding=encoding, newline="") as f:
+            reader = csv.reader(f)
+            for i, row in enumerate(reader):
+                if i == skiprows:
+                    return row
+        return []
+
+
+    def read(self,
+             path: Path,
+             columns: list[str] | None = None,
+             filters: list[dict[str, list]] | None = None,
+             skiprows: int | list[int] | None = None,
+             dtype: dict[str, str] | None = None) -> pd.DataFrame:
+        """读取 CSV 文件
+
+        Args:
+            path (Path): 文件路径
+            columns (list[str] | None, optional): 需要保留的列, 为空时保留全部列. Defaults to None.
+            filters (list[dict[str, list]] | None, optional): 行过滤条件, 多组条件之间为"或"关系. Defaults to None.
+            skiprows (int | list[int] | None, optional): 表头之前需要跳过的行. Defaults to None.
+            dtype (dict[str, str] | None, optional): 解析时使用的列类型, 与配置文件 reader.csv.dtype 合并. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 读取到的数据
+
+        Raises:
+            ValueError: 文件中缺少需要的列, 或 skiprows 不是从第一行开始的连续行
+        """
+
+        if isinstance(skiprows, list):
+            if skiprows != list(range(len(skiprows))):
+                raise ValueError(f"CSV 只支持跳过表头之前的连续行: {skiprows}")
+            skiprows = len(skiprows)
+        skiprows = skiprows or 0
+
+        encoding = self.sniff_encoding(path)
+        header = self._header(path, encoding, skiprows)
+
+        filter_cols = [col for f in (filters or []) for col in f]
+        need = list(dict.fromkeys(list(columns if columns is not None else header) + filter_cols))
+        missing = [col for col in need if col not in header]
+        if missing:
+            raise ValueError(f"{Path(path).name} 中缺少需要的列: {missing}")
+
+        usecols = [col for col in header if col in need]
+        dtype = {col: t for col, t in {**(dtype or dict()), **self.settings['dtype']}.items() if col in usecols}
+        engine = self.settings['engine']
+        chunksize = self.settings['chunksize']
+        if engine == "pyarrow" and chunksize:
+            self.logger.warning("pyarrow 引擎不支持分块读取, 改用 c 引擎.")
+            engine = "c"
+
+        # 用 header 指定表头所在行, c 与 pyarrow 引擎的行为一致
+        kwargs = dict(encoding=encoding, header=skiprows, usecols=usecols, dtype=dtype, engine=engine)
+        if chunksize:
+            chunks = [StreamReader.filter_rows(chunk, filters) for chunk in pd.read_csv(path, chunksize=chunksize, **kwargs)]
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=usecols)
+        else:
+            df = StreamReader.filter_rows(pd.read_csv(path, **kwargs), filters).reset_index(drop=True)
+
+        self.logger.info(f"CSV 读取完成: {Path(path).name}, 编码 {encoding}, 保留 {len(usecols)} 列 {len(df)} 行.")
+
+        return df
+
@@ -1,46 +1,78 @@
 import logging
+import fnmatch
+import os
+import re
 
 from pathlib import Path
-from config.config import Config
+from datetime import datetime
+from config.config import Config, LazyConfig
+from src.dataprocess.Manifest import Manifest
 
 class DataRead():
     """读取文件路径
     """
     
-    config: Config = Config.from_json()
+    config: Config = LazyConfig()
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
     
-    def __init__(self):
+    # 补跑模式下按日期命名的子文件夹, 如 2025-11-19 或 20251119
+    DATE_FOLDER: re.Pattern = re.compile(r"^(\d{4})-?(\d{2})-?(\d{2})$")
+    
+    def __init__(self, dir_path: str | Path | None = None):
         """初始化 DataRead 类实例
+
+        Args:
+            dir_path (str | Path | None, optional): 数据文件夹, 为空时使用配置文件中的值. Defaults to None.
         """
         
-        self.dir_path: str = self.config.datapath
+        self.dir_path: str = str(dir_path) if dir_path is not None else self.config.datapath
+        self.discovery: dict = self.config.discovery
+        self.manifest: Manifest = Manifest(Path(self.dir_path) / self.discovery['manifest'])
+        self.changes: dict[str, list[str]] = dict()
+    
+    
+    def date_folders(self) -> dict[datetime, Path]:
+        """查找数据文件夹下按日期命名的子文件夹, 每个子文件夹对应一天的数据
+
+        Returns:
+            dict[datetime, Path]: 按日期排序的日期对应子文件夹
+        """
+        
+        folders: dict[datetime, Path] = dict()
+        for p in Path(self.dir_path).iterdir():
+            match = self.DATE_FOLDER.match(p.name)
+            if not p.is_dir() or match is None:
+                continue
+            try:
+                folders[datetime(*map(int, match.groups()))] = p
+            except ValueError:
+                self.logger.warning(f"文件夹名称不是有效日期, 跳过: {p.name}")
+        
+        self.logger.info(f"补跑日期文件夹读取完成, 一共 {len(folders)} 天.")
+        
+        return dict(sorted(folders.items()))
         
     
     def path_read(self) -> list[Path]:
-        """读取data文件夹中的文件路径
+        """单次遍历data文件夹, 按配置文件中的文件名模式筛选文件路径
+
+        以"."开头的文件夹(磁盘缓存、历史库)不遍历.
 
         Returns:
             list[Path]: 文件路径列表
         """
         
-        dir_path: Path = Path(self.dir_path)
+        patterns: list[str] = self.discovery['patterns']
         
         path_list: list[Path] = list()
-        for f in dir_path.rglob("*淘天平台线路时效分析*.xlsx"):
-            path_list.append(f)
-            
-        for f in dir_path.rglob("*线路达成率*.xlsx"):
-            path_list.append(f)
-            
-        for f in dir_path.rglob("*线路罚款*.csv"):
-            path_list.append(f)
-        
-        for f in dir_path.rglob("*超时库存*.xlsx"):
-            path_list.append(f)
+        for root, dirs, files in os.walk(self.dir_path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                    path_list.append(Path(root) / name)
         
-        path: Path = Path("./config/城市对应中心基础表1119.xlsx")
-        path_list.append(path)
+        for reference in self.discovery['reference']:
+            path_list.append(Path(reference))
             
         self.logger.info(f"路径读取完成, 一共读取到 {len(path_list)} 个文件路径.")
             
@@ -48,7 +80,10 @@ class DataRead():
     
     
     def path_label(self, path_list: list[Path]) -> dict[str, list[Path]]:
-        """对文件进行类别标记
+        """按配置文件中的类别关键字表对文件进行类别标记
+
+        文件名包含某一类别的任一关键字即归入该类别; 一个文件可以被多个类别共用(如"未达成车签明细"),
+        这种共用关系在配置文件中显式列出.
 
         Args:
             path_list (list[Path]): 文件路径列表
@@ -57,36 +92,19 @@ class DataRead():
             dict[str, list[Path]]: 类别对应路径字典
         """
         
-        report_path: dict[str, list[Path]] = dict()
-        report_path['gpt'] = list()
-        report_path['inbound'] = list()
-        report_path['outbound'] = list()
-        report_path['routing'] = list()
-        report_path['transportation'] = list()
-                       
-        for p in path_list:              
-            if "各环节延误量" in p.name:
-                report_path['gpt'].append(p)
-                
-            if "城市线路汇总-日" in p.name:
-                report_path['gpt'].append(p)
-                
-            if "未达成车签明细" in p.name or "线路罚款" in p.name:
-                report_path['routing'].append(p)
-                report_path['transportation'].append(p)
-            
-            if "进港" in p.name or "城市对应中心" in p.name:
-                report_path['inbound'].append(p)
-            
-            if "出港" in p.name or "城市对应中心" in p.name:
-                report_path['outbound'].append(p)
-                
-            if "交件" in p.name:
-                report_path['submission'] = [p]
-                
-            if '派签' in p.name:
-                report_path['dispatch'] = [p]
-                
+        labels: dict[str, list[str]] = self.discovery['labels']
+        report_path: dict[str, list[Path]] = {label: list() for label in labels}
+        
+        unlabeled: list[str] = list()
+        for p in path_list:
+            matched = [label for label, keywords in labels.items() if any(k in p.name for k in keywords)]
+            for label in matched:
+                report_path[label].append(p)
+            if not matched:
+                unlabeled.append(p.name)
+        
+        if unlabeled:
+            self.logger.info(f"以下文件不属于任何类别: {unlabeled}")
         self.logger.info("文件路径类别标记完成.")
                 
         return report_path
@@ -102,6 +120,7 @@ class DataRead():
         self.logger.info("文件路径读取流程-开始")
         
         path_list = self.path_read()
+        self.changes = self.manifest.update(path_list)
         report_path = self.path_label(path_list)
         
         self.logger.info("文件路径读取流程-结束")
@@ -0,0 +1,259 @@
+import pandas as pd
+import logging
+import os
+import uuid
+import hashlib
+import json
+import time
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+from src.dataprocess.Fingerprint import FileFingerprint
+
+
+class DiskCache():
+    """输入文件的列式磁盘缓存, 首次读取时将裁剪与过滤后的数据转换为 Parquet, 之后直接加载
+
+    条目按文件、读取参数、解析的列、下推的行过滤条件与解析设置(列的解析类型、读取引擎)区分, 缓存中只保存报表实际需要的数据;
+    需求或配置变化(如增加了列、修改了 schema 或 reader.engine)时生成新的条目, 旧条目由 evict 清理.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self):
+        """初始化 DiskCache 类实例
+        """
+
+        self.settings: dict = self.config.cache
+        self.dir_path: Path = Path(self.config.datapath) / self.settings['dir']
+        self.enabled: bool = self.settings['enabled'] and self._has_parquet()
+        self.rebuild: bool = self.settings['rebuild']
+        # 文件清单中本次运行已计算好的指纹, 命中时不再重复读取文件计算哈希
+        self.fingerprints: dict[str, FileFingerprint] = dict()
+
+        if self.enabled:
+            self.dir_path.mkdir(parents=True, exist_ok=True)
+
+
+    def _has_parquet(self) -> bool:
+        """检查 Parquet 读写依赖是否可用
+
+        Returns:
+            bool: 是否可用
+        """
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.logger.warning("未安装 pyarrow, 磁盘缓存不可用.")
+            return False
+        return True
+
+
+    @staticmethod
+    def _entry(path: Path, columns: list[str] | None, filters: list[dict] | None, read_kwargs: dict, parse: dict) -> str:
+        """根据文件路径、解析的列、行过滤条件、读取参数与解析设置生成缓存条目名称
+
+        Args:
+            path (Path): 文件路径
+            columns (list[str] | None): 解析的列, 为空表示全部列
+            filters (list[dict] | None): 下推的行过滤条件
+            read_kwargs (dict): 读取参数
+            parse (dict): 影响解析结果的设置, 如列的解析类型与读取引擎
+
+        Returns:
+            str: 缓存条目名称
+        """
+
+        raw = repr((
+            str(Path(path).resolve()),
+            sorted(columns) if columns is not None else None,
+            repr(filters),
+            sorted((k, repr(v)) for k, v in read_kwargs.items()),
+            sorted((k, repr(v)) for k, v in parse.items()),
+        ))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+    def _meta(self, entry: str) -> dict | None:
+        """读取缓存条目的元数据
+
+        Args:
+            entry (str): 缓存条目名称
+
+        Returns:
+            dict | None: 元数据, 不存在或损坏时为 None
+        """
+
+        meta_path = self.dir_path / f"{entry}.json"
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+
+    def _write_meta(self, entry: str, meta: dict) -> None:
+        """写入缓存条目的元数据
+
+        先写入临时文件再替换, 中途失败不会留下不完整的元数据.
+
+        Args:
+            entry (str): 缓存条目名称
+            meta (dict): 元数据
+        """
+
+        path = self.dir_path / f"{entry}.json"
+        tmp_path = path.with_name(f"{entry}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"磁盘缓存元数据写入失败: {entry}, {e}")
+
+
+    def _fingerprint(self, path: Path, digest: bool = True) -> FileFingerprint:
+        """获取文件指纹, 优先使用文件清单中的结果
+
+        Args:
+            path (Path): 文件路径
+            digest (bool, optional): 是否需要内容哈希. Defaults to True.
+
+        Returns:
+            FileFingerprint: 文件指纹
+        """
+
+        known = self.fingerprints.get(str(Path(path).resolve()))
+        if known is not None and (known.digest or not digest):
+            return known
+        return FileFingerprint.from_path(path, digest=digest)
+
+
+    def load(self, path: Path, columns: list[str] | None, filters: list[dict] | None, read_kwargs: dict, parse: dict) -> pd.DataFrame | None:
+        """从缓存加载文件数据
+
+        大小与修改时间一致时直接命中; 修改时间变化时再比较内容哈希.
+
+        Args:
+            path (Path): 源文件路径
+            columns (list[str] | None): 解析的列, 为空表示全部列
+            filters (list[dict] | None): 下推的行过滤条件
+            read_kwargs (dict): 读取参数
+            parse (dict): 影响解析结果的设置, 如列的解析类型与读取引擎
+
+        Returns:
+            pd.DataFrame | None: 缓存数据, 未命中时为 None
+        """
+
+        if not self.enabled or self.rebuild:
+            return None
+
+        entry = self._entry(path, columns, filters, read_kwargs, parse)
+        meta = self._meta(entry)
+        data_path = self.dir_path / f"{entry}.parquet"
+        if meta is None or not data_path.exists():
+            return None
+
+        cached = FileFingerprint(**meta['fingerprint'])
+        current = self._fingerprint(path, digest=False)
+        if not current.same_stat(cached):
+            if current.size != cached.size or (current.digest or FileFingerprint.file_digest(path)) != cached.digest:
+                self.logger.info(f"磁盘缓存已过期: {Path(path).name}")
+                return None
+            meta['fingerprint'] = FileFingerprint(current.path, current.size, current.mtime, cached.digest).to_dict()
+
+        missing = [col for col in (columns or []) if col not in meta['columns']]
+        if missing:
+            raise ValueError(f"{Path(path).name} 中缺少需要的列: {missing}")
+
+        df = pd.read_parquet(data_path)
+
+        meta['accessed'] = time.time()
+        self._write_meta(entry, meta)
+        self.logger.info(f"磁盘缓存命中: {Path(path).name}")
+
+        return df
+
+
+    def save(self, path: Path, df: pd.DataFrame, columns: list[str] | None, filters: list[dict] | None, read_kwargs: dict, parse: dict) -> None:
+        """将裁剪与过滤后的文件数据写入缓存
+
+        Args:
+            path (Path): 源文件路径
+            df (pd.DataFrame): 解析得到的数据
+            columns (list[str] | None): 解析的列, 为空表示全部列
+            filters (list[dict] | None): 下推的行过滤条件
+            read_kwargs (dict): 读取参数
+            parse (dict): 影响解析结果的设置, 如列的解析类型与读取引擎
+        """
+
+        if not self.enabled:
+            return
+
+        entry = self._entry(path, columns, filters, read_kwargs, parse)
+        data_path = self.dir_path / f"{entry}.parquet"
+        tmp_path = data_path.with_name(f"{entry}.{uuid.uuid4().hex}.tmp")
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, data_path)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"磁盘缓存写入失败, 跳过该文件: {Path(path).name}, {e}")
+            return
+
+        now = time.time()
+        self._write_meta(entry, {
+            "fingerprint": self._fingerprint(path).to_dict(),
+            "columns": [str(col) for col in df.columns],
+            "created": now,
+            "accessed": now,
+        })
+        self.logger.info(f"磁盘缓存已写入: {Path(path).name}")
+
+
+    def evict(self) -> None:
+        """按最近访问时间清理过期条目, 并将缓存总大小控制在上限以内
+        """
+
+        if not self.enabled:
+            return
+
+        now = time.time()
+        max_age = self.settings['max_age_days'] * 24 * 3600
+        max_size = self.settings['max_size_mb'] * 1024 * 1024
+
+        entries: list[tuple[float, int, str]] = list()
+        for meta_path in self.dir_path.glob("*.json"):
+            entry = meta_path.stem
+            data_path = self.dir_path / f"{entry}.parquet"
+            meta = self._meta(entry)
+            if meta is None or not data_path.exists() or now - meta['accessed'] > max_age:
+                self._remove(entry)
+                continue
+            entries.append((meta['accessed'], data_path.stat().st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= max_size:
+                break
+            self._remove(entry)
+            total -= size
+
+        self.logger.info(f"磁盘缓存清理完成, 当前占用 {total / 1024 / 1024:.1f} MB.")
+
+
+    def _remove(self, entry: str) -> None:
+        """删除一个缓存条目
+
+        Args:
+            entry (str): 缓存条目名称
+        """
+
+        for suffix in (".parquet", ".json"):
+            (self.dir_path / f"{entry}{suffix}").unlink(missing_ok=True)
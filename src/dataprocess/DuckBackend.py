@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import logging
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+from src.dataprocess.Backend import Backend
+
+
+class DuckBackend(Backend):
+    """报表制作的 DuckDB 后端, 各报表把已读取的数据注册到进程内的 DuckDB 数据库中, 用 SQL 完成筛选、关联与汇总
+
+    进程内共用一个数据库, 每次查询使用独立的游标, 各报表可以在不同线程中同时查询.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    # 注册到 DuckDB 的数据附加的行号列, 用于还原 pandas 的行顺序
+    POS: str = "__pos"
+
+    _connection = None
+
+    @classmethod
+    def connection(cls):
+        """获取进程内共用的 DuckDB 数据库连接, 第一次使用时按配置创建
+
+        Returns:
+            duckdb.DuckDBPyConnection: 数据库连接
+        """
+
+        if cls._connection is None:
+            with cls._lock:
+                if cls._connection is None:
+                    import duckdb
+
+                    settings = cls.config.backend
+                    con = duckdb.connect(":memory:")
+                    if settings['threads']:
+                        con.execute(f"SET threads = {int(settings['threads'])}")
+                    if settings['memory_limit']:
+                        con.execute("SET memory_limit = ?", [settings['memory_limit']])
+                    if settings['temp_directory']:
+                        Path(settings['temp_directory']).mkdir(parents=True, exist_ok=True)
+                        con.execute("SET temp_directory = ?", [str(settings['temp_directory'])])
+                    cls._connection = con
+                    cls.logger.info(f"DuckDB 数据库已创建, 版本 {duckdb.__version__}.")
+
+        return cls._connection
+
+
+    @staticmethod
+    def q(name: str) -> str:
+        """将列名或表名转换为 SQL 中带引号的标识符
+
+        Args:
+            name (str): 列名或表名
+
+        Returns:
+            str: 标识符
+        """
+
+        return '"' + str(name).replace('"', '""') + '"'
+
+
+    @staticmethod
+    def literal(value: str) -> str:
+        """将文本转换为 SQL 中的字符串常量
+
+        Args:
+            value (str): 文本
+
+        Returns:
+            str: 字符串常量
+        """
+
+        return "'" + str(value).replace("'", "''") + "'"
+
+
+    @classmethod
+    def numbered(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """附加行号列, 不复制原有的列
+
+        Args:
+            df (pd.DataFrame): 数据
+
+        Returns:
+            pd.DataFrame: 带行号列的数据
+        """
+
+        df = df.copy(deep=False)
+        df[cls.POS] = np.arange(len(df), dtype="int64")
+        return df
+
+
+    @staticmethod
+    def routes(routes: frozenset[str]) -> pd.DataFrame:
+        """线路集合转换为单列的表, 供 SQL 中按线路筛选
+
+        Args:
+            routes (frozenset[str]): 线路集合
+
+        Returns:
+            pd.DataFrame: 只有 route 列的表
+        """
+
+        return pd.DataFrame({"route": sorted(routes)}, dtype=object)
+
+
+    @classmethod
+    def select(cls, columns: list[tuple[str, str]]) -> str:
+        """生成 SELECT 的列清单
+
+        Args:
+            columns (list[tuple[str, str]]): 输出列名与对应的表达式
+
+        Returns:
+            str: 以逗号分隔的 "表达式 AS 列名"
+        """
+
+        return ", ".join(f"{expr} AS {cls.q(name)}" for name, expr in columns)
+
+
+    @classmethod
+    def query(cls, sql: str, **tables: pd.DataFrame) -> pd.DataFrame:
+        """注册数据并执行查询
+
+        Args:
+            sql (str): 查询语句
+            **tables (pd.DataFrame): 表名对应的数据
+
+        Returns:
+            pd.DataFrame: 查询结果
+        """
+
+        cursor = cls.connection().cursor()
+        try:
+            for name, df in tables.items():
+                cursor.register(name, df)
+            return cursor.sql(sql).df()
+        finally:
+            cursor.close()
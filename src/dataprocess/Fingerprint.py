@@ -0,0 +1,98 @@
+import hashlib
+
+from pathlib import Path
+from dataclasses import dataclass, asdict
+
+
+@dataclass(frozen=True)
+class FileFingerprint():
+    """文件指纹: 路径、大小、修改时间与内容哈希
+    """
+
+    path: str
+    size: int
+    mtime: float
+    digest: str = ""
+
+    @classmethod
+    def from_path(cls, path: str | Path, digest: bool = True) -> 'FileFingerprint':
+        """根据文件生成指纹
+
+        Args:
+            path (str | Path): 文件路径
+            digest (bool, optional): 是否计算内容哈希. Defaults to True.
+
+        Returns:
+            FileFingerprint: 文件指纹
+        """
+
+        path = Path(path).resolve()
+        stat = path.stat()
+
+        return cls(
+            path=str(path),
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            digest=cls.file_digest(path) if digest else ""
+        )
+
+
+    @staticmethod
+    def file_digest(path: str | Path, block_size: int = 1024 * 1024) -> str:
+        """分块计算文件内容的哈希值
+
+        Args:
+            path (str | Path): 文件路径
+            block_size (int, optional): 每次读取的字节数. Defaults to 1024*1024.
+
+        Returns:
+            str: 十六进制哈希字符串
+        """
+
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            while block := f.read(block_size):
+                h.update(block)
+
+        return h.hexdigest()
+
+
+    @classmethod
+    def known_digest(cls, path: str | Path, known: dict[str, 'FileFingerprint']) -> str:
+        """获取文件内容哈希, 文件大小与修改时间与已有指纹一致时直接沿用其哈希
+
+        Args:
+            path (str | Path): 文件路径
+            known (dict[str, FileFingerprint]): 已计算的指纹, 如文件清单中的结果
+
+        Returns:
+            str: 十六进制哈希字符串
+        """
+
+        fingerprint = known.get(str(Path(path).resolve()))
+        if fingerprint is not None and fingerprint.digest and fingerprint.same_stat(cls.from_path(path, digest=False)):
+            return fingerprint.digest
+        return cls.file_digest(path)
+
+
+    def same_stat(self, other: 'FileFingerprint') -> bool:
+        """判断两个指纹的路径、大小与修改时间是否一致
+
+        Args:
+            other (FileFingerprint): 另一个指纹
+
+        Returns:
+            bool: 是否一致
+        """
+
+        return (self.path, self.size, self.mtime) == (other.path, other.size, other.mtime)
+
+
+    def to_dict(self) -> dict:
+        """转换为可写入 JSON 的字典
+
+        Returns:
+            dict: 指纹字典
+        """
+
+        return asdict(self)
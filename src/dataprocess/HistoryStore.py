@@ -0,0 +1,283 @@
+import pandas as pd
+import logging
+import os
+import json
+import uuid
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+
+
+class HistoryStore():
+    """按日期分区的本地历史库, 每次运行的输入数据与报表各写入一个 Parquet 分区
+
+    目录结构为 <datapath>/<dir>/<表名>/<日期>.parquet, 同一日期重复写入时覆盖原分区.
+    每个日期另有 <datapath>/<dir>/<日期>.json 记录写入报表时输入与配置的指纹, 用于判断已有的报表能否沿用.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, dir_path: str | Path | None = None):
+        """初始化 HistoryStore 类实例
+
+        Args:
+            dir_path (str | Path | None, optional): 历史库目录, 为空时使用配置文件中的值. Defaults to None.
+        """
+
+        self.settings: dict = self.config.history
+        self.dir_path: Path = Path(dir_path) if dir_path is not None else Path(self.config.datapath) / self.settings['dir']
+        self.enabled: bool = self.settings['enabled'] and self._has_parquet()
+
+        if self.enabled:
+            self.dir_path.mkdir(parents=True, exist_ok=True)
+
+
+    def _has_parquet(self) -> bool:
+        """检查 Parquet 读写依赖是否可用
+
+        Returns:
+            bool: 是否可用
+        """
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.logger.warning("未安装 pyarrow, 历史库不可用.")
+            return False
+        return True
+
+
+    @staticmethod
+    def normalize_date(value: object) -> str:
+        """将日期统一为 YYYY-MM-DD 格式, 作为分区名称
+
+        Args:
+            value (object): 日期
+
+        Returns:
+            str: 分区名称
+        """
+
+        return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+    def partition(self, table: str, date: object) -> Path:
+        """获取某张表某一日期的分区路径
+
+        Args:
+            table (str): 表名
+            date (object): 日期
+
+        Returns:
+            Path: 分区路径
+        """
+
+        return self.dir_path / table / f"{self.normalize_date(date)}.parquet"
+
+
+    def tables(self) -> list[str]:
+        """获取历史库中的全部表名
+
+        Returns:
+            list[str]: 表名列表
+        """
+
+        if not self.dir_path.exists():
+            return list()
+        return sorted(p.name for p in self.dir_path.iterdir() if p.is_dir())
+
+
+    def dates(self, table: str) -> list[str]:
+        """获取某张表已有的全部日期分区
+
+        Args:
+            table (str): 表名
+
+        Returns:
+            list[str]: 按时间排序的日期列表
+        """
+
+        table_path = self.dir_path / table
+        if not table_path.exists():
+            return list()
+        return sorted(p.stem for p in table_path.glob("*.parquet"))
+
+
+    def has(self, date: object, tables: list[str]) -> bool:
+        """检查某一日期的分区是否在所有表中都已存在
+
+        Args:
+            date (object): 日期
+            tables (list[str]): 表名列表
+
+        Returns:
+            bool: 是否都已存在
+        """
+
+        if not self.enabled:
+            return False
+        return all(self.partition(table, date).exists() for table in tables)
+
+
+    def stamp_path(self, date: object) -> Path:
+        """获取某一日期输入指纹文件的路径
+
+        Args:
+            date (object): 日期
+
+        Returns:
+            Path: 指纹文件路径
+        """
+
+        return self.dir_path / f"{self.normalize_date(date)}.json"
+
+
+    def stamp(self, date: object) -> str | None:
+        """读取某一日期写入报表时记录的输入指纹
+
+        Args:
+            date (object): 日期
+
+        Returns:
+            str | None: 输入指纹, 没有记录或文件损坏时为 None
+        """
+
+        path = self.stamp_path(date)
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)['stamp']
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+
+
+    def _write_stamp(self, date: object, stamp: str) -> None:
+        """记录某一日期写入报表时的输入指纹
+
+        Args:
+            date (object): 日期
+            stamp (str): 输入指纹
+        """
+
+        path = self.stamp_path(date)
+        tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stamp": stamp}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"历史库输入指纹写入失败: {path.stem}, {e}")
+
+
+    def append(self, table: str, df: pd.DataFrame, date: object) -> bool:
+        """写入某张表某一日期的分区, 已存在的分区会被覆盖, 保证同一日期只保留一份
+
+        先写入临时文件再替换, 中途失败不会留下不完整的分区.
+
+        Args:
+            table (str): 表名
+            df (pd.DataFrame): 数据
+            date (object): 日期
+
+        Returns:
+            bool: 是否写入成功
+        """
+
+        if not self.enabled:
+            return False
+
+        path = self.partition(table, date)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"历史库写入失败, 跳过该表: {table} {path.stem}, {e}")
+            return False
+
+        return True
+
+
+    def save(self, date: object, frames: dict[str, pd.DataFrame], stamp: str | None = None) -> None:
+        """将一次运行的多张表写入同一日期的分区
+
+        Args:
+            date (object): 日期
+            frames (dict[str, pd.DataFrame]): 表名对应的数据
+            stamp (str | None, optional): 制作这些表时的输入指纹, 全部写入成功后记录; 为空时不更新. Defaults to None.
+        """
+
+        if not self.enabled:
+            return
+
+        saved = [table for table, df in frames.items() if self.append(table, df, date)]
+        if stamp is not None:
+            # 先删除旧的指纹, 部分表写入失败时不会误判为可以沿用
+            self.stamp_path(date).unlink(missing_ok=True)
+            if len(saved) == len(frames):
+                self._write_stamp(date, stamp)
+        self.logger.info(f"历史库写入完成: {self.normalize_date(date)}, 共 {len(saved)} 张表.")
+
+
+    def read_partition(self, table: str, date: object) -> pd.DataFrame:
+        """读取某张表某一日期的分区
+
+        Args:
+            table (str): 表名
+            date (object): 日期
+
+        Returns:
+            pd.DataFrame: 分区数据
+
+        Raises:
+            FileNotFoundError: 分区不存在
+        """
+
+        path = self.partition(table, date)
+        if not path.exists():
+            raise FileNotFoundError(f"历史库中没有分区: {table} {path.stem}")
+        return pd.read_parquet(path)
+
+
+    def load(self,
+             table: str,
+             start: object | None = None,
+             end: object | None = None,
+             columns: list[str] | None = None) -> pd.DataFrame:
+        """读取某张表一段日期内的全部分区, 只加载日期范围内的文件
+
+        数据中没有"日期"列时, 按分区名称补充该列.
+
+        Args:
+            table (str): 表名
+            start (object | None, optional): 开始日期(含), 为空时不限制. Defaults to None.
+            end (object | None, optional): 结束日期(含), 为空时不限制. Defaults to None.
+            columns (list[str] | None, optional): 需要的列, 为空时加载全部列. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 多日数据
+        """
+
+        start = self.normalize_date(start) if start is not None else None
+        end = self.normalize_date(end) if end is not None else None
+
+        frames: list[pd.DataFrame] = list()
+        for date in self.dates(table):
+            if (start is not None and date < start) or (end is not None and date > end):
+                continue
+            df = pd.read_parquet(self.partition(table, date), columns=columns)
+            if "日期" not in df.columns:
+                df.insert(0, "日期", date)
+            frames.append(df)
+
+        self.logger.info(f"历史库读取完成: {table}, {start or '最早'} 至 {end or '最新'}, 共 {len(frames)} 个分区.")
+
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
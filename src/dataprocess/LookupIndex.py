@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import logging
+
+from config.config import Config, LazyConfig
+
+
+class LookupIndex():
+    """参考表的键-行位置索引, 用于代替按单个键的左连接
+
+    索引只构建一次, 查找时按位置取出参考表的列, 明细的行数与顺序保持不变;
+    参考表中的重复键不会再使明细行重复, 按配置保留第一条或报错.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, table: pd.DataFrame, key: str, name: str = "", duplicates: str | None = None):
+        """初始化 LookupIndex 类实例
+
+        Args:
+            table (pd.DataFrame): 参考表
+            key (str): 键列
+            name (str, optional): 参考表名称, 用于日志. Defaults to "".
+            duplicates (str | None, optional): 重复键的处理方式, first 保留第一条并记录警告, error 抛出异常; 为空时使用配置文件中的值. Defaults to None.
+
+        Raises:
+            ValueError: 不支持的重复键处理方式, 或 duplicates 为 error 时参考表中存在重复键
+        """
+
+        duplicates = duplicates or self.config.lookup['duplicates']
+        if duplicates not in ("first", "error"):
+            raise ValueError(f"不支持的重复键处理方式: {duplicates}")
+
+        # 空键不参与匹配
+        table = table.loc[table[key].notna()].reset_index(drop=True)
+        index = pd.Index(table[key])
+
+        # is_unique 同时生成查找用的哈希表, 之后各报表的查找不再重复构建
+        if not index.is_unique:
+            dup = index.duplicated(keep="first")
+            examples = index[dup].astype(str).unique()[:3].tolist()
+            message = f"{name or key} 中有 {int(dup.sum())} 行的 {key} 重复, 例如 {examples}"
+            if duplicates == "error":
+                raise ValueError(message)
+            self.logger.warning(message + ", 查找时只使用第一条.")
+            table = table.loc[~dup].reset_index(drop=True)
+            index = pd.Index(table[key])
+            # 去重后重新生成查找用的哈希表, 空查找只用于提前构建, 不返回结果
+            index.get_indexer(index[:0])
+
+        self.key: str = key
+        self.name: str = name or key
+        self.table: pd.DataFrame = table
+        self.index: pd.Index = index
+
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+    def positions(self, keys: pd.Series) -> np.ndarray:
+        """查找每个键在参考表中的行位置
+
+        Args:
+            keys (pd.Series): 需要查找的键
+
+        Returns:
+            np.ndarray: 行位置, 找不到的键为 -1
+        """
+
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            # 分类列只对类别查找一次, 再按编码映射到各行; 末尾追加 -1 供空值(编码 -1)取用
+            lookup = np.append(self.index.get_indexer(keys.cat.categories), -1)
+            return lookup[keys.cat.codes.to_numpy()]
+
+        return self.index.get_indexer(keys)
+
+
+    def take(self, pos: np.ndarray, columns: list[str], index: pd.Index | None = None) -> pd.DataFrame:
+        """按行位置取出参考表的列
+
+        Args:
+            pos (np.ndarray): 行位置, -1 表示没有匹配
+            columns (list[str]): 参考表中需要的列
+            index (pd.Index | None, optional): 结果的索引. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 取出的数据, 没有匹配的行为空值
+        """
+
+        data: dict[str, object] = dict()
+        for col in columns:
+            values = self.table[col]
+            # numpy 类型直接取数组, 整数列有空值时与 merge 一样提升为浮点数
+            values = values.to_numpy() if isinstance(values.dtype, np.dtype) else values.array
+            data[col] = pd.api.extensions.take(values, pos, allow_fill=True)
+
+        return pd.DataFrame(data, index=index)
+
+
+    def lookup(self, keys: pd.Series, columns: list[str]) -> pd.DataFrame:
+        """取出每个键对应的参考表列
+
+        Args:
+            keys (pd.Series): 需要查找的键
+            columns (list[str]): 参考表中需要的列
+
+        Returns:
+            pd.DataFrame: 与 keys 行数、索引一致的数据, 找不到的键为空值
+        """
+
+        return self.take(self.positions(keys), columns, keys.index)
+
+
+    def join(self, df: pd.DataFrame, on: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """以 df[on] 为键把参考表的列追加到 df 之后, 相当于不会重复行的左连接
+
+        Args:
+            df (pd.DataFrame): 明细
+            on (str): 明细中的键列
+            columns (list[str] | None, optional): 参考表中需要的列, 为空时使用键列以外的全部列. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 追加了参考表列的明细, 索引重置为从 0 开始
+        """
+
+        columns = columns if columns is not None else [col for col in self.table.columns if col != self.key]
+        pos = self.positions(df[on])
+        self.logger.debug(f"{self.name} 查找完成, {len(df)} 行中 {int((pos < 0).sum())} 行没有匹配.")
+
+        df = df.reset_index(drop=True)
+        return pd.concat([df, self.take(pos, columns, df.index)], axis=1)
@@ -0,0 +1,134 @@
+import logging
+import json
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+from src.dataprocess.Fingerprint import FileFingerprint
+
+
+class Manifest():
+    """输入文件清单, 记录每个文件的大小、修改时间与内容哈希, 用于判断相对上次运行新增、变化与缺失的文件
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, path: str | Path):
+        """初始化 Manifest 类实例
+
+        Args:
+            path (str | Path): 清单文件路径
+        """
+
+        self.path: Path = Path(path)
+        self.digest: bool = self.config.discovery['digest']
+        self.entries: dict[str, FileFingerprint] = dict()
+
+
+    def load(self) -> dict[str, FileFingerprint]:
+        """读取上次运行保存的清单
+
+        Returns:
+            dict[str, FileFingerprint]: 文件路径对应的指纹, 清单不存在或损坏时为空
+        """
+
+        if not self.path.exists():
+            return dict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {path: FileFingerprint(**fp) for path, fp in data['files'].items()}
+        except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+            self.logger.warning(f"文件清单读取失败, 视为首次运行: {self.path}, {e!r}")
+            return dict()
+
+
+    def build(self, path_list: list[Path], previous: dict[str, FileFingerprint]) -> dict[str, FileFingerprint]:
+        """生成本次的清单, 大小与修改时间未变化的文件沿用上次的内容哈希, 不重复读取文件
+
+        Args:
+            path_list (list[Path]): 文件路径列表
+            previous (dict[str, FileFingerprint]): 上次的清单
+
+        Returns:
+            dict[str, FileFingerprint]: 文件路径对应的指纹
+        """
+
+        entries: dict[str, FileFingerprint] = dict()
+        for p in path_list:
+            current = FileFingerprint.from_path(p, digest=False)
+            cached = previous.get(current.path)
+            if cached is not None and cached.digest and current.same_stat(cached):
+                current = cached
+            elif self.digest:
+                current = FileFingerprint(current.path, current.size, current.mtime, FileFingerprint.file_digest(p))
+            entries[current.path] = current
+
+        return entries
+
+
+    @staticmethod
+    def diff(previous: dict[str, FileFingerprint], current: dict[str, FileFingerprint]) -> dict[str, list[str]]:
+        """比较两次清单
+
+        修改时间变化但内容哈希一致的文件不算作变化.
+
+        Args:
+            previous (dict[str, FileFingerprint]): 上次的清单
+            current (dict[str, FileFingerprint]): 本次的清单
+
+        Returns:
+            dict[str, list[str]]: 新增(new)、变化(changed)与缺失(missing)的文件路径
+        """
+
+        changed: list[str] = list()
+        for path in current.keys() & previous.keys():
+            old, new = previous[path], current[path]
+            if new.digest and old.digest:
+                if new.digest != old.digest:
+                    changed.append(path)
+            elif not new.same_stat(old):
+                changed.append(path)
+
+        return {
+            "new": sorted(current.keys() - previous.keys()),
+            "changed": sorted(changed),
+            "missing": sorted(previous.keys() - current.keys()),
+        }
+
+
+    def save(self) -> None:
+        """保存本次的清单
+        """
+
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"files": {path: fp.to_dict() for path, fp in self.entries.items()}}, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            self.logger.warning(f"文件清单写入失败: {self.path}, {e!r}")
+
+
+    def update(self, path_list: list[Path]) -> dict[str, list[str]]:
+        """生成本次的清单并与上次比较, 然后保存
+
+        Args:
+            path_list (list[Path]): 文件路径列表
+
+        Returns:
+            dict[str, list[str]]: 新增(new)、变化(changed)与缺失(missing)的文件路径
+        """
+
+        previous = self.load()
+        self.entries = self.build(path_list, previous)
+        changes = self.diff(previous, self.entries)
+        self.save()
+
+        log = self.logger.info if any(changes.values()) else self.logger.debug
+        log(f"文件清单更新完成: 新增 {len(changes['new'])} 个, 变化 {len(changes['changed'])} 个, "
+            f"缺失 {len(changes['missing'])} 个, 未变化 {len(self.entries) - len(changes['new']) - len(changes['changed'])} 个.")
+        for kind, label in (("new", "新增"), ("changed", "变化"), ("missing", "缺失")):
+            for path in changes[kind]:
+                self.logger.info(f"  {label}: {Path(path).name}")
+
+        return changes
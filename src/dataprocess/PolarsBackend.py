@@ -0,0 +1,100 @@
+import os
+import pandas as pd
+import logging
+
+from config.config import Config, LazyConfig
+from src.dataprocess.Backend import Backend
+
+
+class PolarsBackend(Backend):
+    """报表制作的 Polars 后端, 只替换报表的计算部分: 各报表把 SourceStore 已解析的 pandas 数据转换为 LazyFrame,
+    在 Polars 中完成筛选、关联与汇总, 再转换回 pandas
+
+    数据在转换前已经按登记的需求完成列裁剪与行过滤, 查询计划中没有可以下推到文件读取的部分;
+    每个报表多付出一次 pandas 与 Arrow 之间的往返转换, 收益只来自 Polars 线程池中的关联与汇总.
+    各报表在自己的阶段末尾 collect, 下游阶段与工作簿写入使用的仍是 pandas 数据.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    _module = None
+
+    @classmethod
+    def module(cls):
+        """导入 polars, 第一次导入前按配置设置线程数
+
+        Returns:
+            module: polars 模块
+        """
+
+        if cls._module is None:
+            with cls._lock:
+                if cls._module is None:
+                    # 线程池在导入时创建, 线程数只能在导入前通过环境变量设置
+                    threads = cls.config.backend['threads']
+                    if threads:
+                        os.environ.setdefault("POLARS_MAX_THREADS", str(int(threads)))
+                    import polars
+
+                    cls._module = polars
+                    cls.logger.info(f"Polars 已加载, 版本 {polars.__version__}, 线程数 {polars.thread_pool_size()}.")
+
+        return cls._module
+
+
+    @classmethod
+    def lazy(cls, df: pd.DataFrame, keys: list[str] | None = None, columns: list[str] | None = None):
+        """把 pandas 数据转换为 LazyFrame
+
+        数据会整体复制为 Arrow 格式, 只转换查询需要的列可以减少复制量.
+
+        Args:
+            df (pd.DataFrame): 数据
+            keys (list[str] | None, optional): 用于关联或筛选的列, 转换为字符串, 使不同表的分类列可以直接比较. Defaults to None.
+            columns (list[str] | None, optional): 只转换查询需要的列, 为空时转换全部列. Defaults to None.
+
+        Returns:
+            polars.LazyFrame: 查询计划的起点
+        """
+
+        pl = cls.module()
+        if columns is not None:
+            df = df.loc[:, list(dict.fromkeys(columns))]
+        lf = pl.from_pandas(df).lazy()
+        if keys:
+            lf = lf.with_columns(pl.col(col).cast(pl.String) for col in keys)
+        return lf
+
+
+    @classmethod
+    def contains(cls, col: str, routes: frozenset[str]):
+        """线路列是否属于给定的线路集合, 与 RouteIndex.contains 一致, 空值不属于任何集合
+
+        Args:
+            col (str): 线路列, 需要已转换为字符串
+            routes (frozenset[str]): 线路集合
+
+        Returns:
+            polars.Expr: 筛选条件
+        """
+
+        pl = cls.module()
+        return pl.col(col).is_in(sorted(routes)).fill_null(False)
+
+
+    @classmethod
+    def collect(cls, lf, dtypes: dict[str, object]) -> pd.DataFrame:
+        """执行查询计划并转换为 pandas, 列类型还原为 pandas 流程中的类型
+
+        各报表在 report_production_lazy 的末尾调用一次, 结果供下游报表与工作簿写入使用.
+
+        Args:
+            lf (polars.LazyFrame): 查询计划
+            dtypes (dict[str, object]): 列名对应的类型
+
+        Returns:
+            pd.DataFrame: 查询结果
+        """
+
+        return cls.restore(lf.collect().to_pandas(), dtypes)
@@ -0,0 +1,329 @@
+import os
+import sys
+import pandas as pd
+import logging
+import hashlib
+import threading
+import weakref
+import json
+import time
+
+from pathlib import Path
+from typing import Callable
+
+from config.config import Config, LazyConfig
+from src.dataprocess.Fingerprint import FileFingerprint
+
+
+class ReportCache():
+    """制作完成的报表的跨运行缓存, 以报表的全部输入作为缓存键
+
+    输入包括: 报表使用的文件内容哈希、报表类声明的配置项、各报表共用的配置项、依赖的 GPT 报表内容哈希,
+    以及报表模块与 src/dataprocess 下全部模块的源文件、pandas 版本. 输入不变时直接加载上次的结果, 跳过读取与制作.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    # 各报表共用、会影响报表结果的配置项
+    SHARED: tuple[str, ...] = ("schema", "categories", "thresholds", "lookup", "reader", "backend", "inventory")
+
+    # 源文件路径对应的哈希, 进程内只计算一次
+    _sources: dict[str, str] = dict()
+
+    def __init__(self):
+        """初始化 ReportCache 类实例
+        """
+
+        self.settings: dict = self.config.memo
+        self.dir_path: Path = Path(self.config.datapath) / self.settings['dir']
+        self.enabled: bool = self.settings['enabled'] and self._has_parquet()
+        # 文件清单中本次运行已计算好的指纹, 不再重复读取文件计算哈希
+        self.fingerprints: dict[str, FileFingerprint] = dict()
+        # GPT 报表的内容哈希, 同一个 GPT 报表被多个下游报表使用时只计算一次; 报表释放后条目随之删除
+        self._digests: dict[int, tuple[weakref.ref, str]] = dict()
+        self._lock: threading.Lock = threading.Lock()
+
+        if self.enabled:
+            self.dir_path.mkdir(parents=True, exist_ok=True)
+
+
+    def _has_parquet(self) -> bool:
+        """检查 Parquet 读写依赖是否可用
+
+        Returns:
+            bool: 是否可用
+        """
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.logger.warning("未安装 pyarrow, 报表缓存不可用.")
+            return False
+        return True
+
+
+    def file_digest(self, path: Path) -> str:
+        """获取文件内容哈希, 优先使用文件清单中的结果
+
+        Args:
+            path (Path): 文件路径
+
+        Returns:
+            str: 十六进制哈希字符串
+        """
+
+        return FileFingerprint.known_digest(path, self.fingerprints)
+
+
+    def frame_digest(self, df: pd.DataFrame) -> str:
+        """计算报表的内容哈希, 包括列名、列类型与全部值
+
+        Args:
+            df (pd.DataFrame): 报表
+
+        Returns:
+            str: 十六进制哈希字符串
+        """
+
+        with self._lock:
+            known = self._digests.get(id(df))
+        if known is not None and known[0]() is df:
+            return known[1]
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()], ensure_ascii=False).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        digest = h.hexdigest()
+
+        with self._lock:
+            self._digests[id(df)] = (weakref.ref(df), digest)
+        weakref.finalize(df, self._digests.pop, id(df), None)
+        return digest
+
+
+    @classmethod
+    def code_digest(cls, report: type | None = None) -> str:
+        """报表代码的哈希: 报表模块与其依赖的 src/dataprocess 下全部模块(读取、类型转换、索引、TopN、各后端等)的源文件
+
+        修改报表或其依赖的逻辑后旧的缓存自动失效.
+        源文件不可读(如打包后运行)时改用可执行文件的大小与修改时间, 重新打包后同样失效.
+
+        Args:
+            report (type | None, optional): 报表类, 为空时包括 src/report 下全部报表模块. Defaults to None.
+
+        Returns:
+            str: 十六进制哈希字符串
+        """
+
+        here = Path(__file__).resolve().parent
+        if report is None:
+            modules = sorted((here.parent / "report").glob("*.py"))
+        else:
+            modules = [Path(getattr(sys.modules[report.__module__], "__file__", "") or "")]
+        files = modules + sorted(here.glob("*.py"))
+
+        h = hashlib.blake2b(digest_size=16)
+        try:
+            for path in files:
+                key = str(path)
+                if key not in cls._sources:
+                    cls._sources[key] = FileFingerprint.file_digest(path)
+                h.update(f"{path.name}:{cls._sources[key]};".encode("utf-8"))
+        except OSError:
+            executable = FileFingerprint.from_path(sys.executable, digest=False)
+            return f"{executable.size}-{executable.mtime}"
+
+        return h.hexdigest()
+
+
+    def key(self, name: str, report: type, path: list[Path], gpt: pd.DataFrame | None = None) -> str:
+        """根据报表的全部输入生成缓存条目名称
+
+        Args:
+            name (str): 报表名称
+            report (type): 报表类, 需要提供 settings 方法声明依赖的配置项
+            path (list[Path]): 报表需要的表格路径
+            gpt (pd.DataFrame | None, optional): 依赖的 GPT 报表, GPT 报表本身为空. Defaults to None.
+
+        Returns:
+            str: 缓存条目名称
+        """
+
+        inputs = {
+            "report": name,
+            "code": self.code_digest(report),
+            "pandas": pd.__version__,
+            "files": sorted((Path(p).name, self.file_digest(p)) for p in path),
+            "settings": report.settings(),
+            "shared": {section: getattr(self.config, section) for section in self.SHARED},
+            "gpt": None if gpt is None else self.frame_digest(gpt),
+        }
+        raw = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+    def _meta(self, entry: str) -> dict | None:
+        """读取缓存条目的元数据
+
+        Args:
+            entry (str): 缓存条目名称
+
+        Returns:
+            dict | None: 元数据, 不存在或损坏时为 None
+        """
+
+        meta_path = self.dir_path / f"{entry}.json"
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+
+    def _write_meta(self, entry: str, meta: dict) -> None:
+        """写入缓存条目的元数据
+
+        先写入临时文件再替换, 中途失败不会留下不完整的元数据.
+
+        Args:
+            entry (str): 缓存条目名称
+            meta (dict): 元数据
+        """
+
+        path = self.dir_path / f"{entry}.json"
+        tmp_path = path.with_name(f"{entry}.{threading.get_ident()}.json.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"报表缓存元数据写入失败: {meta.get('report', entry)}, {e}")
+
+
+    def load(self, entry: str) -> pd.DataFrame | None:
+        """加载缓存的报表
+
+        Args:
+            entry (str): 缓存条目名称
+
+        Returns:
+            pd.DataFrame | None: 报表, 未命中时为 None
+        """
+
+        meta = self._meta(entry)
+        data_path = self.dir_path / f"{entry}.parquet"
+        if meta is None or not data_path.exists():
+            return None
+
+        try:
+            df = pd.read_parquet(data_path)
+        except Exception as e:
+            self.logger.warning(f"报表缓存读取失败, 重新制作: {meta['report']}, {e}")
+            self._remove(entry)
+            return None
+
+        meta['accessed'] = time.time()
+        self._write_meta(entry, meta)
+
+        return df
+
+
+    def save(self, entry: str, name: str, df: pd.DataFrame) -> None:
+        """将报表写入缓存
+
+        先写入临时文件再替换, 补跑时多天输入相同的报表同时写入也不会留下不完整的文件.
+
+        Args:
+            entry (str): 缓存条目名称
+            name (str): 报表名称
+            df (pd.DataFrame): 报表
+        """
+
+        data_path = self.dir_path / f"{entry}.parquet"
+        tmp_path = self.dir_path / f"{entry}.{threading.get_ident()}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, data_path)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"报表缓存写入失败, 跳过该报表: {name}, {e}")
+            return
+
+        now = time.time()
+        self._write_meta(entry, {"report": name, "rows": len(df), "created": now, "accessed": now})
+
+
+    def run(self, name: str, report: type, path: list[Path], produce: Callable[[], pd.DataFrame], gpt: pd.DataFrame | None = None) -> pd.DataFrame:
+        """输入不变时加载缓存的报表, 否则制作报表并写入缓存
+
+        Args:
+            name (str): 报表名称
+            report (type): 报表类
+            path (list[Path]): 报表需要的表格路径
+            produce (Callable[[], pd.DataFrame]): 制作报表的函数
+            gpt (pd.DataFrame | None, optional): 依赖的 GPT 报表. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 报表
+        """
+
+        if not self.enabled:
+            return produce()
+
+        entry = self.key(name, report, path, gpt)
+        df = self.load(entry)
+        if df is not None:
+            self.logger.info(f"报表缓存命中: {name}")
+            return df
+
+        self.logger.info(f"报表缓存未命中: {name}, 重新制作")
+        df = produce()
+        self.save(entry, name, df)
+
+        return df
+
+
+    def evict(self) -> None:
+        """按最近访问时间清理条目, 将缓存总大小控制在上限以内
+        """
+
+        if not self.enabled:
+            return
+
+        max_size = self.settings['max_size_mb'] * 1024 * 1024
+
+        entries: list[tuple[float, int, str]] = list()
+        for meta_path in self.dir_path.glob("*.json"):
+            entry = meta_path.stem
+            data_path = self.dir_path / f"{entry}.parquet"
+            meta = self._meta(entry)
+            if meta is None or not data_path.exists():
+                self._remove(entry)
+                continue
+            entries.append((meta['accessed'], data_path.stat().st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= max_size:
+                break
+            self._remove(entry)
+            total -= size
+            removed += 1
+
+        self.logger.info(f"报表缓存清理完成, 移除 {removed} 个条目, 当前占用 {total / 1024 / 1024:.1f} MB.")
+
+
+    def _remove(self, entry: str) -> None:
+        """删除一个缓存条目
+
+        Args:
+            entry (str): 缓存条目名称
+        """
+
+        for suffix in (".parquet", ".json"):
+            (self.dir_path / f"{entry}{suffix}").unlink(missing_ok=True)
@@ -0,0 +1,198 @@
+import pandas as pd
+import logging
+import time
+import os
+import zipfile
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+
+
+class ReportWriter():
+    """基于 xlsxwriter constant_memory 模式的流式报表写入器
+
+    每个工作表按行顺序写出后即落盘; 数据按固定行数分块转换为 Python 对象, 内存占用与行数无关.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, file: str | Path):
+        """初始化 ReportWriter 类实例
+
+        Args:
+            file (str | Path): 输出的工作簿路径
+        """
+
+        from xlsxwriter import Workbook
+
+        self.file: Path = Path(file)
+        self.settings: dict = self.config.writer
+        self.workbook = Workbook(str(self.file), {
+            "constant_memory": True,
+            "default_date_format": self.settings['date_format'],
+        })
+        self.header_format = self.workbook.add_format(self.settings['header_format'])
+        self.formats: dict[str, object] = dict()
+        self.stats: list[dict] = list()
+
+
+    def __enter__(self) -> 'ReportWriter':
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+    @staticmethod
+    def _text_width(value: object) -> int:
+        """估算单元格显示宽度, 中文字符按两个字符计算
+
+        Args:
+            value (object): 单元格的值
+
+        Returns:
+            int: 显示宽度
+        """
+
+        text = str(value)
+        return sum(2 if ord(ch) > 0x2E80 else 1 for ch in text)
+
+
+    def _column_widths(self, df: pd.DataFrame) -> list[int]:
+        """根据表头与前若干行估算列宽, 不需要额外遍历全部数据
+
+        Args:
+            df (pd.DataFrame): 报表
+
+        Returns:
+            list[int]: 每一列的宽度
+        """
+
+        sample = df.head(self.settings['width_sample_rows'])
+        widths: list[int] = list()
+        for i, col in enumerate(df.columns):
+            width = self._text_width(col)
+            for value in sample.iloc[:, i]:
+                if not pd.isna(value):
+                    width = max(width, self._text_width(value))
+            widths.append(min(width + 2, self.settings['max_width']))
+
+        return widths
+
+
+    def _format(self, num_format: str | None):
+        """获取数字格式对应的单元格格式, 相同格式只创建一次
+
+        Args:
+            num_format (str | None): Excel 数字格式
+
+        Returns:
+            Format | None: 单元格格式
+        """
+
+        if num_format is None:
+            return None
+        if num_format not in self.formats:
+            self.formats[num_format] = self.workbook.add_format({"num_format": num_format})
+        return self.formats[num_format]
+
+
+    def num_formats(self, columns: list[str]) -> dict[str, str]:
+        """按配置文件为各列匹配 Excel 数字格式, 配置的键包含在列名中即视为匹配
+
+        Args:
+            columns (list[str]): 列名列表
+
+        Returns:
+            dict[str, str]: 列名对应的数字格式
+        """
+
+        formats: dict[str, str] = dict()
+        for col in columns:
+            for key, num_format in self.settings['num_formats'].items():
+                if key in str(col):
+                    formats[col] = num_format
+                    break
+
+        return formats
+
+
+    def write_sheet(self, df: pd.DataFrame, sheet_name: str, num_formats: dict[str, str] | None = None) -> None:
+        """将报表逐行写入新的工作表
+
+        百分比等指标以数值写入, 显示格式通过 Excel 数字格式设置, 写出后仍可排序和筛选.
+        每次只转换 writer.chunk_rows 行, 写出后即释放.
+
+        Args:
+            df (pd.DataFrame): 报表
+            sheet_name (str): 工作表名称
+            num_formats (dict[str, str] | None, optional): 列名对应的 Excel 数字格式, 为空时按配置文件匹配. Defaults to None.
+        """
+
+        start = time.perf_counter()
+        if num_formats is None:
+            num_formats = self.num_formats(list(df.columns))
+
+        ws = self.workbook.add_worksheet(sheet_name)
+        for i, width in enumerate(self._column_widths(df)):
+            ws.set_column(i, i, width)
+
+        for i, col in enumerate(df.columns):
+            ws.write_string(0, i, str(col), self.header_format)
+
+        formats = [self._format(num_formats.get(col)) for col in df.columns]
+        chunk_rows = self.settings['chunk_rows']
+
+        for begin in range(0, len(df), chunk_rows):
+            chunk = df.iloc[begin:begin + chunk_rows]
+            columns = [chunk.iloc[:, c].astype(object).where(chunk.iloc[:, c].notna(), None).tolist() for c in range(chunk.shape[1])]
+            for r, row in enumerate(zip(*columns), start=begin + 1):
+                for c, value in enumerate(row):
+                    if value is None:
+                        continue
+                    if isinstance(value, str):
+                        ws.write_string(r, c, value, formats[c])
+                    else:
+                        ws.write(r, c, value, formats[c])
+
+        elapsed = time.perf_counter() - start
+        self.stats.append({"sheet": sheet_name, "rows": len(df), "columns": df.shape[1], "seconds": elapsed, "bytes": None})
+        self.logger.info(f"工作表 {sheet_name} 写入完成, {len(df)} 行 {df.shape[1]} 列, 耗时 {elapsed:.2f} 秒.")
+
+
+    def sheet_bytes(self) -> list[int]:
+        """读取已关闭的工作簿中各工作表压缩后的字节数
+
+        constant_memory 模式下工作表数据先写入临时文件, 关闭时才压缩进工作簿, 因此只能在关闭后按 zip 条目统计.
+
+        Returns:
+            list[int]: 按写入顺序排列的各工作表字节数
+        """
+
+        with zipfile.ZipFile(self.file) as z:
+            return [z.getinfo(f"xl/worksheets/sheet{i}.xml").compress_size for i in range(1, len(self.stats) + 1)]
+
+
+    def close(self) -> list[dict]:
+        """关闭工作簿并输出写入统计
+
+        Returns:
+            list[dict]: 每个工作表的写入统计
+        """
+
+        start = time.perf_counter()
+        self.workbook.close()
+        elapsed = time.perf_counter() - start
+
+        for stat, size in zip(self.stats, self.sheet_bytes()):
+            stat['bytes'] = size
+            self.logger.info(f"工作表 {stat['sheet']}: {size / 1024:.1f} KB.")
+
+        size = os.path.getsize(self.file)
+        total = sum(s['seconds'] for s in self.stats) + elapsed
+        self.logger.info(f"报表写入完成: {self.file.name}, {size / 1024:.1f} KB, 总耗时 {total:.2f} 秒.")
+
+        return self.stats
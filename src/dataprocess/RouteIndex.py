@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import logging
+
+from config.config import Config, LazyConfig
+
+
+class RouteIndex():
+    """由 GPT 报表一次性构建的线路-环节索引
+
+    每个环节保存占比超过阈值的线路集合, 各报表通过 contains 判断明细行的线路是否需要关注,
+    不再各自筛选 GPT 报表.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, routes: frozenset[str], stages: dict[str, frozenset[str]]):
+        """初始化 RouteIndex 类实例
+
+        Args:
+            routes (frozenset[str]): GPT 报表中的全部线路
+            stages (dict[str, frozenset[str]]): 环节占比列对应的超过阈值的线路集合
+        """
+
+        self.routes: frozenset[str] = routes
+        self.stages: dict[str, frozenset[str]] = stages
+
+
+    @classmethod
+    def from_gpt(cls, gpt: pd.DataFrame, thresholds: dict[str, float] | None = None) -> 'RouteIndex':
+        """由 GPT 报表构建索引
+
+        Args:
+            gpt (pd.DataFrame): GPT 报表
+            thresholds (dict[str, float] | None, optional): 环节占比列对应的阈值, 为空时使用配置文件中的值. Defaults to None.
+
+        Returns:
+            RouteIndex: 线路-环节索引
+        """
+
+        thresholds = thresholds if thresholds is not None else cls.config.thresholds
+        route = gpt['城市线路'].astype(object)
+        routes = frozenset(str(r) for r in route.dropna())
+
+        stages: dict[str, frozenset[str]] = dict()
+        for stage, threshold in thresholds.items():
+            flagged = route[gpt[stage] > threshold].dropna()
+            stages[stage] = frozenset(str(r) for r in flagged)
+
+        summary = ", ".join(f"{stage} {len(flagged)}" for stage, flagged in stages.items())
+        cls.logger.info(f"线路索引构建完成, 共 {len(routes)} 条线路, 各环节需关注线路数: {summary}.")
+
+        return cls(routes, stages)
+
+
+    def flagged(self, stage: str | None = None) -> frozenset[str]:
+        """获取某一环节需要关注的线路
+
+        Args:
+            stage (str | None, optional): 环节占比列, 为空时返回全部线路. Defaults to None.
+
+        Returns:
+            frozenset[str]: 线路集合
+        """
+
+        if stage is None:
+            return self.routes
+        if stage not in self.stages:
+            raise KeyError(f"线路索引中没有环节 {stage}, 请检查配置文件中的 thresholds.")
+        return self.stages[stage]
+
+
+    def stages_of(self, route: str) -> list[str]:
+        """获取一条线路需要关注的全部环节
+
+        Args:
+            route (str): 线路名称
+
+        Returns:
+            list[str]: 环节占比列列表
+        """
+
+        return [stage for stage, flagged in self.stages.items() if route in flagged]
+
+
+    def contains(self, values: pd.Series, stage: str | None = None) -> pd.Series:
+        """判断每一行的线路是否属于某一环节需要关注的线路
+
+        分类列只对类别逐一查找, 再按编码映射到各行.
+
+        Args:
+            values (pd.Series): 线路列
+            stage (str | None, optional): 环节占比列, 为空时使用全部线路. Defaults to None.
+
+        Returns:
+            pd.Series: 布尔掩码
+        """
+
+        flagged = self.flagged(stage)
+
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            lookup = np.fromiter((str(c) in flagged for c in values.cat.categories), dtype=bool,
+                                 count=len(values.cat.categories))
+            codes = values.cat.codes.to_numpy()
+            mask = np.zeros(len(values), dtype=bool)
+            valid = codes >= 0
+            mask[valid] = lookup[codes[valid]]
+            return pd.Series(mask, index=values.index)
+
+        return values.notna() & values.astype(str).isin(list(flagged))
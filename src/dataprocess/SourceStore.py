@@ -0,0 +1,490 @@
+import pandas as pd
+import logging
+import threading
+import importlib.util
+import time
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config.config import Config, LazyConfig
+from src.dataprocess.CategoryRegistry import CategoryRegistry
+from src.dataprocess.ColumnSchema import ColumnSchema
+from src.dataprocess.CsvReader import CsvReader
+from src.dataprocess.DiskCache import DiskCache
+from src.dataprocess.Fingerprint import FileFingerprint
+from src.dataprocess.LookupIndex import LookupIndex
+from src.dataprocess.StreamReader import StreamReader
+
+
+class SourceStore():
+    """单次运行内共享的源文件缓存, 每个文件只解析一次
+
+    读取是线程安全的: 同一文件的并发读取只会解析一次, 不同文件可以并行解析.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    # calamine 引擎支持的文件格式
+    CALAMINE_SUFFIXES: set[str] = {".xlsx", ".xlsm", ".xlsb", ".xls", ".ods"}
+    # xlsx/ods(zip) 与 xls(OLE) 文件头
+    EXCEL_MAGIC: tuple[bytes, ...] = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")
+
+    def __init__(self, report_path: dict[str, list[Path]] | None = None, fingerprints: dict[str, FileFingerprint] | None = None):
+        """初始化 SourceStore 类实例
+
+        Args:
+            report_path (dict[str, list[Path]] | None, optional): DataRead.run() 返回的类别对应路径字典. Defaults to None.
+            fingerprints (dict[str, FileFingerprint] | None, optional): 文件清单中的文件指纹, 供磁盘缓存校验使用. Defaults to None.
+        """
+
+        self.report_path: dict[str, list[Path]] = report_path or dict()
+        self.frames: dict[tuple, pd.DataFrame] = dict()
+        self.indexes: dict[tuple, LookupIndex] = dict()
+        self.scopes: dict[tuple, tuple[set[str], list[dict] | None]] = dict()
+        self.demands: dict[tuple, list[tuple[list[str], dict | None]]] = dict()
+        self.sources: dict[tuple, tuple[Path, dict]] = dict()
+        # 文件对应的逻辑表名(登记需求时的文件名关键字), 文件名中的日期等变化不影响表名
+        self.tables: dict[Path, str] = dict()
+        self.reader: StreamReader = StreamReader()
+        self.csv_reader: CsvReader = CsvReader()
+        self.disk: DiskCache = DiskCache()
+        self.disk.fingerprints.update(fingerprints or dict())
+        self.registry: CategoryRegistry = CategoryRegistry()
+        self.schema: ColumnSchema = ColumnSchema()
+        self.engine: str = self.resolve_engine(self.config.reader['engine'])
+        self.hits: int = 0
+        self.misses: int = 0
+        self.lock: threading.Lock = threading.Lock()
+        self.key_locks: dict[tuple, threading.Lock] = dict()
+
+        if self.report_path:
+            files = {p for paths in self.report_path.values() for p in paths}
+            self.logger.info(f"源文件缓存初始化完成, 共涉及 {len(files)} 个文件.")
+
+
+    @classmethod
+    def resolve_engine(cls, engine: str) -> str:
+        """确定实际使用的 Excel 解析引擎
+
+        auto 在安装了 python-calamine 时使用 calamine, 否则使用 openpyxl;
+        指定 calamine 但未安装时同样回退到 openpyxl.
+
+        Args:
+            engine (str): 配置的引擎, 可选 auto / calamine / openpyxl
+
+        Returns:
+            str: 实际使用的引擎
+
+        Raises:
+            ValueError: 不支持的引擎名称
+        """
+
+        if engine not in ("auto", "calamine", "openpyxl"):
+            raise ValueError(f"不支持的解析引擎: {engine}")
+
+        if engine == "openpyxl":
+            return engine
+
+        if importlib.util.find_spec("python_calamine") is not None:
+            return "calamine"
+
+        if engine == "calamine":
+            cls.logger.warning("未安装 python-calamine, 解析引擎回退到 openpyxl.")
+        return "openpyxl"
+
+
+    @classmethod
+    def is_excel(cls, path: Path) -> bool:
+        """根据文件头判断是否为 Excel 文件, 不依赖扩展名
+
+        部分导出的 .csv 文件实际是 Excel 格式, 因此需要按内容识别.
+
+        Args:
+            path (Path): 文件路径
+
+        Returns:
+            bool: 是否为 Excel 文件
+        """
+
+        with open(path, "rb") as f:
+            head = f.read(4)
+        return head in cls.EXCEL_MAGIC
+
+
+    @staticmethod
+    def _key(path: Path, read_kwargs: dict) -> tuple:
+        """生成缓存键, 同一文件不同的读取参数视为不同的数据源
+
+        Args:
+            path (Path): 文件路径
+            read_kwargs (dict): 传给 pd.read_excel 的参数
+
+        Returns:
+            tuple: 缓存键
+        """
+
+        return (Path(path).resolve(), tuple(sorted((k, repr(v)) for k, v in read_kwargs.items())))
+
+
+    def declare(self, path_list: list[Path], demand: dict[str, dict]) -> None:
+        """登记报表对文件的列需求与行过滤条件, 解析文件时会按全部登记的需求统一裁剪
+
+        Args:
+            path_list (list[Path]): 报表涉及的文件路径
+            demand (dict[str, dict]): 文件名关键字对应的读取参数, 包含 columns 与可选的 filters
+        """
+
+        for p in path_list:
+            for keyword, spec in demand.items():
+                if keyword in p.name:
+                    need = (spec['columns'], spec.get('filters'))
+                    read_kwargs = {k: v for k, v in spec.items() if k not in ("columns", "filters")}
+                    key = self._key(p, read_kwargs)
+                    with self.lock:
+                        self.sources.setdefault(key, (Path(p), read_kwargs))
+                        self.tables.setdefault(key[0], keyword)
+                        needs = self.demands.setdefault(key, list())
+                        if need not in needs:
+                            needs.append(need)
+
+
+    def _scope(self, key: tuple, need: tuple[list[str] | None, dict | None] | None = None) -> tuple[set[str] | None, list[dict] | None]:
+        """合并文件上全部已登记的需求, 得到需要解析的列与下推的行过滤条件
+
+        只要有一个需求不带行过滤条件, 就不做行过滤下推.
+
+        Args:
+            key (tuple): 缓存键
+            need (tuple[list[str] | None, dict | None] | None, optional): 本次读取需要的列与行过滤条件. Defaults to None.
+
+        Returns:
+            tuple[set[str] | None, list[dict] | None]: 需要解析的列(为空表示全部列)与行过滤条件
+        """
+
+        demands = self.demands.get(key, list()) + ([need] if need is not None else [])
+
+        if any(cols is None for cols, _ in demands):
+            scope_cols = None
+        else:
+            scope_cols = {col for cols, f in demands for col in cols + list(f or {})}
+
+        if any(not f for _, f in demands):
+            scope_filters = None
+        else:
+            scope_filters = list()
+            for _, f in demands:
+                if f not in scope_filters:
+                    scope_filters.append(f)
+
+        return scope_cols, scope_filters
+
+
+    @staticmethod
+    def _covers(scope: tuple[set[str] | None, list[dict] | None], columns: list[str] | None, filters: dict | None) -> bool:
+        """判断已缓存的数据能否满足本次读取
+
+        Args:
+            scope (tuple[set[str] | None, list[dict] | None]): 缓存数据解析时使用的列与行过滤条件
+            columns (list[str] | None): 本次读取需要的列
+            filters (dict | None): 本次读取的行过滤条件
+
+        Returns:
+            bool: 能否直接使用缓存
+        """
+
+        scope_cols, scope_filters = scope
+        need = set(columns or []) | set(filters or {})
+
+        if scope_cols is not None and (columns is None or not need <= scope_cols):
+            return False
+        if scope_filters is not None and filters not in scope_filters:
+            return False
+        return True
+
+
+    def _parse(self, path: Path, columns: set[str] | None, filters: list[dict] | None, read_kwargs: dict) -> pd.DataFrame:
+        """解析文件, xlsx 使用流式读取器, 其余格式交给 pandas, 并按配置的列类型转换
+
+        启用磁盘缓存时, 按同样的列与行过滤条件解析后写入缓存, 之后需求不变时直接从缓存加载.
+
+        Args:
+            path (Path): 文件路径
+            columns (set[str] | None): 需要解析的列
+            filters (list[dict] | None): 下推的行过滤条件
+            read_kwargs (dict): 读取参数
+
+        Returns:
+            pd.DataFrame: 解析得到的数据
+        """
+
+        if self.disk.enabled:
+            cols = sorted(columns) if columns is not None else None
+            # 解析结果还取决于解析时的列类型与读取引擎, 配置变化后不能使用旧的条目
+            parse = {"dtype": self.schema.parse_dtypes(cols), "engine": self.engine}
+            df = self.disk.load(path, cols, filters, read_kwargs, parse)
+            if df is None:
+                df = self._parse_file(path, columns, filters, read_kwargs)
+                self.disk.save(path, df, cols, filters, read_kwargs, parse)
+            return self.schema.apply(df, path)
+
+        return self.schema.apply(self._parse_file(path, columns, filters, read_kwargs), path)
+
+
+    def _parse_file(self, path: Path, columns: set[str] | None, filters: list[dict] | None, read_kwargs: dict) -> pd.DataFrame:
+        """直接解析源文件
+
+        文本文件使用 CSV 读取器; calamine 引擎通过 pd.read_excel 读取; openpyxl 引擎下 xlsx 使用流式读取器.
+
+        Args:
+            path (Path): 文件路径
+            columns (set[str] | None): 需要解析的列
+            filters (list[dict] | None): 下推的行过滤条件
+            read_kwargs (dict): 读取参数
+
+        Returns:
+            pd.DataFrame: 解析得到的数据
+        """
+
+        suffix = Path(path).suffix.lower()
+        usecols = (lambda c: c in columns) if columns is not None else None
+        # string 列在解析时就以字符串读取, 不做类型推断
+        dtype = self.schema.parse_dtypes(sorted(columns) if columns is not None else None)
+
+        if not self.is_excel(path):
+            return self.csv_reader.read(
+                path,
+                sorted(columns) if columns is not None else None,
+                filters,
+                read_kwargs.get("skiprows"),
+                dtype
+            )
+
+        if self.engine == "calamine" and suffix in self.CALAMINE_SUFFIXES:
+            df = pd.read_excel(path, engine="calamine", usecols=usecols, dtype=dtype, **read_kwargs)
+            return StreamReader.filter_rows(df, filters)
+
+        if suffix == ".xlsx" and set(read_kwargs) <= {"skiprows"}:
+            return self.reader.read(
+                path,
+                sorted(columns) if columns is not None else None,
+                filters,
+                read_kwargs.get("skiprows"),
+                dtype
+            )
+
+        df = pd.read_excel(path, usecols=usecols, dtype=dtype, **read_kwargs)
+        return StreamReader.filter_rows(df, filters)
+
+
+    def read(self,
+             path: Path,
+             columns: list[str] | None = None,
+             filters: dict[str, list] | None = None,
+             **read_kwargs) -> pd.DataFrame:
+        """读取文件数据, 已解析过的文件直接从缓存返回
+
+        Args:
+            path (Path): 文件路径
+            columns (list[str] | None, optional): 需要的列, 为空时返回全部列. Defaults to None.
+            filters (dict[str, list] | None, optional): 行过滤条件, 列名对应允许的取值. Defaults to None.
+            **read_kwargs: 传给读取器的其他参数, 如 skiprows
+
+        Returns:
+            pd.DataFrame: 数据副本, 调用方可以自由修改而不影响缓存
+        """
+
+        key = self._key(path, read_kwargs)
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            frame = self.frames.get(key)
+            if frame is None or not self._covers(self.scopes[key], columns, filters):
+                with self.lock:
+                    self.misses += 1
+                self.logger.info(f"源文件缓存未命中, 开始解析: {Path(path).name}")
+                scope = self._scope(key, (columns, filters))
+                frame = self.registry.encode(self._parse(path, *scope, read_kwargs))
+                self.frames[key] = frame
+                self.scopes[key] = scope
+            else:
+                with self.lock:
+                    self.hits += 1
+                self.logger.info(f"源文件缓存命中: {Path(path).name}")
+
+        frame = StreamReader.filter_rows(frame, filters)
+
+        if columns is None:
+            return self.registry.align(frame.copy())
+
+        return self.registry.align(frame.loc[:, columns].copy())
+
+
+    def lookup(self,
+               path: Path,
+               key: str,
+               columns: list[str] | None = None,
+               filters: dict[str, list] | None = None,
+               **read_kwargs) -> LookupIndex:
+        """获取参考表的键索引, 同一文件同一键列在运行内只构建一次, 各报表共用
+
+        Args:
+            path (Path): 文件路径
+            key (str): 键列
+            columns (list[str] | None, optional): 需要的列, 为空时使用全部列. Defaults to None.
+            filters (dict[str, list] | None, optional): 行过滤条件. Defaults to None.
+            **read_kwargs: 传给读取器的其他参数, 如 skiprows
+
+        Returns:
+            LookupIndex: 键索引
+        """
+
+        index_key = (self._key(path, read_kwargs), key, tuple(columns or ()), repr(filters))
+        with self.lock:
+            key_lock = self.key_locks.setdefault(index_key, threading.Lock())
+
+        with key_lock:
+            index = self.indexes.get(index_key)
+            if index is None:
+                table = self.read(path, columns, filters, **read_kwargs)
+                index = LookupIndex(table, key, Path(path).name)
+                self.indexes[index_key] = index
+                self.logger.info(f"键索引构建完成: {Path(path).name}, 键 {key}, {len(index)} 行.")
+
+        return index
+
+
+    def prefetch(self, workers: int | None = None) -> None:
+        """在进程池中并行解析全部已登记的文件, 每个文件只解析登记过的列
+
+        单个文件预读取失败时只记录警告, 报表读取时会重新解析并抛出原始错误.
+
+        Args:
+            workers (int | None, optional): 进程数, 为空时使用配置文件中的值. Defaults to None.
+        """
+
+        workers = workers or self.config.prefetch['workers']
+        todo = [key for key in self.sources if key not in self.frames]
+        self.logger.info(f"源文件预读取开始, 共 {len(todo)} 个文件, 进程数 {workers}.")
+
+        timings: list[tuple[float, str]] = list()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = dict()
+            for key in todo:
+                path, read_kwargs = self.sources[key]
+                scope = self._scope(key)
+                futures[executor.submit(_parse_source, path, *scope, read_kwargs)] = (key, scope)
+
+            for future in as_completed(futures):
+                key, scope = futures[future]
+                name = self.sources[key][0].name
+                try:
+                    df, elapsed = future.result()
+                except Exception as e:
+                    self.logger.warning(f"预读取失败, 将在报表读取时重试: {name}, {e!r}")
+                    continue
+                with self.lock:
+                    self.frames[key] = self.registry.encode(df)
+                    self.scopes[key] = scope
+                    self.misses += 1
+                timings.append((elapsed, name))
+                self.logger.info(f"预读取完成: {name}, {len(df)} 行, 耗时 {elapsed:.2f} 秒.")
+
+        for elapsed, name in sorted(timings, reverse=True):
+            self.logger.info(f"    {elapsed:>8.2f} 秒  {name}")
+        self.logger.info(f"源文件预读取结束, 总耗时 {time.perf_counter() - start:.2f} 秒.")
+
+
+    def snapshot(self, path_list: list[Path] | None = None) -> dict[str, pd.DataFrame]:
+        """获取已解析的源文件数据, 以逻辑表名为键
+
+        逻辑表名为登记需求时的文件名关键字(如 线路罚款、派签), 每天带日期的导出文件对应同一张表;
+        未登记过需求的文件使用文件名(不含扩展名).
+
+        Args:
+            path_list (list[Path] | None, optional): 只返回这些文件的数据, 为空时返回全部. Defaults to None.
+
+        Returns:
+            dict[str, pd.DataFrame]: 逻辑表名对应的数据
+        """
+
+        resolved = {Path(p).resolve() for p in path_list} if path_list is not None else None
+        with self.lock:
+            items = [(key, frame) for key, frame in self.frames.items() if resolved is None or key[0] in resolved]
+
+        frames: dict[str, pd.DataFrame] = dict()
+        for key, frame in items:
+            frames.setdefault(self.tables.get(key[0], key[0].stem), frame)
+
+        return frames
+
+
+    def invalidate(self, path_list: list[Path]) -> None:
+        """丢弃指定文件已解析的数据, 保留登记的需求, 下次读取时重新解析; 监听模式下文件变化时调用
+
+        Args:
+            path_list (list[Path]): 文件路径
+        """
+
+        resolved = {Path(p).resolve() for p in path_list}
+        with self.lock:
+            for key in [key for key in self.frames if key[0] in resolved]:
+                self.frames.pop(key, None)
+                self.scopes.pop(key, None)
+            for key in [key for key in self.indexes if key[0][0] in resolved]:
+                self.indexes.pop(key, None)
+
+
+    def release(self, path_list: list[Path]) -> None:
+        """释放指定文件的缓存数据与登记的需求, 补跑时每天处理完成后调用, 共享的参考数据不受影响
+
+        Args:
+            path_list (list[Path]): 文件路径
+        """
+
+        resolved = {Path(p).resolve() for p in path_list}
+        with self.lock:
+            for key in [key for key in self.sources if key[0] in resolved]:
+                self.frames.pop(key, None)
+                self.scopes.pop(key, None)
+                self.demands.pop(key, None)
+                self.sources.pop(key, None)
+                self.key_locks.pop(key, None)
+            for key in [key for key in self.indexes if key[0][0] in resolved]:
+                self.indexes.pop(key, None)
+                self.key_locks.pop(key, None)
+            for path in resolved:
+                self.tables.pop(path, None)
+
+
+    def clear(self) -> None:
+        """清空缓存, 并输出本次运行的命中统计
+        """
+
+        self.logger.info(f"源文件缓存统计: 命中 {self.hits} 次, 未命中 {self.misses} 次, 缓存文件 {len(self.frames)} 个.")
+        self.frames.clear()
+        self.scopes.clear()
+        self.indexes.clear()
+        self.disk.evict()
+
+
+
+def _parse_source(path: Path, columns: set[str] | None, filters: list[dict] | None, read_kwargs: dict) -> tuple[pd.DataFrame, float]:
+    """在子进程中解析单个文件, 供 SourceStore.prefetch 使用
+
+    Args:
+        path (Path): 文件路径
+        columns (set[str] | None): 需要解析的列
+        filters (list[dict] | None): 下推的行过滤条件
+        read_kwargs (dict): 读取参数
+
+    Returns:
+        tuple[pd.DataFrame, float]: 解析得到的数据与耗时(秒)
+    """
+
+    start = time.perf_counter()
+    df = SourceStore()._parse(path, columns, filters, read_kwargs)
+    return df, time.perf_counter() - start
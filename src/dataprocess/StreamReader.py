@@ -0,0 +1,178 @@
+import pandas as pd
+import logging
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+
+
+class StreamReader():
+    """基于 openpyxl 只读模式的流式 xlsx 读取器, 解析时即完成列裁剪与行过滤
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, chunk_size: int | None = None):
+        """初始化 StreamReader 类实例
+
+        Args:
+            chunk_size (int | None, optional): 每个数据块的行数, 为空时使用配置文件中的值. Defaults to None.
+        """
+
+        self.chunk_size: int = chunk_size or self.config.reader['chunk_size']
+
+
+    @staticmethod
+    def _cell(value: object) -> object:
+        """与 pandas 的 openpyxl 引擎保持一致的单元格值转换
+
+        Args:
+            value (object): 单元格原始值
+
+        Returns:
+            object: 转换后的值
+        """
+
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and value == "":
+            return None
+        return value
+
+
+    @staticmethod
+    def _matcher(filters: list[dict[str, list]] | None, index: dict[str, int]):
+        """将行过滤条件编译为按列位置判断的函数
+
+        多组条件之间为"或"关系, 每组条件内部各列之间为"且"关系.
+
+        Args:
+            filters (list[dict[str, list]] | None): 行过滤条件
+            index (dict[str, int]): 列名对应的列位置
+
+        Returns:
+            Callable | None: 判断一行是否保留的函数, 没有过滤条件时为 None
+        """
+
+        if not filters:
+            return None
+
+        groups = [[(index[col], set(values)) for col, values in f.items()] for f in filters]
+
+        def match(row: tuple) -> bool:
+            return any(all(row[i] in values for i, values in group) for group in groups)
+
+        return match
+
+
+    @staticmethod
+    def filter_rows(df: pd.DataFrame, filters: list[dict] | dict | None) -> pd.DataFrame:
+        """按行过滤条件筛选数据
+
+        Args:
+            df (pd.DataFrame): 数据
+            filters (list[dict] | dict | None): 行过滤条件, 多组条件之间为"或"关系
+
+        Returns:
+            pd.DataFrame: 筛选后的数据
+        """
+
+        if not filters:
+            return df
+        if isinstance(filters, dict):
+            filters = [filters]
+
+        mask = pd.Series(False, index=df.index)
+        for f in filters:
+            group = pd.Series(True, index=df.index)
+            for col, values in f.items():
+                group &= df[col].isin(values)
+            mask |= group
+
+        return df.loc[mask]
+
+
+    def read(self,
+             path: Path,
+             columns: list[str] | None = None,
+             filters: list[dict[str, list]] | None = None,
+             skiprows: int | list[int] | None = None,
+             dtype: dict[str, str] | None = None) -> pd.DataFrame:
+        """流式读取 xlsx 文件的第一个工作表
+
+        Args:
+            path (Path): 文件路径
+            columns (list[str] | None, optional): 需要保留的列, 为空时保留全部列. Defaults to None.
+            filters (list[dict[str, list]] | None, optional): 行过滤条件, 如 [{"是否路由频次延误": ["是"]}]. Defaults to None.
+            skiprows (int | list[int] | None, optional): 表头之前需要跳过的行. Defaults to None.
+            dtype (dict[str, str] | None, optional): 以字符串读取的列, 值为 "str"; 其余列做类型推断. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 读取到的数据
+
+        Raises:
+            ValueError: 文件中缺少需要的列
+        """
+
+        if isinstance(skiprows, int):
+            skiprows = list(range(skiprows))
+        skip: set[int] = set(skiprows or [])
+
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+
+            header: list = []
+            for i, row in enumerate(rows):
+                if i not in skip:
+                    header = [self._cell(v) for v in row]
+                    break
+
+            index: dict[str, int] = dict()
+            for i, name in enumerate(header):
+                if name is not None and name not in index:
+                    index[str(name)] = i
+
+            columns = columns if columns is not None else list(index)
+            filter_cols = {col for f in (filters or []) for col in f}
+            missing = [col for col in list(columns) + sorted(filter_cols) if col not in index]
+            if missing:
+                raise ValueError(f"{Path(path).name} 中缺少需要的列: {missing}")
+
+            positions = [index[col] for col in columns]
+            match = self._matcher(filters, index)
+            width = len(header)
+
+            chunks: list[pd.DataFrame] = list()
+            buffer: list[list] = list()
+            for row in rows:
+                if not any(v is not None for v in row):
+                    continue
+                if len(row) < width:
+                    row = row + (None,) * (width - len(row))
+                if match is not None and not match(row):
+                    continue
+                buffer.append([self._cell(row[i]) for i in positions])
+                if len(buffer) >= self.chunk_size:
+                    chunks.append(pd.DataFrame(buffer, columns=columns))
+                    buffer = list()
+        finally:
+            wb.close()
+
+        if buffer or not chunks:
+            chunks.append(pd.DataFrame(buffer, columns=columns))
+
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        for col in (dtype or dict()):
+            if col in df.columns:
+                df[col] = df[col].astype(str).where(df[col].notna())
+        df = df.infer_objects()
+
+        self.logger.info(f"流式读取完成: {Path(path).name}, 保留 {len(columns)} 列 {len(df)} 行.")
+
+        return df
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import logging
+
+from config.config import Config, LazyConfig
+
+
+class TopN():
+    """按线路选出延误量最大的 N 个网点, 并计算这些网点的延误量总计
+
+    网点数不超过 N 的线路一次向量化判断后全部保留, 不参与排名. 网点数超过 N 的线路的行按线路编码分组,
+    一次 groupby().rank(method="first") 得到组内降序排名并保留前 N 行; 排名在 pandas 的编译代码中完成,
+    代价为 O(m log m)(m 为这些线路的行数), 没有逐条线路的 Python 循环.
+    延误量相同时保留靠前的行, 空值视为最小; 选出的行保持原有顺序.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, n: int):
+        """初始化 TopN 类实例
+
+        Args:
+            n (int): 每条线路保留的网点数
+
+        Raises:
+            ValueError: n 不是正整数
+        """
+
+        if not isinstance(n, int) or n < 1:
+            raise ValueError(f"每条线路保留的网点数必须是正整数: {n!r}")
+        self.n: int = n
+
+
+    @classmethod
+    def from_config(cls, report: str) -> 'TopN':
+        """按配置文件中 top_n 的设置创建
+
+        Args:
+            report (str): 报表名称, 如 submission、dispatch
+
+        Returns:
+            TopN: TopN 类实例
+        """
+
+        return cls(cls.config.top_n[report])
+
+
+    @property
+    def column(self) -> str:
+        """延误量总计的列名
+
+        Returns:
+            str: 列名, 如 Top5网点延误量总计
+        """
+
+        return f"Top{self.n}网点延误量总计"
+
+
+    def select(self, keys: pd.Series, values: pd.Series) -> np.ndarray:
+        """选出每条线路延误量最大的 N 行
+
+        Args:
+            keys (pd.Series): 线路列, 空值的行不会被选出
+            values (pd.Series): 延误量列
+
+        Returns:
+            np.ndarray: 布尔掩码
+        """
+
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            codes, count = keys.cat.codes.to_numpy(), len(keys.cat.categories)
+        else:
+            codes, uniques = pd.factorize(keys)
+            count = len(uniques)
+        mask = codes >= 0
+        sizes = np.bincount(codes[mask], minlength=max(count, 1))
+        rows = np.flatnonzero(mask & (sizes[np.where(mask, codes, 0)] > self.n))
+        if not len(rows):
+            return mask
+
+        # 只对网点数超过 N 的线路排名: 组内按延误量降序、相同时按出现顺序, 排名不超过 N 的行保留
+        filled = values.to_numpy(dtype="float64", na_value=np.nan)[rows]
+        filled[np.isnan(filled)] = -np.inf
+        rank = pd.Series(filled).groupby(codes[rows], sort=False).rank(method="first", ascending=False)
+        mask[rows] = rank.to_numpy() <= self.n
+        large = np.count_nonzero(sizes > self.n)
+
+        self.logger.debug(f"{large} 条线路的网点数超过 {self.n}, 保留 {int(mask.sum())} / {len(mask)} 行.")
+
+        return mask
+
+
+    def apply(self, details: pd.DataFrame, key: str = "城市线路名称", value: str = "延误量") -> pd.DataFrame:
+        """选出每条线路的前 N 个网点, 按线路排序并在第二列插入延误量总计
+
+        Args:
+            details (pd.DataFrame): 网点明细
+            key (str, optional): 线路列. Defaults to "城市线路名称".
+            value (str, optional): 延误量列. Defaults to "延误量".
+
+        Returns:
+            pd.DataFrame: 前 N 个网点的明细, 同一线路内保持原有顺序
+        """
+
+        top = details.loc[self.select(details[key], details[value])].reset_index(drop=True)
+        top[self.column] = top.groupby(key, observed=True)[value].transform("sum")
+        top = top.sort_values(by=key, kind="stable")
+
+        cols = list(top.columns)
+        cols.insert(1, cols.pop(cols.index(self.column)))
+
+        return top.loc[:, cols]
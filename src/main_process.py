@@ -1,87 +1,432 @@
 import pandas as pd
 import logging
+import hashlib
+import json
+import time
 
 from pathlib import Path
+from functools import partial, cache
 from datetime import datetime
+from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from config.config import Config
+from config.config import Config, LazyConfig
 from src.dataprocess.DataProcess import DataRead
-from src.report.GPT import GPT
-from src.report.RoutingDelay import RoutingDelay
-from src.report.TransportationDelay import TransportationDelay
-from src.report.InboundInventory import InboundInventory
-from src.report.OutboundInventory import OutboundInventory
-from src.report.SubmissionDelay import SubmissionDelay
-from src.report.DispatchDelay import DispatchDelay
+from src.dataprocess.Fingerprint import FileFingerprint
+from src.dataprocess.HistoryStore import HistoryStore
+from src.dataprocess.ReportCache import ReportCache
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.ReportWriter import ReportWriter
+from src.dataprocess.RouteIndex import RouteIndex
+from src.run_report import RunReport, count_rows
+from src.scheduler import Scheduler, Stage
 
 
 class MainProcess():
     """该项目的主流程逻辑
     """
     
-    config: Config = Config.from_json()
+    config: Config = LazyConfig()
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
     
-    def run(self) -> None:
-        """主运行方法
+    # GPT 之后的报表, 相互独立, 只依赖 GPT 报表与各自的文件
+    REPORTS: list[str] = [
+        "routing",          # 路由延误报表
+        "transportation",   # 干线运输延误报表
+        "center",           # 中心库存报表(出港与进港超时库存)
+        "submission",       # 交件延误报表
+        "dispatch",         # 派签延误报表
+    ]
+    
+    @staticmethod
+    @cache
+    def load_reports() -> dict[str, type]:
+        """导入全部报表类
+
+        报表模块在第一次使用时才导入, 缩短程序启动时间; 使用普通的导入语句, 打包时仍能被 PyInstaller 识别.
+
+        Returns:
+            dict[str, type]: 报表名称对应的报表类
         """
         
-        self.logger.info("-"*50)
-        self.logger.info("报表制作流程-开始.")
+        from src.report.GPT import GPT
+        from src.report.RoutingDelay import RoutingDelay
+        from src.report.TransportationDelay import TransportationDelay
+        from src.report.CenterInventory import CenterInventory
+        from src.report.SubmissionDelay import SubmissionDelay
+        from src.report.DispatchDelay import DispatchDelay
         
-        dataread: DataRead = DataRead()
-        report_path: dict[str, list[Path]] = dataread.run()
+        return {
+            "gpt": GPT,
+            "routing": RoutingDelay,
+            "transportation": TransportationDelay,
+            "center": CenterInventory,
+            "submission": SubmissionDelay,
+            "dispatch": DispatchDelay,
+        }
+    
+    
+    @staticmethod
+    def _run_gpt(report: type, path: list[Path], store: SourceStore, memo: ReportCache | None = None) -> tuple[pd.DataFrame, RouteIndex]:
+        """创建并运行 GPT 报表
+
+        Args:
+            report (type): 报表类
+            path (list[Path]): 报表需要的表格路径
+            store (SourceStore): 运行内共享的源文件缓存
+            memo (ReportCache | None, optional): 跨运行的报表缓存, 为空时不使用. Defaults to None.
+
+        Returns:
+            tuple[pd.DataFrame, RouteIndex]: GPT报表与线路-环节索引
+        """
         
-        # GPT报表
-        Gpt: GPT = GPT(report_path['gpt'])
-        gpt: pd.DataFrame = Gpt.run()
+        if memo is None:
+            return report(path, store).run()
         
-        # 路由延误报表
-        routingdelay: RoutingDelay = RoutingDelay(gpt, report_path['routing'])
-        routing: pd.DataFrame = routingdelay.run()
+        produced: tuple[pd.DataFrame, RouteIndex] | None = None
+        def produce() -> pd.DataFrame:
+            nonlocal produced
+            produced = report(path, store).run()
+            return produced[0]
         
-        # 干线运输延误报表
-        transportationdelay: TransportationDelay = TransportationDelay(gpt, report_path['transportation'])
-        transportation: pd.DataFrame = transportationdelay.run()
+        frame = memo.run("gpt", report, path, produce)
+        # 缓存命中时由缓存的 GPT 报表重新构建索引
+        return produced if produced is not None else (frame, RouteIndex.from_gpt(frame))
+    
+    
+    @staticmethod
+    def _run_report(report: type, path: list[Path], store: SourceStore, name: str, memo: ReportCache | None, gpt: tuple[pd.DataFrame, RouteIndex]) -> pd.DataFrame:
+        """创建并运行一个依赖 GPT 报表的报表
+
+        Args:
+            report (type): 报表类
+            path (list[Path]): 报表需要的表格路径
+            store (SourceStore): 运行内共享的源文件缓存
+            name (str): 报表名称
+            memo (ReportCache | None): 跨运行的报表缓存, 为空时不使用
+            gpt (tuple[pd.DataFrame, RouteIndex]): GPT报表与线路-环节索引
+
+        Returns:
+            pd.DataFrame: 报表
+        """
         
-        # 进港超时库存报表
-        inboundinventory: InboundInventory = InboundInventory(gpt, report_path['inbound'])
-        inbound: pd.DataFrame = inboundinventory.run()
+        frame, index = gpt
+        produce = lambda: report(frame, path, store, index).run()
+        if memo is None:
+            return produce()
+        return memo.run(name, report, path, produce, frame)
+    
+    
+    def stages(self, report_path: dict[str, list[Path]], store: SourceStore, memo: ReportCache | None = None) -> list[Stage]:
+        """构建报表流程的阶段依赖图
+
+        各报表的列需求在这里统一登记到 store 中, 保证共享文件按全部需求只解析一次.
+        传入 memo 时, 各阶段在输入(文件、配置与 GPT 报表)不变的情况下直接加载上次运行的报表.
+
+        Args:
+            report_path (dict[str, list[Path]]): 类别对应路径字典
+            store (SourceStore): 运行内共享的源文件缓存
+            memo (ReportCache | None, optional): 跨运行的报表缓存, 为空时不使用. Defaults to None.
+
+        Returns:
+            list[Stage]: 阶段列表
+        """
         
-        # 出港超时库存报表
-        outboundinventory: OutboundInventory = OutboundInventory(gpt, report_path['outbound'])
-        outbound: pd.DataFrame = outboundinventory.run()
+        reports = self.load_reports()
+        gpt = reports['gpt']
+        store.declare(report_path['gpt'], gpt.sources())
+        stages: list[Stage] = [Stage("gpt", partial(self._run_gpt, gpt, report_path['gpt'], store, memo))]
         
-        # 交件延误报表
-        submissiondelay: SubmissionDelay = SubmissionDelay(gpt, report_path['submission'])
-        submission: pd.DataFrame = submissiondelay.run()
+        for name in self.REPORTS:
+            report = reports[name]
+            path = report_path.get(name, list())
+            store.declare(path, report.sources())
+            stages.append(Stage(name, partial(self._run_report, report, path, store, name, memo), deps=["gpt"]))
         
-        # 派签延误报表
-        dispatchdelay: DispatchDelay = DispatchDelay(gpt, report_path['dispatch'])
-        dispatch: pd.DataFrame = dispatchdelay.run()
+        return stages
+    
+    
+    def run_date(self, report_path: dict[str, list[Path]], store: SourceStore) -> str:
+        """从"城市线路汇总-日"中读取本次数据的日期, 作为历史库的分区
+
+        Args:
+            report_path (dict[str, list[Path]]): 类别对应路径字典
+            store (SourceStore): 运行内共享的源文件缓存
+
+        Returns:
+            str: 日期, 格式为 YYYY-MM-DD
+
+        Raises:
+            FileNotFoundError: 没有找到"城市线路汇总-日"文件
+        """
         
-        file = rf"C:\Users\admin\Desktop\{datetime.now(): %m-%d}淘天线路时效GTP数据.xlsx"
+        demand = self.load_reports()['gpt'].sources()["城市线路汇总-日"]
+        for p in report_path['gpt']:
+            if "城市线路汇总-日" in p.name:
+                dates = pd.to_datetime(store.read(p, **demand)['日期'], errors="coerce").dropna().unique()
+                if len(dates) > 1:
+                    self.logger.warning(f"{p.name} 中包含多个日期, 以最新日期 {max(dates):%Y-%m-%d} 作为分区.")
+                if len(dates):
+                    return HistoryStore.normalize_date(max(dates))
         
-        with pd.ExcelWriter(file, engine="openpyxl", mode="w") as writer:
+        raise FileNotFoundError("没有找到'城市线路汇总-日'文件, 无法确定数据日期.")
+    
+    
+    def input_stamp(self, report_path: dict[str, list[Path]], store: SourceStore) -> str:
+        """本次运行的输入指纹: 全部输入文件的内容哈希、完整配置与报表代码
+
+        与历史库中记录的指纹一致时, 已有的报表才能直接沿用.
+
+        Args:
+            report_path (dict[str, list[Path]]): 类别对应路径字典
+            store (SourceStore): 源文件缓存, 使用其中文件清单的指纹避免重复计算哈希
+
+        Returns:
+            str: 十六进制哈希字符串
+        """
+        
+        paths = {Path(p) for paths in report_path.values() for p in paths}
+        inputs = {
+            "files": sorted((p.name, FileFingerprint.known_digest(p, store.disk.fingerprints)) for p in paths),
+            "config": asdict(self.config),
+            "code": ReportCache.code_digest(),
+            "pandas": pd.__version__,
+        }
+        raw = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    
+    
+    def load_history(self, history: HistoryStore, date: str) -> dict[str, pd.DataFrame]:
+        """从历史库读取某一日期已制作完成的全部报表
+
+        Args:
+            history (HistoryStore): 历史库
+            date (str): 日期
+
+        Returns:
+            dict[str, pd.DataFrame]: 报表名称对应的报表
+        """
+        
+        return {name: history.read_partition(name, date) for name in ["gpt", *self.REPORTS]}
+    
+    
+    def produce(self, stages: list[Stage], store: SourceStore, history: HistoryStore, date: str, path_list: list[Path] | None = None, report: RunReport | None = None, stamp: str | None = None) -> dict[str, pd.DataFrame]:
+        """制作全部报表, 并将输入数据与报表写入历史库
+
+        Args:
+            stages (list[Stage]): 报表流程的阶段列表
+            store (SourceStore): 运行内共享的源文件缓存
+            history (HistoryStore): 历史库
+            date (str): 数据日期
+            path_list (list[Path] | None, optional): 写入历史库的输入文件, 为空时写入 store 中的全部文件. Defaults to None.
+            report (RunReport | None, optional): 记录各阶段耗时的运行报告. Defaults to None.
+            stamp (str | None, optional): 本次运行的输入指纹, 随报表写入历史库. Defaults to None.
+
+        Returns:
+            dict[str, pd.DataFrame]: 报表名称对应的报表
+        """
+        
+        scheduler: Scheduler = Scheduler(stages)
+        results: dict[str, object] = scheduler.run()
+        if report is not None:
+            report.add_stages(scheduler.timings, results)
+        gpt, _ = results["gpt"]
+        reports: dict[str, pd.DataFrame] = {"gpt": gpt, **{name: results[name] for name in self.REPORTS}}
+        
+        history.save(date, reports, stamp)
+        if history.settings['inputs']:
+            history.save(date, {f"source-{table}": df for table, df in store.snapshot(path_list).items()})
+        
+        return reports
+    
+    
+    def write(self, results: dict[str, pd.DataFrame], file: str | Path) -> None:
+        """将全部报表写入工作簿
+
+        Args:
+            results (dict[str, pd.DataFrame]): 报表名称对应的报表
+            file (str | Path): 输出的工作簿路径
+        """
+        
+        with ReportWriter(file) as writer:
             # GPT
-            gpt_cols: list[str] = list(gpt.columns)
-            for col in gpt_cols:
-                if "占比" in col:
-                    gpt[col] = gpt[col].apply(lambda x: f"{x: .2%}")
-            gpt.to_excel(writer, sheet_name="GPT", index=False)
+            writer.write_sheet(results['gpt'], "GPT")
             # 路由
-            routing.to_excel(writer, sheet_name="路由", index=False)
+            writer.write_sheet(results['routing'], "路由")
             # 运输
-            transportation.to_excel(writer, sheet_name="运输", index=False)
+            writer.write_sheet(results['transportation'], "运输")
             # 交件
-            submission.to_excel(writer, sheet_name="交件", index=False)
+            writer.write_sheet(results['submission'], "交件")
             # 派签
-            dispatch.to_excel(writer, sheet_name="派签", index=False)
+            writer.write_sheet(results['dispatch'], "派签")
             # 中心库存
-            center:pd.DataFrame = pd.concat([outbound, inbound], axis=0, ignore_index=True)
-            center.to_excel(writer, sheet_name="中心库存", index=False)
+            writer.write_sheet(results['center'], "中心库存")
+    
+    
+    @staticmethod
+    def output_file(day: datetime) -> str:
+        """输出的工作簿路径
+
+        Args:
+            day (datetime): 工作簿名称中的日期
+
+        Returns:
+            str: 工作簿路径
+        """
+        
+        return rf"C:\Users\admin\Desktop\{day: %m-%d}淘天线路时效GTP数据.xlsx"
+    
+    
+    def run_day(self, report_path: dict[str, list[Path]], stages: list[Stage], store: SourceStore, history: HistoryStore, day: datetime | None = None, report: RunReport | None = None) -> str:
+        """制作一天的报表并写出工作簿, 历史库中已有该日期的报表且输入文件、配置与代码都未变化时直接读取
+
+        Args:
+            report_path (dict[str, list[Path]]): 类别对应路径字典
+            stages (list[Stage]): 报表流程的阶段列表
+            store (SourceStore): 源文件缓存
+            history (HistoryStore): 历史库
+            day (datetime | None, optional): 工作簿名称中的日期, 为空时使用当天. Defaults to None.
+            report (RunReport | None, optional): 运行报告, 为空时不单独保存. Defaults to None.
+
+        Returns:
+            str: 数据日期
+        """
+        
+        report = report or RunReport()
+        date: str = self.run_date(report_path, store)
+        report.date = date
+        stamp: str = self.input_stamp(report_path, store)
+        reuse: bool = history.settings['skip_existing'] and history.has(date, ["gpt", *self.REPORTS])
+        if reuse and history.stamp(date) != stamp:
+            self.logger.info(f"历史库中已有 {date} 的报表, 但输入文件、配置或代码已变化, 重新制作.")
+            reuse = False
+        if reuse:
+            self.logger.info(f"历史库中已有 {date} 的报表, 输入文件、配置与代码均未变化, 跳过报表制作.")
+            with report.step("history_load") as step:
+                results: dict[str, pd.DataFrame] = self.load_history(history, date)
+                step.rows_out = count_rows(results)
+        else:
+            path_list = [p for paths in report_path.values() for p in paths]
+            with report.step("report_production") as step:
+                results: dict[str, pd.DataFrame] = self.produce(stages, store, history, date, path_list, report, stamp)
+                step.rows_in = count_rows(store.snapshot(path_list))
+                step.rows_out = count_rows(results)
+        
+        rows = count_rows(results)
+        with report.step("export", rows_in=rows) as step:
+            self.write(results, self.output_file(day or datetime.now()))
+            step.rows_out = rows
+        
+        return date
+    
+    
+    def run(self) -> None:
+        """主运行方法
+        """
+        
+        self.logger.info("-"*50)
+        self.logger.info("报表制作流程-开始.")
+        
+        report: RunReport = RunReport()
+        with report.step("data_read"):
+            dataread: DataRead = DataRead()
+            report_path: dict[str, list[Path]] = dataread.run()
+        store: SourceStore = SourceStore(report_path, dataread.manifest.entries)
+        history: HistoryStore = HistoryStore()
+        memo: ReportCache = ReportCache()
+        memo.fingerprints.update(dataread.manifest.entries)
+        
+        stages: list[Stage] = self.stages(report_path, store, memo)
+        if self.config.prefetch['enabled']:
+            with report.step("prefetch"):
+                store.prefetch()
+        
+        self.run_day(report_path, stages, store, history, report=report)
         
+        store.clear()
+        memo.evict()
+        report.save()
         
         
         self.logger.info("报表制作流程-结束.")
-        self.logger.info("-"*50)
\ No newline at end of file
+        self.logger.info("-"*50)
+    
+    
+    def backfill(self, workers: int | None = None) -> dict[datetime, float | None]:
+        """补跑模式: 数据文件夹下每个日期子文件夹作为一个任务, 在线程池中并行制作, 每天输出一个工作簿
+
+        各天共用同一个源文件缓存, 城市对应中心等参考数据只解析一次; 每天完成后释放当天独有的文件.
+
+        Args:
+            workers (int | None, optional): 同时处理的天数, 为空时使用配置文件中的值. Defaults to None.
+
+        Returns:
+            dict[datetime, float | None]: 每天的耗时(秒), 失败的日期为 None
+        """
+        
+        self.logger.info("-"*50)
+        self.logger.info("补跑流程-开始.")
+        
+        folders: dict[datetime, Path] = DataRead().date_folders()
+        if not folders:
+            self.logger.warning(f"{self.config.datapath} 下没有按日期命名的子文件夹, 补跑结束.")
+            return dict()
+        
+        store: SourceStore = SourceStore()
+        history: HistoryStore = HistoryStore()
+        memo: ReportCache = ReportCache()
+        
+        jobs: dict[datetime, tuple[dict[str, list[Path]], list[Stage]]] = dict()
+        for day, folder in folders.items():
+            dataread = DataRead(folder)
+            report_path = dataread.run()
+            store.disk.fingerprints.update(dataread.manifest.entries)
+            memo.fingerprints.update(dataread.manifest.entries)
+            jobs[day] = (report_path, self.stages(report_path, store, memo))
+        
+        # 出现在多天中的文件(参考数据)在全部完成后再释放
+        counts: dict[Path, int] = dict()
+        for report_path, _ in jobs.values():
+            for p in {p for paths in report_path.values() for p in paths}:
+                counts[p] = counts.get(p, 0) + 1
+        shared: set[Path] = {p for p, n in counts.items() if n > 1}
+        
+        if self.config.prefetch['enabled']:
+            store.prefetch()
+        
+        def job(day: datetime) -> float:
+            start = time.perf_counter()
+            report_path, stages = jobs[day]
+            report = RunReport("backfill")
+            try:
+                self.run_day(report_path, stages, store, history, day, report)
+            finally:
+                store.release([p for paths in report_path.values() for p in paths if p not in shared])
+            report.save()
+            return time.perf_counter() - start
+        
+        timings: dict[datetime, float | None] = dict()
+        with ThreadPoolExecutor(max_workers=workers or self.config.backfill['workers']) as pool:
+            futures = {pool.submit(job, day): day for day in jobs}
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    timings[day] = future.result()
+                except Exception as e:
+                    timings[day] = None
+                    self.logger.error(f"{day:%Y-%m-%d} 补跑失败: {e!r}")
+        
+        store.clear()
+        memo.evict()
+        
+        self.logger.info("补跑耗时汇总:")
+        for day in sorted(timings):
+            elapsed = timings[day]
+            self.logger.info(f"  {day:%Y-%m-%d}  {'失败' if elapsed is None else f'{elapsed:.2f} 秒'}")
+        done = [t for t in timings.values() if t is not None]
+        self.logger.info(f"补跑完成 {len(done)}/{len(timings)} 天, 累计耗时 {sum(done):.2f} 秒.")
+        
+        self.logger.info("补跑流程-结束.")
+        self.logger.info("-"*50)
+        
+        return timings
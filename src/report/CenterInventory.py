@@ -0,0 +1,315 @@
+import numpy as np
+import pandas as pd
+import logging
+
+from pathlib import Path
+
+from config.config import Config, LazyConfig
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.RouteIndex import RouteIndex
+from src.dataprocess.LookupIndex import LookupIndex
+from src.dataprocess.Backend import Backend
+from src.dataprocess.DuckBackend import DuckBackend
+from src.dataprocess.PolarsBackend import PolarsBackend
+
+
+class CenterInventory():
+    """制作中心库存报表, 一次处理配置中的全部方向(出港、进港等)
+
+    各方向的明细合并后只做一次城市到发货中心的映射, 并按 (方向, 发货中心) 一次汇总;
+    之后每个方向关联各自的超时库存数据并追加汇总行. 新增方向只需在配置文件 inventory.方向 中添加.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, gpt: pd.DataFrame, path: list[Path], store: SourceStore | None = None, index: RouteIndex | None = None):
+        """初始化 CenterInventory 类实例
+
+        Args:
+            gpt (pd.DataFrame): GPT报表
+            path (list[Path]): 中心库存涉及表格的路径列表
+            store (SourceStore | None, optional): 运行内共享的源文件缓存. Defaults to None.
+            index (RouteIndex | None, optional): GPT 报表的线路-环节索引, 为空时由 gpt 构建. Defaults to None.
+        """
+
+        self.gpt = gpt
+        self.index: RouteIndex = index or RouteIndex.from_gpt(gpt)
+        self.inventory: dict[str, any] = self.config.inventory
+        self.directions: dict[str, dict] = self.inventory['方向']
+        self.path = path
+        self.store = store or SourceStore()
+        self.demand: dict[str, dict] = self.sources()
+        self.store.declare(self.path, self.demand)
+
+
+    @classmethod
+    def sources(cls) -> dict[str, dict]:
+        """CenterInventory 报表对各文件的读取需求, 只依赖配置文件
+
+        Returns:
+            dict[str, dict]: 文件名关键字对应的读取参数
+        """
+
+        demand = {"城市对应中心": {"columns": cls.config.inventory['城市对应中心']}}
+        for spec in cls.config.inventory['方向'].values():
+            demand[spec['明细文件']] = {"columns": ["城市线路名称", "揽收城市名称", spec['延误量']]}
+            demand[spec['库存文件']] = {"columns": ["中心名称", *spec['库存列']]}
+
+        return demand
+
+
+    @classmethod
+    def settings(cls) -> dict[str, object]:
+        """CenterInventory 报表依赖的配置项, 作为报表缓存键的一部分
+
+        Returns:
+            dict[str, object]: 配置项名称对应的值
+        """
+
+        return {"inventory": cls.config.inventory}
+
+
+    def data_read(self) -> list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]:
+        """读取制作报表需要的表格数据
+
+        Returns:
+            list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]: 各方向的环节明细、各方向按中心名称建立的超时库存索引与按城市建立的城市对应中心索引
+
+        Raises:
+            FileNotFoundError: 缺少某一方向的明细或超时库存文件
+        """
+
+        details: dict[str, pd.DataFrame] = dict()
+        inventories: dict[str, LookupIndex] = dict()
+        center: LookupIndex | None = None
+        for p in self.path:
+            for name, spec in self.directions.items():
+                if spec['明细文件'] in p.name:
+                    details[name] = self.store.read(p, **self.demand[spec['明细文件']])
+                if spec['库存文件'] in p.name:
+                    inventories[name] = self.store.lookup(p, "中心名称", **self.demand[spec['库存文件']])
+
+            if "城市对应中心" in p.name:
+                center = self.store.lookup(p, "城市", **self.demand["城市对应中心"])
+
+        missing = [name for name in self.directions if name not in details or name not in inventories]
+        if missing or center is None:
+            raise FileNotFoundError(f"中心库存报表缺少文件: 方向 {missing}{'' if center is not None else ', 城市对应中心'}")
+
+        self.logger.info("CenterInventory 报表需要的数据读取完成.")
+
+        return [details, inventories, center]
+
+
+    def report_production(self, df_list: list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]) -> pd.DataFrame:
+        """制作 CenterInventory 报表
+
+        Args:
+            df_list (list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]): 制作报表需要的文件数据
+
+        Returns:
+            pd.DataFrame: 报表, 按配置中的方向顺序排列, 每个方向之后是该方向的汇总行
+        """
+
+        details, inventories, center = df_list
+        names = list(self.directions)
+
+        # 各方向筛选后的明细合并为一张表, 方向列为分类, 汇总结果按配置中的方向顺序排列
+        frames: list[pd.DataFrame] = list()
+        for i, (name, spec) in enumerate(self.directions.items()):
+            df = details[name]
+            mask = self.index.contains(df['城市线路名称'], spec['环节'])
+            frame = df.loc[mask, ["揽收城市名称", spec['延误量']]].reset_index(drop=True)
+            frame.columns = ["城市", "线路延误量"]
+            frame.insert(0, "方向", pd.Categorical.from_codes(np.full(len(frame), i), categories=names))
+            frames.append(frame)
+        combined = center.join(pd.concat(frames, ignore_index=True), on="城市", columns=["发货中心"])
+        grouped = (combined
+                   .groupby(["方向", "发货中心"], observed=True)['线路延误量']
+                   .sum()
+                   .reset_index()
+                   .rename(columns={"发货中心": "责任中心"}))
+
+        parts: list[pd.DataFrame] = list()
+        for name, spec in self.directions.items():
+            group = grouped.loc[grouped['方向'] == name, ["责任中心", "线路延误量"]]
+            part = inventories[name].join(group, on="责任中心").rename(columns=spec['库存列'])
+            part.insert(0, "类型", spec['类型'])
+            part['库存比例'] = part["库存比例"].astype("float64")
+            parts.append(part)
+            parts.append(pd.DataFrame([{"类型": f"{spec['类型']}-汇总", "线路延误量": part['线路延误量'].sum()}]))
+        result = pd.concat(parts, ignore_index=True)
+
+        self.logger.info("CenterInventory 报表制作完成.")
+
+        return result
+
+
+    def dtypes(self, details: dict[str, pd.DataFrame], inventories: dict[str, LookupIndex], center: LookupIndex) -> dict[str, object]:
+        """pandas 流程中报表各列的类型, 供其他后端还原查询结果
+
+        Args:
+            details (dict[str, pd.DataFrame]): 各方向的环节明细
+            inventories (dict[str, LookupIndex]): 各方向的超时库存索引
+            center (LookupIndex): 城市对应中心索引
+
+        Returns:
+            dict[str, object]: 列名对应的类型
+        """
+
+        dtypes: dict[str, object] = dict()
+        for name, spec in reversed(self.directions.items()):
+            dtypes.update({spec['库存列'].get(col, col): dtype for col, dtype in inventories[name].table.dtypes.items()})
+        # 各方向的延误量合并后汇总, 再与汇总行的整数合并
+        stock = [pd.Series([], dtype=details[name][spec['延误量']].dtype) for name, spec in self.directions.items()]
+        dtypes.update({
+            "责任中心": center.table['发货中心'].dtype,
+            "线路延误量": pd.concat([pd.concat(stock), pd.Series([0])]).dtype,
+            "库存比例": "float64",
+        })
+
+        return dtypes
+
+
+    def report_production_sql(self, df_list: list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]) -> pd.DataFrame:
+        """用 DuckDB 制作 CenterInventory 报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]): 制作报表需要的文件数据
+
+        Returns:
+            pd.DataFrame: 报表
+        """
+
+        details, inventories, center = df_list
+        q = DuckBackend.q
+        tables: dict[str, pd.DataFrame] = {"center": center.table}
+
+        # 输出列为各方向库存列的并集, 某一方向没有的列为空
+        columns = ["类型", "责任中心", "线路延误量"]
+        for name, spec in self.directions.items():
+            inventory = inventories[name]
+            columns += [spec['库存列'].get(col, col) for col in inventory.table.columns if col != inventory.key]
+        columns = list(dict.fromkeys(columns))
+
+        unions: list[str] = list()
+        selects: list[str] = list()
+        for i, (name, spec) in enumerate(self.directions.items()):
+            inventory = inventories[name]
+            tables.update({
+                f"details_{i}": details[name],
+                f"routes_{i}": DuckBackend.routes(self.index.flagged(spec['环节'])),
+                f"inventory_{i}": inventory.table,
+            })
+            unions.append(
+                f"""SELECT {i} AS dir, CAST("揽收城市名称" AS VARCHAR) AS city, {q(spec['延误量'])} AS qty
+                FROM details_{i} WHERE CAST("城市线路名称" AS VARCHAR) IN (SELECT route FROM routes_{i})"""
+            )
+
+            renamed = {spec['库存列'].get(col, col): col for col in inventory.table.columns if col != inventory.key}
+            rows = [("类型", DuckBackend.literal(spec['类型'])), ("责任中心", "g.center"), ("线路延误量", "g.total")]
+            rows += [(col, f"i.{q(renamed[col])}" if col in renamed else "NULL") for col in columns[3:]]
+            summary = [("类型", DuckBackend.literal(f"{spec['类型']}-汇总")), ("责任中心", "NULL"),
+                       ("线路延误量", f"(SELECT COALESCE(SUM(total), 0) FROM grouped WHERE dir = {i})")]
+            summary += [(col, "NULL") for col in columns[3:]]
+            selects.append(
+                f"""SELECT {DuckBackend.select(rows)}, {i} AS __dir, 0 AS __part
+                FROM grouped g LEFT JOIN inventory_{i} i ON g.center = i.{q(inventory.key)} WHERE g.dir = {i}"""
+            )
+            selects.append(f"SELECT {DuckBackend.select(summary)}, {i} AS __dir, 1 AS __part")
+
+        union = "\nUNION ALL\n".join(unions)
+        select = "\nUNION ALL\n".join(selects)
+        result = DuckBackend.query(
+            f"""
+            WITH details AS (
+                {union}
+            ),
+            grouped AS (
+                SELECT d.dir, c."发货中心" AS center, COALESCE(SUM(d.qty), 0) AS total
+                FROM details d
+                JOIN center c ON d.city = CAST(c.{q(center.key)} AS VARCHAR)
+                WHERE c."发货中心" IS NOT NULL
+                GROUP BY d.dir, c."发货中心"
+            )
+            SELECT * FROM (
+                {select}
+            )
+            ORDER BY __dir, __part, "责任中心"
+            """,
+            **tables,
+        ).drop(columns=["__dir", "__part"])
+        result = DuckBackend.restore(result, self.dtypes(details, inventories, center))
+
+        self.logger.info("CenterInventory 报表制作完成(DuckDB).")
+
+        return result
+
+
+    def report_production_lazy(self, df_list: list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]) -> pd.DataFrame:
+        """用 Polars 制作 CenterInventory 报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[dict[str, pd.DataFrame] | dict[str, LookupIndex] | LookupIndex]): 制作报表需要的文件数据
+
+        Returns:
+            pd.DataFrame: 报表
+        """
+
+        pl = PolarsBackend.module()
+        details, inventories, center = df_list
+        keys = ["城市线路名称", "揽收城市名称"]
+
+        frames = [
+            PolarsBackend.lazy(details[name], keys, keys + [spec['延误量']])
+            .filter(PolarsBackend.contains("城市线路名称", self.index.flagged(spec['环节'])))
+            .select(pl.lit(i).alias("方向"), pl.col("揽收城市名称"), pl.col(spec['延误量']).alias("线路延误量"))
+            for i, (name, spec) in enumerate(self.directions.items())
+        ]
+        grouped = (pl.concat(frames, how="vertical_relaxed")
+                   .join(PolarsBackend.lazy(center.table, [center.key, "发货中心"], [center.key, "发货中心"]),
+                         left_on="揽收城市名称", right_on=center.key, how="inner")
+                   .filter(pl.col("发货中心").is_not_null())
+                   .group_by("方向", "发货中心")
+                   .agg(pl.col("线路延误量").sum())
+                   .sort("方向", "发货中心")
+                   .rename({"发货中心": "责任中心"}))
+
+        parts = list()
+        for i, (name, spec) in enumerate(self.directions.items()):
+            inventory = inventories[name]
+            part = (grouped
+                    .filter(pl.col("方向") == i)
+                    .drop("方向")
+                    .join(PolarsBackend.lazy(inventory.table, [inventory.key]).rename(spec['库存列']),
+                          left_on="责任中心", right_on=inventory.key, how="left", maintain_order="left")
+                    .select(pl.lit(spec['类型']).alias("类型"), pl.all()))
+            parts.append(part)
+            parts.append(part.select(pl.lit(f"{spec['类型']}-汇总").alias("类型"), pl.col("线路延误量").sum()))
+        result = PolarsBackend.collect(pl.concat(parts, how="diagonal_relaxed"), self.dtypes(details, inventories, center))
+
+        self.logger.info("CenterInventory 报表制作完成(Polars).")
+
+        return result
+
+
+    def run(self) -> pd.DataFrame:
+        """该类的主运行方法
+
+        Returns:
+            pd.DataFrame: CenterInventory 报表
+        """
+
+        self.logger.info("-"*50)
+        self.logger.info("CenterInventory报表制作流程-开始.")
+
+        df_list = self.data_read()
+        production = {"duckdb": self.report_production_sql, "polars": self.report_production_lazy}.get(
+            Backend.resolve(), self.report_production)
+        center: pd.DataFrame = production(df_list)
+
+        self.logger.info("CenterInventory报表制作流程-结束.")
+        self.logger.info("-"*50)
+
+        return center
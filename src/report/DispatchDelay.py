@@ -3,7 +3,13 @@ import logging
 
 from pathlib import Path
 
-from config.config import Config
+from config.config import Config, LazyConfig
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.RouteIndex import RouteIndex
+from src.dataprocess.TopN import TopN
+from src.dataprocess.Backend import Backend
+from src.dataprocess.DuckBackend import DuckBackend
+from src.dataprocess.PolarsBackend import PolarsBackend
 
 
 import pandas as pd
@@ -19,22 +25,51 @@ class DispatchDelay():
     """制作派签延误报表
     """
     
-    config: Config = Config.from_json()
+    config: Config = LazyConfig()
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
     
-    def __init__(self, gpt: pd.DataFrame, path: list[Path]):
+    def __init__(self, gpt: pd.DataFrame, path: list[Path], store: SourceStore | None = None, index: RouteIndex | None = None):
         """初始化 DispatchDelay 类实例
 
         Args:
             gpt (pd.DataFrame): GPT报表
             path (list[Path]): DispatchDelay报表需要的表格路径
+            store (SourceStore | None, optional): 运行内共享的源文件缓存. Defaults to None.
+            index (RouteIndex | None, optional): GPT 报表的线路-环节索引, 为空时由 gpt 构建. Defaults to None.
         """
         
         self.gpt = gpt
+        self.index: RouteIndex = index or RouteIndex.from_gpt(gpt)
         self.dispatch = self.config.dispatch
+        self.top: TopN = TopN.from_config("dispatch")
         self.path = path
+        self.store = store or SourceStore()
+        self.demand: dict[str, dict] = self.sources()
+        self.store.declare(self.path, self.demand)
+        
+        
+    @classmethod
+    def sources(cls) -> dict[str, dict]:
+        """DispatchDelay 报表对各文件的读取需求, 只依赖配置文件
+
+        Returns:
+            dict[str, dict]: 文件名关键字对应的读取参数
+        """
         
+        return {"派签": {"columns": cls.config.dispatch['派签']}}
+    
+    
+    @classmethod
+    def settings(cls) -> dict[str, object]:
+        """DispatchDelay 报表依赖的配置项, 作为报表缓存键的一部分
+
+        Returns:
+            dict[str, object]: 配置项名称对应的值
+        """
         
+        return {"dispatch": cls.config.dispatch, "top_n": cls.config.top_n['dispatch']}
+    
+    
     def data_read(self) -> pd.DataFrame:
         """读取制作报表需要的文件数据
 
@@ -44,8 +79,7 @@ class DispatchDelay():
         
         path = self.path[0]
         
-        details = pd.read_excel(path)
-        details = details.loc[:, self.dispatch['派签']]
+        details = self.store.read(path, **self.demand["派签"])
         
         self.logger.info("DispatchDelay 报表需要的数据读取完成")
         
@@ -62,21 +96,84 @@ class DispatchDelay():
             pd.DataFrame: 报表
         """
         
-        route_need = self.gpt['城市线路']
-        details = details.loc[details['城市线路名称'].isin(route_need), :].copy()
-        df = details.groupby("城市线路名称")['延误量'].sum().rename("Top5网点延误量总计").reset_index()
-        dispatch = details.merge(df, how="left", on="城市线路名称")
-        dispatch = dispatch.sort_values(by="城市线路名称")
-        
-        cols = list(dispatch.columns)
-        cols.insert(1, cols.pop(cols.index("Top5网点延误量总计")))
-        dispatch = dispatch.loc[:, cols]
+        details = details.loc[self.index.contains(details['城市线路名称']), :]
+        # 每条线路只保留延误量最大的 N 个网点, 延误量总计只汇总这些网点
+        dispatch = self.top.apply(details)
         
         self.logger.info("DispatchDelay 报表制作完成")
         
         return dispatch
     
     
+    def report_production_sql(self, details: pd.DataFrame) -> pd.DataFrame:
+        """用 DuckDB 制作 DispatchDelay 报表, 结果与 report_production 一致
+
+        Args:
+            details (pd.DataFrame): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: 报表
+        """
+        
+        q = DuckBackend.q
+        route = q("城市线路名称")
+        columns = [(col, f"d.{q(col)}") for col in details.columns]
+        columns.insert(1, (self.top.column, f"SUM(d.{q('延误量')}) OVER (PARTITION BY d.{route})"))
+        
+        # 延误量相同时保留靠前的行, 空值排在最后, 与 TopN.select 一致
+        dispatch = DuckBackend.query(
+            f"""
+            SELECT {DuckBackend.select(columns)}
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY {route} ORDER BY {q('延误量')} DESC NULLS LAST, {q(DuckBackend.POS)}
+                ) AS __rank
+                FROM details
+                WHERE CAST({route} AS VARCHAR) IN (SELECT route FROM routes)
+            ) d
+            WHERE d.__rank <= {self.top.n}
+            ORDER BY d.{route}, d.{q(DuckBackend.POS)}
+            """,
+            details=DuckBackend.numbered(details),
+            routes=DuckBackend.routes(self.index.flagged()),
+        )
+        dispatch = DuckBackend.restore(dispatch, {**details.dtypes, self.top.column: details['延误量'].dtype})
+        
+        self.logger.info("DispatchDelay 报表制作完成(DuckDB)")
+        
+        return dispatch
+    
+    
+    def report_production_lazy(self, details: pd.DataFrame) -> pd.DataFrame:
+        """用 Polars 制作 DispatchDelay 报表, 结果与 report_production 一致
+
+        Args:
+            details (pd.DataFrame): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: 报表
+        """
+        
+        pl = PolarsBackend.module()
+        route = "城市线路名称"
+        columns = list(details.columns)
+        columns.insert(1, self.top.column)
+        # 延误量相同时按出现顺序排名, 空值视为最小, 与 TopN.select 一致
+        rank = pl.col("延误量").cast(pl.Float64).fill_null(float("-inf")).rank("ordinal", descending=True).over(route)
+        
+        dispatch = (PolarsBackend.lazy(details, [route])
+                 .filter(PolarsBackend.contains(route, self.index.flagged()))
+                 .filter(rank <= self.top.n)
+                 .with_columns(pl.col("延误量").sum().over(route).alias(self.top.column))
+                 .select(columns)
+                 .sort(route, maintain_order=True))
+        dispatch = PolarsBackend.collect(dispatch, {**details.dtypes, self.top.column: details['延误量'].dtype})
+        
+        self.logger.info("DispatchDelay 报表制作完成(Polars)")
+        
+        return dispatch
+    
+    
     def run(self) -> pd.DataFrame:
         """该类的主运行方法
 
@@ -88,7 +185,9 @@ class DispatchDelay():
         self.logger.info("DispatchDelay报表制作流程-开始.")
         
         df_list = self.data_read()
-        dispatch: pd.DataFrame = self.report_production(df_list)
+        production = {"duckdb": self.report_production_sql, "polars": self.report_production_lazy}.get(
+            Backend.resolve(), self.report_production)
+        dispatch: pd.DataFrame = production(df_list)
         
         self.logger.info("DispatchDelay报表制作流程-结束.")
         self.logger.info("-"*50)
@@ -3,25 +3,59 @@ import logging
 
 from pathlib import Path
 
-from config.config import Config
+from config.config import Config, LazyConfig
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.RouteIndex import RouteIndex
+from src.dataprocess.Backend import Backend
+from src.dataprocess.DuckBackend import DuckBackend
+from src.dataprocess.PolarsBackend import PolarsBackend
 
 
 class GPT():
     """制作报表'GPT'的类
     """
     
-    config: Config = Config.from_json()
+    config: Config = LazyConfig()
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
     
-    def __init__(self, path: list[Path]):
+    def __init__(self, path: list[Path], store: SourceStore | None = None):
         """初始化GPT类实例
 
         Args:
             path (list[Path]): GPT涉及表格的路径列表
+            store (SourceStore | None, optional): 运行内共享的源文件缓存. Defaults to None.
         """
         
         self.path: list[Path] =path
         self.gpt: dict[str, list[str]] = self.config.gpt
+        self.store: SourceStore = store or SourceStore()
+        self.demand: dict[str, dict] = self.sources()
+        self.store.declare(self.path, self.demand)
+    
+    
+    @classmethod
+    def sources(cls) -> dict[str, dict]:
+        """GPT 报表对各文件的读取需求, 只依赖配置文件
+
+        Returns:
+            dict[str, dict]: 文件名关键字对应的读取参数
+        """
+        
+        return {
+            "各环节延误量": {"columns": cls.config.gpt['各环节延误量'] + cls.config.gpt['计算列']},
+            "城市线路汇总-日": {"columns": cls.config.gpt['城市线路']},
+        }
+    
+    
+    @classmethod
+    def settings(cls) -> dict[str, object]:
+        """GPT 报表依赖的配置项, 作为报表缓存键的一部分
+
+        Returns:
+            dict[str, object]: 配置项名称对应的值
+        """
+        
+        return {"gpt": cls.config.gpt}
     
     
     def data_read(self) -> list[pd.DataFrame]:
@@ -33,15 +67,10 @@ class GPT():
         
         for p in self.path:
             if "各环节延误量" in p.name:
-                delay_quantity: pd.DataFrame = pd.read_excel(p)
+                delay_quantity: pd.DataFrame = self.store.read(p, **self.demand["各环节延误量"])
                 
             if "城市线路汇总-日" in p.name:
-                city_route: pd.DataFrame = pd.read_excel(p)
-        
-        dq_columns = self.gpt['各环节延误量'] + self.gpt['计算列']      
-        delay_quantity = delay_quantity.loc[:, dq_columns]
-        
-        city_route = city_route.loc[:, self.gpt['城市线路']]
+                city_route: pd.DataFrame = self.store.read(p, **self.demand["城市线路汇总-日"])
         
         self.logger.info("GPT报表所需数据读取完成.")
         
@@ -87,27 +116,116 @@ class GPT():
         cols.insert(4, cols.pop(cols.index("延误量最大3环节")))
         result = result.loc[:, cols]
         
-        result['达成率(%)'] = result['达成率(%)'].apply(lambda x: f"{x: .2f}%")
-        result['与第一差值(%)'] = result['与第一差值(%)'].apply(lambda x: f"{x: .2f}%")
+        # 百分比列保持数值类型, 显示格式在写出工作簿时设置
+        result[['达成率(%)', '与第一差值(%)']] = result[['达成率(%)', '与第一差值(%)']].astype("float64")
         
         self.logger.info("GPT报表制作完成.")
         
         return result
     
     
-    def run(self) -> pd.DataFrame:
-        """该类的主运行方法
+    def report_production_sql(self, df_list: list[pd.DataFrame]) -> pd.DataFrame:
+        """用 DuckDB 制作GPT报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[pd.DataFrame]): 表格数据
 
         Returns:
             pd.DataFrame: GPT报表
         """
+        
+        delay_quantity, city_route = df_list
+        q = DuckBackend.q
+        key = "城市线路名称"
+        calc_cols = self.gpt['计算列']
+        rename = {key: "城市线路", "标准": "标准时效"}
+        
+        # 列顺序与 pandas 流程一致: 非计算列在前, 之后依次是各计算列及其占比
+        columns = [(rename.get(col, col), f"c.{q(col)}") for col in city_route.columns]
+        columns += [(rename.get(col, col), f"d.{q(col)}") for col in delay_quantity.columns
+                    if col != key and col not in calc_cols]
+        total = " + ".join(f"coalesce(CAST(d.{q(col)} AS DOUBLE), 0)" for col in calc_cols)
+        for col in calc_cols:
+            columns.append((col, f"d.{q(col)}"))
+            columns.append((col[:-3] + "占比", f"CAST(d.{q(col)} AS DOUBLE) / ({total})"))
+        names = [name for name, _ in columns]
+        columns.insert(4, columns.pop(names.index("延误量最大3环节")))
+        
+        result = DuckBackend.query(
+            f"""
+            SELECT {DuckBackend.select(columns)}
+            FROM city c LEFT JOIN delay d ON c.{q(key)} = d.{q(key)}
+            ORDER BY c.{q(DuckBackend.POS)}, d.{q(DuckBackend.POS)}
+            """,
+            city=DuckBackend.numbered(city_route),
+            delay=DuckBackend.numbered(delay_quantity),
+        )
+        
+        dtypes = {rename.get(col, col): dtype for col, dtype in {**delay_quantity.dtypes, **city_route.dtypes}.items()}
+        dtypes.update({'达成率(%)': "float64", '与第一差值(%)': "float64"})
+        result = DuckBackend.restore(result, dtypes)
+        
+        self.logger.info("GPT报表制作完成(DuckDB).")
+        
+        return result
+    
+    
+    def report_production_lazy(self, df_list: list[pd.DataFrame]) -> pd.DataFrame:
+        """用 Polars 制作GPT报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[pd.DataFrame]): 表格数据
+
+        Returns:
+            pd.DataFrame: GPT报表
+        """
+        
+        pl = PolarsBackend.module()
+        delay_quantity, city_route = df_list
+        key = "城市线路名称"
+        calc_cols = self.gpt['计算列']
+        rename = {key: "城市线路", "标准": "标准时效"}
+        
+        # 列顺序与 pandas 流程一致: 非计算列在前, 之后依次是各计算列及其占比
+        columns = [rename.get(col, col) for col in city_route.columns]
+        columns += [rename.get(col, col) for col in delay_quantity.columns if col != key and col not in calc_cols]
+        for col in calc_cols:
+            columns += [col, col[:-3] + "占比"]
+        columns.insert(4, columns.pop(columns.index("延误量最大3环节")))
+        
+        # 计算列的空值按 0 求和, 与 DataFrame.sum 一致
+        total = pl.sum_horizontal(pl.col(calc_cols).cast(pl.Float64))
+        gpt = (PolarsBackend.lazy(city_route, [key])
+               .join(PolarsBackend.lazy(delay_quantity, [key]), on=key, how="left", maintain_order="left")
+               .with_columns((pl.col(col).cast(pl.Float64) / total).alias(col[:-3] + "占比") for col in calc_cols)
+               .rename(rename)
+               .select(columns))
+        
+        dtypes = {rename.get(col, col): dtype for col, dtype in {**delay_quantity.dtypes, **city_route.dtypes}.items()}
+        dtypes.update({'达成率(%)': "float64", '与第一差值(%)': "float64"})
+        result = PolarsBackend.collect(gpt, dtypes)
+        
+        self.logger.info("GPT报表制作完成(Polars).")
+        
+        return result
+    
+    
+    def run(self) -> tuple[pd.DataFrame, RouteIndex]:
+        """该类的主运行方法
+
+        Returns:
+            tuple[pd.DataFrame, RouteIndex]: GPT报表与由其构建的线路-环节索引
+        """
         self.logger.info("-"*50)
         self.logger.info("GPT报表制作流程-开始")
         
         df_list = self.data_read()
-        gpt = self.report_production(df_list)
+        production = {"duckdb": self.report_production_sql, "polars": self.report_production_lazy}.get(
+            Backend.resolve(), self.report_production)
+        gpt = production(df_list)
+        index = RouteIndex.from_gpt(gpt)
         
         self.logger.info("GPT报表制作流程-结束")
         self.logger.info("-"*50)
         
-        return gpt
\ No newline at end of file
+        return gpt, index
\ No newline at end of file
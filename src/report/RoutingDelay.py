@@ -3,7 +3,13 @@ import logging
 
 from pathlib import Path
 
-from config.config import Config
+from config.config import Config, LazyConfig
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.RouteIndex import RouteIndex
+from src.dataprocess.LookupIndex import LookupIndex
+from src.dataprocess.Backend import Backend
+from src.dataprocess.DuckBackend import DuckBackend
+from src.dataprocess.PolarsBackend import PolarsBackend
 
 # 要加3列数据： 标准时效、与第一差值、达成率，加在城市线路后面
 
@@ -12,50 +18,85 @@ class RoutingDelay():
     """路由延误报表制作
     """
     
-    config: Config = Config.from_json()
+    config: Config = LazyConfig()
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
     
-    def __init__(self, gpt: pd.DataFrame, path: list[Path]):
+    def __init__(self, gpt: pd.DataFrame, path: list[Path], store: SourceStore | None = None, index: RouteIndex | None = None):
         """初始化 RoutingDelay类实例
 
         Args:
             gpt (pd.DataFrame): GPT报表
             path(list[Path]): 报表需要的表格路径
+            store (SourceStore | None, optional): 运行内共享的源文件缓存. Defaults to None.
+            index (RouteIndex | None, optional): GPT 报表的线路-环节索引, 为空时由 gpt 构建. Defaults to None.
         """
         
         self.gpt: pd.DataFrame = gpt
+        self.index: RouteIndex = index or RouteIndex.from_gpt(gpt)
         self.routing: dict[str, list[str]] = self.config.routing
         self.path: list[Path] = path
+        self.store: SourceStore = store or SourceStore()
+        self.demand: dict[str, dict] = self.sources()
+        self.store.declare(self.path, self.demand)
         
         
-    def data_read(self) -> list[pd.DataFrame]:
+    @classmethod
+    def sources(cls) -> dict[str, dict]:
+        """RoutingDelay 报表对各文件的读取需求, 只依赖配置文件
+
+        Returns:
+            dict[str, dict]: 文件名关键字对应的读取参数
+        """
+        
+        return {
+            "未达成车签明细": {
+                "columns": cls.config.routing["未达成车签明细"],
+                "filters": {cls.config.routing['筛选'][0]: ["是"]}
+            },
+            "线路罚款": {"columns": cls.config.routing['线路罚款'], "skiprows": [0]},
+        }
+    
+    
+    @classmethod
+    def settings(cls) -> dict[str, object]:
+        """RoutingDelay 报表依赖的配置项, 作为报表缓存键的一部分
+
+        Returns:
+            dict[str, object]: 配置项名称对应的值
+        """
+        
+        return {"routing": cls.config.routing}
+    
+    
+    def data_read(self) -> list[pd.DataFrame | LookupIndex]:
         """读取报表制作需要的数据
 
         Returns:
-            list[pd.DataFrame]: 需要的报表数据
+            list[pd.DataFrame | LookupIndex]: 未达成车签明细与按电子车签建立的线路罚款索引
         """    
              
         for p in self.path:
             if "未达成车签明细" in p.name:
-                details: pd.DataFrame = pd.read_excel(p)
+                details: pd.DataFrame = self.store.read(p, **self.demand["未达成车签明细"])
             
             if "线路罚款" in p.name:
-                center: pd.DataFrame = pd.read_excel(p, skiprows=[0])                  
+                center: LookupIndex = self.store.lookup(p, "电子车签", **self.demand["线路罚款"])
         
-        details = details.loc[details[self.routing['筛选'][0]] == "是", self.routing["未达成车签明细"]].copy()
-        
-        center = center.loc[:, self.routing['线路罚款']]
+        # 建议网点交件时间由最晚发车时间计算, schema 中未声明为 datetime 时在这里转换, 无法识别的值视为空
+        if not pd.api.types.is_datetime64_any_dtype(details['最晚发车时间']):
+            self.logger.warning("最晚发车时间 未按 datetime 解析, 请检查 schema 配置; 读取后转换.")
+            details['最晚发车时间'] = pd.to_datetime(details['最晚发车时间'], format="mixed", errors="coerce")
         
         self.logger.info("数据读取完成.")
         
         return [details, center]
     
     
-    def report_production(self, df_list: list[pd.DataFrame]) -> pd.DataFrame:
+    def report_production(self, df_list: list[pd.DataFrame | LookupIndex]) -> pd.DataFrame:
         """ 制作 RoutingDelay 报表
 
         Args:
-            df_list (list[pd.DataFrame]): 制作报表需要的数据
+            df_list (list[pd.DataFrame | LookupIndex]): 制作报表需要的数据
 
         Returns:
             pd.DataFrame: RoutingDelay 报表
@@ -63,19 +104,13 @@ class RoutingDelay():
         
         details, center = df_list
         
-        route_need = self.gpt[self.gpt['路由占比'] > 0.05]['城市线路']
-        details = details.loc[details['城市到城市线路名称'].isin(route_need), self.routing['未达成车签明细']].copy()
+        details = details.loc[self.index.contains(details['城市到城市线路名称'], '路由占比'), self.routing['未达成车签明细']].copy()
         details = details.rename(columns={'城市到城市线路名称': '城市线路', "最晚发车时间": "建议发车时间", "未达成量": "线路延误量"})
         details = details.loc[details['线路延误量'] > 100, :].copy()
-        details['建议发车时间'] = pd.to_datetime(details['建议发车时间'], format="mixed", errors="coerce")
         details['建议网点交件时间'] = (details['建议发车时间'] - pd.Timedelta(hours=1)).dt.strftime('%H:%M:%S')
-        df = pd.merge(
-            details, center,
-            how="left",
-            left_on="车签", right_on="电子车签"
-        ).rename(columns={"线路名称": "中心线路"})
+        df = center.join(details, on="车签", columns=["线路名称"]).rename(columns={"线路名称": "中心线路"})
         gpt_need = self.gpt.loc[:, ["城市线路", "标准时效", "与第一差值(%)", "达成率(%)",]]
-        df = df.merge(gpt_need, how="left", on="城市线路")
+        df = LookupIndex(gpt_need, "城市线路", "GPT").join(df, on="城市线路")
         
         if not set(self.routing['列顺序']) - set(df.columns):
             self.logger.info("RoutingDelay报表制作完成.")
@@ -86,6 +121,95 @@ class RoutingDelay():
             raise ValueError("输出报表中的列名与所需求的不一致,请检查逻辑")
     
     
+    def report_production_sql(self, df_list: list[pd.DataFrame | LookupIndex]) -> pd.DataFrame:
+        """用 DuckDB 制作 RoutingDelay 报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[pd.DataFrame | LookupIndex]): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: RoutingDelay 报表
+        """
+        
+        details, center = df_list
+        q = DuckBackend.q
+        rename = {'城市到城市线路名称': '城市线路', "最晚发车时间": "建议发车时间", "未达成量": "线路延误量"}
+        gpt = LookupIndex(self.gpt.loc[:, ["城市线路", "标准时效", "与第一差值(%)", "达成率(%)",]], "城市线路", "GPT")
+        
+        exprs = {rename.get(col, col): f"d.{q(col)}" for col in self.routing['未达成车签明细']}
+        exprs['建议网点交件时间'] = f"strftime(d.{q('最晚发车时间')} - INTERVAL 1 HOUR, '%H:%M:%S')"
+        exprs['中心线路'] = f"f.{q('线路名称')}"
+        exprs.update({col: f"g.{q(col)}" for col in gpt.table.columns if col != "城市线路"})
+        
+        if set(self.routing['列顺序']) - set(exprs):
+            self.logger.error("输出报表中的列名与所需求的不一致,请检查逻辑")
+            self.logger.info(f"报表中的列名为: {list(exprs)}")
+            raise ValueError("输出报表中的列名与所需求的不一致,请检查逻辑")
+        
+        routing = DuckBackend.query(
+            f"""
+            SELECT {DuckBackend.select([(col, exprs[col]) for col in self.routing['列顺序']])}
+            FROM details d
+            LEFT JOIN center f ON d.{q('车签')} = f.{q('电子车签')}
+            LEFT JOIN gpt g ON d.{q('城市到城市线路名称')} = g.{q('城市线路')}
+            WHERE CAST(d.{q('城市到城市线路名称')} AS VARCHAR) IN (SELECT route FROM routes)
+              AND d.{q('未达成量')} > 100
+            ORDER BY d.{q(DuckBackend.POS)}
+            """,
+            details=DuckBackend.numbered(details),
+            center=center.table,
+            gpt=gpt.table,
+            routes=DuckBackend.routes(self.index.flagged('路由占比')),
+        )
+        
+        dtypes = {rename.get(col, col): dtype for col, dtype in details.dtypes.items()}
+        dtypes.update({"中心线路": center.table['线路名称'].dtype, **gpt.table.dtypes})
+        routing = DuckBackend.restore(routing, dtypes)
+        
+        self.logger.info("RoutingDelay报表制作完成(DuckDB).")
+        
+        return routing
+    
+    
+    def report_production_lazy(self, df_list: list[pd.DataFrame | LookupIndex]) -> pd.DataFrame:
+        """用 Polars 制作 RoutingDelay 报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[pd.DataFrame | LookupIndex]): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: RoutingDelay 报表
+        """
+        
+        pl = PolarsBackend.module()
+        details, center = df_list
+        route = '城市到城市线路名称'
+        rename = {route: '城市线路', "最晚发车时间": "建议发车时间", "未达成量": "线路延误量"}
+        gpt = LookupIndex(self.gpt.loc[:, ["城市线路", "标准时效", "与第一差值(%)", "达成率(%)",]], "城市线路", "GPT")
+        
+        routing = (PolarsBackend.lazy(details, [route], self.routing['未达成车签明细'])
+                   .filter(PolarsBackend.contains(route, self.index.flagged('路由占比')) & (pl.col('未达成量') > 100))
+                   .rename(rename)
+                   .with_columns((pl.col("建议发车时间") - pl.duration(hours=1)).dt.strftime('%H:%M:%S').alias('建议网点交件时间'))
+                   .join(PolarsBackend.lazy(center.table, columns=[center.key, "线路名称"]).rename({"线路名称": "中心线路"}),
+                         left_on="车签", right_on=center.key, how="left", maintain_order="left")
+                   .join(PolarsBackend.lazy(gpt.table, [gpt.key]), on=gpt.key, how="left", maintain_order="left"))
+        
+        names = routing.collect_schema().names()
+        if set(self.routing['列顺序']) - set(names):
+            self.logger.error("输出报表中的列名与所需求的不一致,请检查逻辑")
+            self.logger.info(f"报表中的列名为: {names}")
+            raise ValueError("输出报表中的列名与所需求的不一致,请检查逻辑")
+        
+        dtypes = {rename.get(col, col): dtype for col, dtype in details.dtypes.items()}
+        dtypes.update({"中心线路": center.table['线路名称'].dtype, **gpt.table.dtypes})
+        routing = PolarsBackend.collect(routing.select(self.routing['列顺序']), dtypes)
+        
+        self.logger.info("RoutingDelay报表制作完成(Polars).")
+        
+        return routing
+    
+    
     def run(self) -> pd.DataFrame:
         """RoutingDelay 类的主运行方法
 
@@ -97,7 +221,9 @@ class RoutingDelay():
         self.logger.info("RoutingDelay报表制作流程-开始.")
         
         df_list = self.data_read()
-        routing: pd.DataFrame = self.report_production(df_list)
+        production = {"duckdb": self.report_production_sql, "polars": self.report_production_lazy}.get(
+            Backend.resolve(), self.report_production)
+        routing: pd.DataFrame = production(df_list)
         
         self.logger.info("RoutingDelay报表制作流程-结束.")
         self.logger.info("-"*50)
@@ -3,7 +3,13 @@ import logging
 
 from pathlib import Path
 
-from config.config import Config
+from config.config import Config, LazyConfig
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.RouteIndex import RouteIndex
+from src.dataprocess.TopN import TopN
+from src.dataprocess.Backend import Backend
+from src.dataprocess.DuckBackend import DuckBackend
+from src.dataprocess.PolarsBackend import PolarsBackend
 
 # 城市线路名称需要进行排序
 
@@ -11,22 +17,51 @@ class SubmissionDelay():
     """制作交件延误报表
     """
     
-    config: Config = Config.from_json()
+    config: Config = LazyConfig()
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
     
-    def __init__(self, gpt: pd.DataFrame, path: list[Path]):
+    def __init__(self, gpt: pd.DataFrame, path: list[Path], store: SourceStore | None = None, index: RouteIndex | None = None):
         """初始化 SubmissionDelay 类实例
 
         Args:
             gpt (pd.DataFrame): GPT报表
             path (list[Path]): SubmissionDelay报表需要的表格路径
+            store (SourceStore | None, optional): 运行内共享的源文件缓存. Defaults to None.
+            index (RouteIndex | None, optional): GPT 报表的线路-环节索引, 为空时由 gpt 构建. Defaults to None.
         """
         
         self.gpt = gpt
+        self.index: RouteIndex = index or RouteIndex.from_gpt(gpt)
         self.submission = self.config.submission
+        self.top: TopN = TopN.from_config("submission")
         self.path = path
+        self.store = store or SourceStore()
+        self.demand: dict[str, dict] = self.sources()
+        self.store.declare(self.path, self.demand)
         
         
+    @classmethod
+    def sources(cls) -> dict[str, dict]:
+        """SubmissionDelay 报表对各文件的读取需求, 只依赖配置文件
+
+        Returns:
+            dict[str, dict]: 文件名关键字对应的读取参数
+        """
+        
+        return {"交件": {"columns": cls.config.submission['交件']}}
+    
+    
+    @classmethod
+    def settings(cls) -> dict[str, object]:
+        """SubmissionDelay 报表依赖的配置项, 作为报表缓存键的一部分
+
+        Returns:
+            dict[str, object]: 配置项名称对应的值
+        """
+        
+        return {"submission": cls.config.submission, "top_n": cls.config.top_n['submission']}
+    
+    
     def data_read(self) -> pd.DataFrame:
         """读取制作报表需要的文件数据
 
@@ -36,8 +71,7 @@ class SubmissionDelay():
         
         path = self.path[0]
         
-        details = pd.read_excel(path)
-        details = details.loc[:, self.submission['交件']].rename(columns={"交件延误量": "延误量"})
+        details = self.store.read(path, **self.demand["交件"]).rename(columns={"交件延误量": "延误量"})
         
         self.logger.info("SubmissionDelay 报表需要的数据读取完成")
         
@@ -54,21 +88,84 @@ class SubmissionDelay():
             pd.DataFrame: 报表
         """
         
-        route_need = self.gpt[self.gpt['网点交件占比'] > 0.05]['城市线路']
-        details = details.loc[details['城市线路名称'].isin(route_need), :].copy()
-        df = details.groupby("城市线路名称")['延误量'].sum().rename("Top5网点延误量总计").reset_index()
-        submission = details.merge(df, how="left", on="城市线路名称")
-        submission = submission.sort_values(by="城市线路名称")
-        
-        cols = list(submission.columns)
-        cols.insert(1, cols.pop(cols.index("Top5网点延误量总计")))
-        submission = submission.loc[:, cols]
+        details = details.loc[self.index.contains(details['城市线路名称'], '网点交件占比'), :]
+        # 每条线路只保留延误量最大的 N 个网点, 延误量总计只汇总这些网点
+        submission = self.top.apply(details)
         
         self.logger.info("SubmissionDelay 报表制作完成")
         
         return submission
     
     
+    def report_production_sql(self, details: pd.DataFrame) -> pd.DataFrame:
+        """用 DuckDB 制作 SubmissionDelay 报表, 结果与 report_production 一致
+
+        Args:
+            details (pd.DataFrame): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: 报表
+        """
+        
+        q = DuckBackend.q
+        route = q("城市线路名称")
+        columns = [(col, f"d.{q(col)}") for col in details.columns]
+        columns.insert(1, (self.top.column, f"SUM(d.{q('延误量')}) OVER (PARTITION BY d.{route})"))
+        
+        # 延误量相同时保留靠前的行, 空值排在最后, 与 TopN.select 一致
+        submission = DuckBackend.query(
+            f"""
+            SELECT {DuckBackend.select(columns)}
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY {route} ORDER BY {q('延误量')} DESC NULLS LAST, {q(DuckBackend.POS)}
+                ) AS __rank
+                FROM details
+                WHERE CAST({route} AS VARCHAR) IN (SELECT route FROM routes)
+            ) d
+            WHERE d.__rank <= {self.top.n}
+            ORDER BY d.{route}, d.{q(DuckBackend.POS)}
+            """,
+            details=DuckBackend.numbered(details),
+            routes=DuckBackend.routes(self.index.flagged('网点交件占比')),
+        )
+        submission = DuckBackend.restore(submission, {**details.dtypes, self.top.column: details['延误量'].dtype})
+        
+        self.logger.info("SubmissionDelay 报表制作完成(DuckDB)")
+        
+        return submission
+    
+    
+    def report_production_lazy(self, details: pd.DataFrame) -> pd.DataFrame:
+        """用 Polars 制作 SubmissionDelay 报表, 结果与 report_production 一致
+
+        Args:
+            details (pd.DataFrame): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: 报表
+        """
+        
+        pl = PolarsBackend.module()
+        route = "城市线路名称"
+        columns = list(details.columns)
+        columns.insert(1, self.top.column)
+        # 延误量相同时按出现顺序排名, 空值视为最小, 与 TopN.select 一致
+        rank = pl.col("延误量").cast(pl.Float64).fill_null(float("-inf")).rank("ordinal", descending=True).over(route)
+        
+        submission = (PolarsBackend.lazy(details, [route])
+                 .filter(PolarsBackend.contains(route, self.index.flagged('网点交件占比')))
+                 .filter(rank <= self.top.n)
+                 .with_columns(pl.col("延误量").sum().over(route).alias(self.top.column))
+                 .select(columns)
+                 .sort(route, maintain_order=True))
+        submission = PolarsBackend.collect(submission, {**details.dtypes, self.top.column: details['延误量'].dtype})
+        
+        self.logger.info("SubmissionDelay 报表制作完成(Polars)")
+        
+        return submission
+    
+    
     def run(self) -> pd.DataFrame:
         """该类的主运行方法
 
@@ -80,7 +177,9 @@ class SubmissionDelay():
         self.logger.info("SubmissionDelay报表制作流程-开始.")
         
         df_list = self.data_read()
-        submission: pd.DataFrame = self.report_production(df_list)
+        production = {"duckdb": self.report_production_sql, "polars": self.report_production_lazy}.get(
+            Backend.resolve(), self.report_production)
+        submission: pd.DataFrame = production(df_list)
         
         self.logger.info("SubmissionDelay报表制作流程-结束.")
         self.logger.info("-"*50)
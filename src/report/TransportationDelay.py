@@ -3,58 +3,93 @@ import logging
 
 from pathlib import Path
 
-from config.config import Config
+from config.config import Config, LazyConfig
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.RouteIndex import RouteIndex
+from src.dataprocess.LookupIndex import LookupIndex
+from src.dataprocess.Backend import Backend
+from src.dataprocess.DuckBackend import DuckBackend
+from src.dataprocess.PolarsBackend import PolarsBackend
 
 
 class TransportationDelay():
     """干线运输延误报表制作
     """
     
-    config: Config = Config.from_json()
+    config: Config = LazyConfig()
     logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
     
-    def __init__(self, gpt: pd.DataFrame, path: list[Path]):
+    def __init__(self, gpt: pd.DataFrame, path: list[Path], store: SourceStore | None = None, index: RouteIndex | None = None):
         """初始化 TransportationDelay 类实例
 
         Args:
             gpt (pd.DataFrame): GPT报表
             path (list[Path]): 报表需要的表格路径
+            store (SourceStore | None, optional): 运行内共享的源文件缓存. Defaults to None.
+            index (RouteIndex | None, optional): GPT 报表的线路-环节索引, 为空时由 gpt 构建. Defaults to None.
         """
         
         self.gpt = gpt
+        self.index: RouteIndex = index or RouteIndex.from_gpt(gpt)
         self.transportation = self.config.transportation
         self.path = path
+        self.store = store or SourceStore()
+        self.demand: dict[str, dict] = self.sources()
+        self.store.declare(self.path, self.demand)
         
     
-    def data_read(self) -> list[pd.DataFrame]:
+    @classmethod
+    def sources(cls) -> dict[str, dict]:
+        """TransportationDelay 报表对各文件的读取需求, 只依赖配置文件
+
+        Returns:
+            dict[str, dict]: 文件名关键字对应的读取参数
+        """
+        
+        return {
+            "未达成车签明细": {
+                "columns": cls.config.transportation["未达成车签明细"],
+                "filters": {cls.config.transportation['筛选'][0]: ["是"]}
+            },
+            "线路罚款": {"columns": cls.config.transportation['线路罚款'], "skiprows": [0]},
+        }
+    
+    
+    @classmethod
+    def settings(cls) -> dict[str, object]:
+        """TransportationDelay 报表依赖的配置项, 作为报表缓存键的一部分
+
+        Returns:
+            dict[str, object]: 配置项名称对应的值
+        """
+        
+        return {"transportation": cls.config.transportation}
+    
+    
+    def data_read(self) -> list[pd.DataFrame | LookupIndex]:
         """读取需要的文件数据
 
         Returns:
-            list[pd.DataFrame]: 读取到的表格数据列表
+            list[pd.DataFrame | LookupIndex]: 未达成车签明细与按电子车签建立的线路罚款索引
         """
 
         for p in self.path:
             if "未达成车签明细" in p.name:
-                details: pd.DataFrame = pd.read_excel(p)
+                details: pd.DataFrame = self.store.read(p, **self.demand["未达成车签明细"])
             
             if "线路罚款" in p.name:
-                center: pd.DataFrame = pd.read_excel(p, skiprows=[0])
-        
-        details_col_need = self.transportation["未达成车签明细"] 
-        details = details.loc[details[self.transportation['筛选'][0]] == "是", details_col_need].copy()
-        
-        center = center.loc[:, self.transportation['线路罚款']]
+                center: LookupIndex = self.store.lookup(p, "电子车签", **self.demand["线路罚款"])
         
         self.logger.info("数据读取完成.")
         
         return [details, center]
     
     
-    def report_production(self, df_list: list[pd.DataFrame]) -> pd.DataFrame:
+    def report_production(self, df_list: list[pd.DataFrame | LookupIndex]) -> pd.DataFrame:
         """ 制作 RoutingDelay 报表
 
         Args:
-            df_list (list[pd.DataFrame]): 制作报表需要的数据
+            df_list (list[pd.DataFrame | LookupIndex]): 制作报表需要的数据
 
         Returns:
             pd.DataFrame: RoutingDelay 报表
@@ -62,28 +97,98 @@ class TransportationDelay():
         
         details, center = df_list
         
-        center = center.rename(columns={"电子车签": "车签"})
-        
-        route_need = self.gpt[self.gpt['干线运输占比'] > 0.05]['城市线路']
-        details = details.loc[details['城市到城市线路名称'].isin(route_need), self.transportation['未达成车签明细']].copy()
+        details = details.loc[self.index.contains(details['城市到城市线路名称'], '干线运输占比'), self.transportation['未达成车签明细']].copy()
         details = details.rename(columns={'城市到城市线路名称': '城市线路', "未达成量": "线路延误量"})
         details = details.loc[details['线路延误量'] > 10, :].copy()
-        df: pd.DataFrame = details.merge(
-            center,
-            how="left",
-            on="车签"
-        ).rename(columns={"线路名称": "中心线路"})
+        df: pd.DataFrame = center.join(details, on="车签", columns=["线路名称"]).rename(columns={"线路名称": "中心线路"})
         
         cols = list(df.columns)
         cols.insert(1, cols.pop(cols.index("中心线路")))
         transportation = df.loc[:, cols]
-        transportation = transportation.sort_values(by="城市线路")
+        transportation = transportation.sort_values(by="城市线路", kind="stable")
         
         self.logger.info("TransportationDelay 报表制作完成.")
         
         return transportation
     
     
+    def report_production_sql(self, df_list: list[pd.DataFrame | LookupIndex]) -> pd.DataFrame:
+        """用 DuckDB 制作 TransportationDelay 报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[pd.DataFrame | LookupIndex]): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: TransportationDelay 报表
+        """
+        
+        details, center = df_list
+        q = DuckBackend.q
+        rename = {'城市到城市线路名称': '城市线路', "未达成量": "线路延误量"}
+        
+        columns = [(rename.get(col, col), f"d.{q(col)}") for col in self.transportation['未达成车签明细']]
+        columns.insert(1, ("中心线路", f"f.{q('线路名称')}"))
+        
+        # 按线路排序, 同一线路内保持原有顺序, 与 pandas 的稳定排序一致
+        transportation = DuckBackend.query(
+            f"""
+            SELECT {DuckBackend.select(columns)}
+            FROM details d
+            LEFT JOIN center f ON d.{q('车签')} = f.{q('电子车签')}
+            WHERE CAST(d.{q('城市到城市线路名称')} AS VARCHAR) IN (SELECT route FROM routes)
+              AND d.{q('未达成量')} > 10
+            ORDER BY d.{q('城市到城市线路名称')}, d.{q(DuckBackend.POS)}
+            """,
+            details=DuckBackend.numbered(details),
+            center=center.table,
+            routes=DuckBackend.routes(self.index.flagged('干线运输占比')),
+        )
+        
+        dtypes = {rename.get(col, col): dtype for col, dtype in details.dtypes.items()}
+        dtypes["中心线路"] = center.table['线路名称'].dtype
+        transportation = DuckBackend.restore(transportation, dtypes)
+        
+        self.logger.info("TransportationDelay 报表制作完成(DuckDB).")
+        
+        return transportation
+    
+    
+    def report_production_lazy(self, df_list: list[pd.DataFrame | LookupIndex]) -> pd.DataFrame:
+        """用 Polars 制作 TransportationDelay 报表, 结果与 report_production 一致
+
+        Args:
+            df_list (list[pd.DataFrame | LookupIndex]): 制作报表需要的数据
+
+        Returns:
+            pd.DataFrame: TransportationDelay 报表
+        """
+        
+        pl = PolarsBackend.module()
+        details, center = df_list
+        route = '城市到城市线路名称'
+        rename = {route: '城市线路', "未达成量": "线路延误量"}
+        
+        columns = [rename.get(col, col) for col in self.transportation['未达成车签明细']]
+        columns.insert(1, "中心线路")
+        
+        # 按线路排序, 同一线路内保持原有顺序, 与 pandas 的稳定排序一致
+        transportation = (PolarsBackend.lazy(details, [route], self.transportation['未达成车签明细'])
+                          .filter(PolarsBackend.contains(route, self.index.flagged('干线运输占比')) & (pl.col('未达成量') > 10))
+                          .rename(rename)
+                          .join(PolarsBackend.lazy(center.table, columns=[center.key, "线路名称"]).rename({"线路名称": "中心线路"}),
+                                left_on="车签", right_on=center.key, how="left", maintain_order="left")
+                          .select(columns)
+                          .sort("城市线路", maintain_order=True))
+        
+        dtypes = {rename.get(col, col): dtype for col, dtype in details.dtypes.items()}
+        dtypes["中心线路"] = center.table['线路名称'].dtype
+        transportation = PolarsBackend.collect(transportation, dtypes)
+        
+        self.logger.info("TransportationDelay 报表制作完成(Polars).")
+        
+        return transportation
+    
+    
     def run(self) -> pd.DataFrame:
         """该类的主运行方法
 
@@ -95,7 +200,9 @@ class TransportationDelay():
         self.logger.info("TransportationDelay报表制作流程-开始.")
         
         df_list = self.data_read()
-        transportation: pd.DataFrame = self.report_production(df_list)
+        production = {"duckdb": self.report_production_sql, "polars": self.report_production_lazy}.get(
+            Backend.resolve(), self.report_production)
+        transportation: pd.DataFrame = production(df_list)
         
         self.logger.info("TransportationDelay报表制作流程-结束.")
         self.logger.info("-"*50)
@@ -0,0 +1,244 @@
+import logging
+import platform
+import json
+import sys
+import time
+import uuid
+
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Iterator
+
+from config.config import Config, LazyConfig
+
+
+def peak_rss() -> float | None:
+    """进程的峰值常驻内存(MB)
+
+    Linux/macOS 使用 resource 模块, Windows 通过 psapi 读取 PeakWorkingSetSize.
+
+    Returns:
+        float | None: 峰值常驻内存, 无法获取时为 None
+    """
+
+    try:
+        import resource
+    except ImportError:
+        pass
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 的单位是字节, Linux 是 KB
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        kernel32 = ctypes.WinDLL("kernel32")
+        psapi = ctypes.WinDLL("psapi")
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 1024 / 1024
+    except (ImportError, AttributeError, OSError):
+        pass
+
+    return None
+
+
+def count_rows(value: Any) -> int | None:
+    """统计报表或报表字典的行数
+
+    Args:
+        value (Any): DataFrame、(DataFrame, 索引) 元组或名称对应 DataFrame 的字典
+
+    Returns:
+        int | None: 行数, 无法统计时为 None
+    """
+
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, dict):
+        counts = [count_rows(v) for v in value.values()]
+        return sum(c for c in counts if c is not None)
+    if hasattr(value, "shape"):
+        return int(value.shape[0])
+    return None
+
+
+@dataclass
+class StepStats():
+    """一个步骤的耗时、行数与内存统计
+
+    cpu 与 peak_rss_delta_mb 是整个进程的数值, 补跑时并行的各天会相互计入.
+    """
+
+    name: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    peak_rss_delta_mb: float | None = None
+
+
+class RunReport():
+    """单次运行的性能报告, 记录各步骤的墙钟时间、CPU 时间、输入输出行数与峰值内存增量
+
+    运行结束后在日志中输出汇总表, 并保存为 JSON 文件, 便于比较不同日期的运行.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, mode: str = "run"):
+        """初始化 RunReport 类实例
+
+        Args:
+            mode (str, optional): 运行模式, 写入报告并作为文件名的一部分. Defaults to "run".
+        """
+
+        self.settings: dict[str, Any] = self.config.run_report
+        self.mode: str = mode
+        self.started: datetime = datetime.now()
+        self.date: str | None = None
+        self.steps: list[StepStats] = list()
+        self.stages: dict[str, dict[str, Any]] = dict()
+
+
+    @contextmanager
+    def step(self, name: str, rows_in: int | None = None) -> Iterator[StepStats]:
+        """记录一个步骤, 步骤内可以设置 rows_in 与 rows_out
+
+        Args:
+            name (str): 步骤名称
+            rows_in (int | None, optional): 输入行数. Defaults to None.
+
+        Yields:
+            StepStats: 步骤统计
+        """
+
+        stats = StepStats(name, rows_in=rows_in)
+        rss = peak_rss()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall = time.perf_counter() - wall
+            stats.cpu = time.process_time() - cpu
+            after = peak_rss()
+            if rss is not None and after is not None:
+                stats.peak_rss_delta_mb = after - rss
+            self.steps.append(stats)
+
+
+    def add_stages(self, timings: dict[str, dict[str, float]], results: dict[str, Any]) -> None:
+        """记录报表流程中各阶段的耗时与输出行数
+
+        Args:
+            timings (dict[str, dict[str, float]]): Scheduler 记录的各阶段耗时
+            results (dict[str, Any]): 各阶段的结果
+        """
+
+        for name, timing in timings.items():
+            self.stages[name] = {**timing, "rows_out": count_rows(results.get(name))}
+
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为可写入 JSON 的字典
+
+        Returns:
+            dict[str, Any]: 报告内容
+        """
+
+        return {
+            "mode": self.mode,
+            "date": self.date,
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall": sum(s.wall for s in self.steps),
+            "peak_rss_mb": peak_rss(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "steps": [asdict(s) for s in self.steps],
+            "stages": self.stages,
+        }
+
+
+    def summary(self) -> None:
+        """在日志中输出各步骤与各阶段的汇总表
+        """
+
+        def fmt(value: float | int | None, spec: str) -> str:
+            return "-" if value is None else format(value, spec)
+
+        self.logger.info(f"运行报告({self.mode}{'' if self.date is None else ' ' + self.date}):")
+        self.logger.info(f"  {'步骤':<20}{'耗时(秒)':>10}{'CPU(秒)':>10}{'输入行数':>12}{'输出行数':>12}{'峰值内存增量(MB)':>18}")
+        for s in self.steps:
+            self.logger.info(f"  {s.name:<20}{s.wall:>10.2f}{s.cpu:>10.2f}{fmt(s.rows_in, 'd'):>12}"
+                             f"{fmt(s.rows_out, 'd'):>12}{fmt(s.peak_rss_delta_mb, '.1f'):>18}")
+        for name, s in self.stages.items():
+            self.logger.info(f"    阶段 {name:<15}{s['wall']:>10.2f}{s['cpu']:>10.2f}{'':>12}{fmt(s['rows_out'], 'd'):>12}")
+
+
+    def prune(self, directory: Path) -> None:
+        """只保留最近的若干份报告
+
+        Args:
+            directory (Path): 报告文件夹
+        """
+
+        keep = self.settings['keep']
+        if not keep:
+            return
+        # 文件名以开始时间开头, 按名称排序即按时间排序
+        files = sorted(directory.glob("run-*.json"), reverse=True)
+        for p in files[keep:]:
+            try:
+                p.unlink(missing_ok=True)
+            except OSError as e:
+                self.logger.warning(f"旧的运行报告删除失败: {p}, {e!r}")
+
+
+    def save(self) -> Path | None:
+        """输出汇总表并保存 JSON 报告
+
+        Returns:
+            Path | None: 报告路径, 未启用或写入失败时为 None
+        """
+
+        self.summary()
+        if not self.settings['enabled']:
+            return None
+
+        directory = Path(self.settings['dir'])
+        name = f"run-{self.started:%Y%m%d-%H%M%S}-{self.mode}{'' if self.date is None else '-' + self.date}-{uuid.uuid4().hex[:6]}.json"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(directory / name, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            self.logger.warning(f"运行报告写入失败: {directory / name}, {e!r}")
+            return None
+
+        self.prune(directory)
+        self.logger.info(f"运行报告已保存: {directory / name}")
+
+        return directory / name
@@ -0,0 +1,156 @@
+import logging
+import time
+
+from typing import Any, Callable
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from config.config import Config, LazyConfig
+
+
+@dataclass
+class Stage():
+    """报表流程中的一个阶段
+
+    func 以关键字参数的形式接收依赖阶段的结果, 参数名即依赖阶段的名称.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    deps: list[str] = field(default_factory=list)
+
+
+class StageError(RuntimeError):
+    """阶段执行失败, 携带出错的阶段名称
+    """
+
+    def __init__(self, stage: str, error: BaseException):
+        """初始化 StageError 实例
+
+        Args:
+            stage (str): 出错的阶段名称
+            error (BaseException): 原始异常
+        """
+
+        super().__init__(f"阶段 {stage} 执行失败: {error!r}")
+        self.stage: str = stage
+        self.error: BaseException = error
+
+
+class Scheduler():
+    """按依赖关系调度各阶段, 相互独立的阶段在线程池中并行执行
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, stages: list[Stage], workers: int | None = None):
+        """初始化 Scheduler 类实例
+
+        Args:
+            stages (list[Stage]): 阶段列表
+            workers (int | None, optional): 线程数, 为空时使用配置文件中的值. Defaults to None.
+
+        Raises:
+            ValueError: 阶段重名、依赖不存在或存在循环依赖
+        """
+
+        self.stages: dict[str, Stage] = dict()
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"阶段名称重复: {stage.name}")
+            self.stages[stage.name] = stage
+
+        self.workers: int = workers or self.config.scheduler['workers']
+        # 各阶段的墙钟时间与所在线程的 CPU 时间(秒)
+        self.timings: dict[str, dict[str, float]] = dict()
+        self._validate()
+
+
+    def _validate(self) -> None:
+        """检查依赖是否存在以及是否有环
+
+        Raises:
+            ValueError: 依赖不存在或存在循环依赖
+        """
+
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"阶段 {stage.name} 的依赖不存在: {missing}")
+
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"阶段之间存在循环依赖: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+
+    def _call(self, stage: Stage, results: dict[str, Any]) -> tuple[Any, dict[str, float]]:
+        """执行单个阶段并计时
+
+        Args:
+            stage (Stage): 阶段
+            results (dict[str, Any]): 已完成阶段的结果
+
+        Returns:
+            tuple[Any, dict[str, float]]: 阶段结果与耗时, 耗时包括墙钟时间(wall)与线程 CPU 时间(cpu), 单位为秒
+        """
+
+        start = time.perf_counter()
+        cpu = time.thread_time()
+        result = stage.func(**{dep: results[dep] for dep in stage.deps})
+        return result, {"wall": time.perf_counter() - start, "cpu": time.thread_time() - cpu}
+
+
+    def run(self) -> dict[str, Any]:
+        """执行全部阶段, 依赖就绪的阶段立即提交到线程池
+
+        Returns:
+            dict[str, Any]: 阶段名称对应的结果
+
+        Raises:
+            StageError: 任一阶段执行失败
+        """
+
+        self.logger.info(f"阶段调度开始, 共 {len(self.stages)} 个阶段, 线程数 {self.workers}.")
+
+        results: dict[str, Any] = dict()
+        pending: dict[Future, str] = dict()
+        waiting: dict[str, Stage] = dict(self.stages)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stage") as executor:
+            while waiting or pending:
+                for name, stage in list(waiting.items()):
+                    if all(dep in results for dep in stage.deps):
+                        pending[executor.submit(self._call, stage, results)] = name
+                        del waiting[name]
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        result, timing = future.result()
+                    except Exception as e:
+                        for other in pending:
+                            other.cancel()
+                        self.logger.error(f"阶段 {name} 执行失败: {e!r}")
+                        raise StageError(name, e) from e
+                    results[name] = result
+                    self.timings[name] = timing
+                    self.logger.info(f"阶段 {name} 完成, 耗时 {timing['wall']:.2f} 秒, CPU {timing['cpu']:.2f} 秒.")
+
+        self.logger.info("阶段调度结束.")
+
+        return results
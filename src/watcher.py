@@ -0,0 +1,220 @@
+import pandas as pd
+import logging
+import time
+
+from pathlib import Path
+from datetime import datetime
+
+from config.config import Config, LazyConfig
+from src.dataprocess.DataProcess import DataRead
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.HistoryStore import HistoryStore
+from src.dataprocess.ReportCache import ReportCache
+from src.main_process import MainProcess
+from src.scheduler import Scheduler, Stage
+
+
+class Watcher():
+    """监听模式: 轮询数据文件夹, 某个文件变化时只重新制作使用该文件的报表及其下游报表
+
+    源文件缓存与上一轮的报表常驻内存, 未受影响的报表直接沿用.
+    """
+
+    config: Config = LazyConfig()
+    logger: logging.Logger = logging.getLogger(f"TaotianReport.{__name__}")
+
+    def __init__(self, interval: float | None = None):
+        """初始化 Watcher 类实例
+
+        Args:
+            interval (float | None, optional): 轮询间隔(秒), 为空时使用配置文件中的值. Defaults to None.
+        """
+
+        self.interval: float = interval or self.config.watch['interval']
+        self.settle: float = self.config.watch['settle']
+        self.process: MainProcess = MainProcess()
+        self.dataread: DataRead = DataRead()
+        self.store: SourceStore = SourceStore()
+        self.history: HistoryStore = HistoryStore()
+        self.memo: ReportCache = ReportCache()
+        self.report_path: dict[str, list[Path]] = dict()
+        self.results: dict[str, object] = dict()
+
+
+    @staticmethod
+    def _guard(stage: Stage) -> Stage:
+        """包装阶段, 使单个报表失败(如文件尚未到达)不影响其他报表
+
+        依赖阶段的结果为 None 时直接跳过.
+
+        Args:
+            stage (Stage): 阶段
+
+        Returns:
+            Stage: 包装后的阶段, 失败时结果为 None
+        """
+
+        def func(**deps):
+            missing = [name for name, value in deps.items() if value is None]
+            if missing:
+                Watcher.logger.info(f"阶段 {stage.name} 的依赖 {missing} 尚未就绪, 跳过.")
+                return None
+            try:
+                return stage.func(**deps)
+            except Exception as e:
+                Watcher.logger.warning(f"阶段 {stage.name} 执行失败, 等待文件更新后重试: {e!r}")
+                return None
+
+        return Stage(stage.name, func, stage.deps)
+
+
+    @staticmethod
+    def downstream(stages: list[Stage], names: set[str]) -> set[str]:
+        """获取受影响的阶段及依赖它们的全部下游阶段
+
+        Args:
+            stages (list[Stage]): 阶段列表
+            names (set[str]): 直接受影响的阶段
+
+        Returns:
+            set[str]: 需要重新执行的阶段
+        """
+
+        affected = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for stage in stages:
+                if stage.name not in affected and affected & set(stage.deps):
+                    affected.add(stage.name)
+                    changed = True
+
+        return affected
+
+
+    def affected(self, report_path: dict[str, list[Path]], changes: dict[str, list[str]]) -> set[str]:
+        """根据文件变化确定直接受影响的报表类别
+
+        新增、变化与缺失的文件都会使所在类别重新制作; 上一轮没有结果的报表也会重试.
+
+        Args:
+            report_path (dict[str, list[Path]]): 本轮的类别对应路径字典
+            changes (dict[str, list[str]]): 文件清单的变化
+
+        Returns:
+            set[str]: 受影响的类别
+        """
+
+        changed = {str(Path(p).resolve()) for kind in ("new", "changed", "missing") for p in changes[kind]}
+
+        names: set[str] = set()
+        for mapping in (report_path, self.report_path):
+            for label, paths in mapping.items():
+                if any(str(Path(p).resolve()) in changed for p in paths):
+                    names.add(label)
+
+        names |= {name for name in ["gpt", *self.process.REPORTS] if self.results.get(name) is None}
+
+        return names
+
+
+    def scan(self) -> tuple[dict[str, list[Path]], dict[str, list[str]]]:
+        """扫描数据文件夹, 等待正在写入的文件稳定后返回
+
+        两次扫描之间文件清单没有变化才视为稳定.
+
+        Returns:
+            tuple[dict[str, list[Path]], dict[str, list[str]]]: 类别对应路径字典与相对上一轮的文件变化
+        """
+
+        report_path = self.dataread.run()
+        changes = self.dataread.changes
+        while any(changes.values()):
+            time.sleep(self.settle)
+            previous = dict(self.dataread.manifest.entries)
+            report_path = self.dataread.run()
+            if self.dataread.manifest.entries == previous:
+                break
+            # 本轮与上一轮的变化合并, 直到文件写入完成
+            for kind in changes:
+                changes[kind] = sorted(set(changes[kind]) | set(self.dataread.changes[kind]))
+
+        return report_path, changes
+
+
+    def update(self, report_path: dict[str, list[Path]], changes: dict[str, list[str]]) -> set[str]:
+        """重新制作受影响的报表, 并重写工作簿
+
+        Args:
+            report_path (dict[str, list[Path]]): 类别对应路径字典
+            changes (dict[str, list[str]]): 文件清单的变化
+
+        Returns:
+            set[str]: 重新制作的报表
+        """
+
+        self.store.disk.fingerprints.update(self.dataread.manifest.entries)
+        self.memo.fingerprints.update(self.dataread.manifest.entries)
+        self.store.invalidate([Path(p) for kind in ("changed", "missing") for p in changes[kind]])
+
+        stages = self.process.stages(report_path, self.store, self.memo)
+        rerun = self.downstream(stages, self.affected(report_path, changes))
+        self.report_path = report_path
+        if not rerun:
+            return rerun
+
+        self.logger.info(f"重新制作报表: {sorted(rerun)}")
+        subgraph: list[Stage] = list()
+        for stage in stages:
+            if stage.name in rerun:
+                subgraph.append(self._guard(stage))
+            else:
+                subgraph.append(Stage(stage.name, lambda value=self.results[stage.name]: value))
+        self.results.update(Scheduler(subgraph).run())
+
+        missing = [name for name in ["gpt", *self.process.REPORTS] if self.results.get(name) is None]
+        if missing:
+            self.logger.warning(f"以下报表尚未完成, 暂不输出工作簿: {missing}")
+            return rerun
+
+        gpt, _ = self.results["gpt"]
+        reports: dict[str, pd.DataFrame] = {"gpt": gpt, **{name: self.results[name] for name in self.process.REPORTS}}
+        self.process.write(reports, self.process.output_file(datetime.now()))
+        try:
+            date = self.process.run_date(report_path, self.store)
+            self.history.save(date, reports, self.process.input_stamp(report_path, self.store))
+        except FileNotFoundError as e:
+            self.logger.warning(f"历史库写入跳过: {e}")
+
+        return rerun
+
+
+    def run(self, cycles: int | None = None) -> None:
+        """监听模式主运行方法, Ctrl+C 退出
+
+        Args:
+            cycles (int | None, optional): 轮询次数, 为空时一直运行. Defaults to None.
+        """
+
+        self.logger.info("-"*50)
+        self.logger.info(f"监听模式-开始, 数据文件夹 {self.dataread.dir_path}, 轮询间隔 {self.interval} 秒.")
+
+        count = 0
+        try:
+            while cycles is None or count < cycles:
+                start = time.perf_counter()
+                report_path, changes = self.scan()
+                rerun = self.update(report_path, changes)
+                if rerun:
+                    self.logger.info(f"本轮更新完成, 耗时 {time.perf_counter() - start:.2f} 秒.")
+                count += 1
+                if cycles is None or count < cycles:
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            self.logger.info("收到退出信号.")
+        finally:
+            self.store.clear()
+            self.memo.evict()
+
+        self.logger.info("监听模式-结束.")
+        self.logger.info("-"*50)
@@ -0,0 +1,101 @@
+"""Excel 解析引擎基准测试
+
+在项目根目录下运行:
+    python -m test.bench_engine --rows 100000
+
+生成一个与"未达成车签明细"形状相近的宽表, 分别用 openpyxl、流式读取器和 calamine
+读取需要的列, 输出各引擎的耗时.
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from config.config import Config
+from src.dataprocess.SourceStore import SourceStore
+from src.dataprocess.StreamReader import StreamReader
+
+
+def make_workbook(path: Path, rows: int, extra_cols: int) -> None:
+    """生成测试用的工作簿
+
+    Args:
+        path (Path): 输出路径
+        rows (int): 行数
+        extra_cols (int): 配置文件之外的无关列数量
+    """
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "城市到城市线路名称": rng.choice([f"城市{i}-城市{i + 1}" for i in range(500)], rows),
+        "车签": [f"T{i:09d}" for i in range(rows)],
+        "车型": rng.choice(["9.6米", "13米", "17.5米"], rows),
+        "车签始发中心": rng.choice([f"中心{i}" for i in range(80)], rows),
+        "车签目的中心": rng.choice([f"中心{i}" for i in range(80)], rows),
+        "实际发车日期": pd.Timestamp("2025-11-19") + pd.to_timedelta(rng.integers(0, 86400, rows), unit="s"),
+        "实际到达日期": pd.Timestamp("2025-11-20") + pd.to_timedelta(rng.integers(0, 86400, rows), unit="s"),
+        "最晚发车时间": "2025-11-19 21:00:00",
+        "未达成量": rng.integers(0, 500, rows),
+        "是否路由频次延误": rng.choice(["是", "否"], rows, p=[0.1, 0.9]),
+    })
+    for i in range(extra_cols):
+        df[f"其他字段{i}"] = rng.integers(0, 1000, rows)
+
+    df.to_excel(path, index=False)
+
+
+def timed(func) -> tuple[float, int]:
+    """执行并计时
+
+    Args:
+        func (Callable): 读取函数
+
+    Returns:
+        tuple[float, int]: 耗时(秒)与读取到的行数
+    """
+
+    start = time.perf_counter()
+    df = func()
+    return time.perf_counter() - start, len(df)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="比较各 Excel 解析引擎的读取耗时")
+    parser.add_argument("--rows", type=int, default=50000, help="测试表格的行数")
+    parser.add_argument("--extra-cols", type=int, default=30, help="无关列的数量")
+    args = parser.parse_args()
+
+    columns = Config.from_json().routing["未达成车签明细"][:9]
+    filters = {"是否路由频次延误": ["是"]}
+    usecols = columns + list(filters)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "未达成车签明细.xlsx"
+        make_workbook(path, args.rows, args.extra_cols)
+
+        cases = {
+            "openpyxl 全表读取": lambda: pd.read_excel(path, engine="openpyxl"),
+            "openpyxl 列裁剪": lambda: pd.read_excel(path, engine="openpyxl", usecols=usecols),
+            "流式读取(列裁剪+行过滤)": lambda: StreamReader().read(path, columns, [filters]),
+        }
+        if SourceStore.resolve_engine("auto") == "calamine":
+            cases["calamine 全表读取"] = lambda: pd.read_excel(path, engine="calamine")
+            cases["calamine 列裁剪"] = lambda: pd.read_excel(path, engine="calamine", usecols=usecols)
+        else:
+            print("未安装 python-calamine, 跳过 calamine 引擎.")
+
+        print(f"行数 {args.rows}, 列数 {10 + args.extra_cols}")
+        baseline = None
+        for name, func in cases.items():
+            elapsed, rows = timed(func)
+            baseline = baseline or elapsed
+            print(f"{name:<24} {elapsed:>8.2f} 秒  {rows:>9} 行  {baseline / elapsed:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
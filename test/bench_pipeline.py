@@ -0,0 +1,245 @@
+"""报表流程各阶段的基准测试
+
+在项目根目录下运行:
+    python -m test.bench_pipeline --rows 100000 --out bench_100k.json
+    python -m test.bench_pipeline --data ./bench_data --out after.json --compare before.json
+
+分别计时 DataRead、GPT、各延误/库存报表与 Excel 导出, 并用 tracemalloc 记录每个阶段的内存峰值.
+计时与内存测量分两轮进行, 避免 tracemalloc 的开销影响计时. 结果保存为 JSON, 可与之前的结果对比.
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable
+
+from src.dataprocess.DataProcess import DataRead
+from src.dataprocess.SourceStore import SourceStore
+from src.main_process import MainProcess
+from test.gen_data import DataGenerator
+
+
+class PipelineBench():
+    """按阶段运行报表流程并记录耗时与内存峰值
+    """
+
+    def __init__(self, data: Path, shared_store: bool = False, disk_cache: bool = False):
+        """初始化 PipelineBench 类实例
+
+        Args:
+            data (Path): 数据文件夹
+            shared_store (bool, optional): 各阶段是否共用同一个源文件缓存, 否则每个报表单独解析自己的文件. Defaults to False.
+            disk_cache (bool, optional): 是否启用磁盘缓存. Defaults to False.
+        """
+
+        self.data: Path = Path(data)
+        self.shared_store: bool = shared_store
+        self.disk_cache: bool = disk_cache
+        self.process: MainProcess = MainProcess()
+        self.store: SourceStore | None = None
+
+
+    def new_store(self) -> SourceStore:
+        """获取阶段使用的源文件缓存
+
+        Returns:
+            SourceStore: 源文件缓存
+        """
+
+        if self.shared_store and self.store is not None:
+            return self.store
+        store = SourceStore()
+        store.disk.enabled = self.disk_cache
+        self.store = store
+        return store
+
+
+    def stages(self, out: Path) -> list[tuple[str, Callable[[dict], Any]]]:
+        """按流程顺序列出各阶段, 每个阶段从上下文中读取前面阶段的结果
+
+        Args:
+            out (Path): Excel 导出的路径
+
+        Returns:
+            list[tuple[str, Callable[[dict], Any]]]: 阶段名称与执行函数
+        """
+
+        reports = self.process.load_reports()
+
+        def report(name: str) -> Callable[[dict], Any]:
+            def run(ctx: dict) -> pd.DataFrame:
+                gpt, index = ctx['gpt']
+                return reports[name](gpt, ctx['DataRead'].get(name, list()), self.new_store(), index).run()
+            return run
+
+        def export(ctx: dict) -> None:
+            gpt, _ = ctx['gpt']
+            self.process.write({"gpt": gpt, **{name: ctx[name] for name in self.process.REPORTS}}, out)
+
+        return [
+            ("DataRead", lambda ctx: DataRead(self.data).run()),
+            ("gpt", lambda ctx: reports['gpt'](ctx['DataRead']['gpt'], self.new_store()).run()),
+            *[(name, report(name)) for name in self.process.REPORTS],
+            ("export", export),
+        ]
+
+
+    @staticmethod
+    def rows(result: Any) -> int | None:
+        """阶段结果的行数
+
+        Args:
+            result (Any): 阶段结果
+
+        Returns:
+            int | None: 行数, 结果不是表格时为 None
+        """
+
+        if isinstance(result, tuple):
+            result = result[0]
+        if isinstance(result, pd.DataFrame):
+            return len(result)
+        if isinstance(result, dict):
+            return sum(len(paths) for paths in result.values())
+        return None
+
+
+    def run_once(self, out: Path, memory: bool = False) -> dict[str, dict]:
+        """运行一轮全部阶段
+
+        Args:
+            out (Path): Excel 导出的路径
+            memory (bool, optional): 是否记录内存峰值. Defaults to False.
+
+        Returns:
+            dict[str, dict]: 阶段名称对应的耗时、行数与内存峰值
+        """
+
+        self.store = None
+        ctx: dict[str, Any] = dict()
+        stats: dict[str, dict] = dict()
+        if memory:
+            tracemalloc.start()
+
+        try:
+            for name, func in self.stages(out):
+                if memory:
+                    tracemalloc.reset_peak()
+                    base, _ = tracemalloc.get_traced_memory()
+                start = time.perf_counter()
+                ctx[name] = func(ctx)
+                stats[name] = {"seconds": time.perf_counter() - start, "rows": self.rows(ctx[name])}
+                if memory:
+                    _, peak = tracemalloc.get_traced_memory()
+                    stats[name]['peak_mb'] = (peak - base) / 1024 / 1024
+        finally:
+            if memory:
+                tracemalloc.stop()
+
+        return stats
+
+
+    def run(self, out: Path, repeat: int = 1, memory: bool = True) -> dict[str, dict]:
+        """多轮计时取最小值, 再单独运行一轮记录内存峰值
+
+        Args:
+            out (Path): Excel 导出的路径
+            repeat (int, optional): 计时的轮数. Defaults to 1.
+            memory (bool, optional): 是否记录内存峰值. Defaults to True.
+
+        Returns:
+            dict[str, dict]: 阶段名称对应的统计
+        """
+
+        rounds = [self.run_once(out) for _ in range(repeat)]
+        stats = {name: dict(s, seconds=min(r[name]['seconds'] for r in rounds)) for name, s in rounds[0].items()}
+        if memory:
+            for name, s in self.run_once(out, memory=True).items():
+                stats[name]['peak_mb'] = s['peak_mb']
+
+        return stats
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """输出两次结果的对比
+
+    Args:
+        current (dict): 本次结果
+        baseline (dict): 对比的结果
+    """
+
+    print(f"\n对比 {baseline['meta']['created']} ({baseline['meta']['rows']} 行)")
+    print(f"{'阶段':<16}{'之前(秒)':>10}{'现在(秒)':>10}{'加速':>8}{'之前(MB)':>11}{'现在(MB)':>11}")
+    for name, s in current['stages'].items():
+        b = baseline['stages'].get(name)
+        if b is None:
+            continue
+        speedup = b['seconds'] / s['seconds'] if s['seconds'] else float("inf")
+        print(f"{name:<16}{b['seconds']:>10.3f}{s['seconds']:>10.3f}{speedup:>7.2f}x"
+              f"{b.get('peak_mb', float('nan')):>11.1f}{s.get('peak_mb', float('nan')):>11.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="报表流程各阶段的耗时与内存基准测试")
+    parser.add_argument("--rows", type=int, default=10000, help="生成数据时明细表的行数")
+    parser.add_argument("--outlets", type=int, default=5, help="生成数据时交件/派签中每条线路的网点数")
+    parser.add_argument("--data", type=Path, default=None, help="使用已有的数据文件夹, 不再生成")
+    parser.add_argument("--repeat", type=int, default=1, help="计时的轮数, 取最小值")
+    parser.add_argument("--no-memory", action="store_true", help="不记录内存峰值")
+    parser.add_argument("--shared-store", action="store_true", help="各阶段共用同一个源文件缓存")
+    parser.add_argument("--disk-cache", action="store_true", help="启用磁盘缓存")
+    parser.add_argument("--out", type=Path, default=None, help="结果 JSON 的保存路径")
+    parser.add_argument("--compare", type=Path, default=None, help="与之前保存的结果 JSON 对比")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = args.data
+        if data is None:
+            data = Path(tmp) / "data"
+            DataGenerator(data, args.rows, outlets=args.outlets).run()
+
+        bench = PipelineBench(data, args.shared_store, args.disk_cache)
+        stats = bench.run(Path(tmp) / "report.xlsx", args.repeat, not args.no_memory)
+
+    result = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "rows": args.rows if args.data is None else str(args.data),
+            "outlets": args.outlets if args.data is None else None,
+            "repeat": args.repeat,
+            "shared_store": args.shared_store,
+            "disk_cache": args.disk_cache,
+            "engine": SourceStore.resolve_engine(SourceStore.config.reader['engine']),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "stages": stats,
+    }
+
+    print(f"\n{'阶段':<16}{'耗时(秒)':>10}{'行数':>10}{'内存峰值(MB)':>14}")
+    for name, s in stats.items():
+        rows = "" if s['rows'] is None else s['rows']
+        print(f"{name:<16}{s['seconds']:>10.3f}{rows:>10}{s.get('peak_mb', float('nan')):>14.1f}")
+    print(f"{'合计':<16}{sum(s['seconds'] for s in stats.values()):>10.3f}")
+
+    if args.out is not None:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.out}")
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
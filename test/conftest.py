@@ -0,0 +1,29 @@
+import os
+import pytest
+
+from pathlib import Path
+
+from config.config import Config
+
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+# 配置文件按相对路径 ./config/config.json 读取, 测试需要在项目根目录下运行
+os.chdir(ROOT)
+
+
+@pytest.fixture
+def config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Config:
+    """进程内共享的配置, 数据文件夹指向临时目录, 缓存与历史库不会写入项目目录
+
+    Args:
+        tmp_path (Path): pytest 提供的临时目录
+        monkeypatch (pytest.MonkeyPatch): 测试结束后还原修改
+
+    Returns:
+        Config: 配置实例
+    """
+
+    config = Config.instance()
+    monkeypatch.setattr(config, "datapath", str(tmp_path / "data"))
+    return config
@@ -0,0 +1,243 @@
+"""合成测试数据生成器
+
+在项目根目录下运行:
+    python -m test.gen_data --rows 100000 --out ./bench_data
+
+按配置文件中的列名生成与导出文件形状一致的全部输入表格, 城市取自城市对应中心基础表,
+数值分布参照实际导出(延误量右偏、少量线路集中了大部分延误、"是否...延误"约一成为"是").
+xlsx 单个工作表最多 1048575 行数据, 超过时明细表按该上限截断, 线路罚款(csv)不受限制.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from config.config import Config
+from src.dataprocess.ReportWriter import ReportWriter
+
+
+# xlsx 单个工作表除表头外最多的行数
+EXCEL_MAX_ROWS: int = 1048575
+
+
+def write_excel(df: pd.DataFrame, path: Path) -> None:
+    """使用报表写入器按行流式写出表格, 大表也只占用少量内存
+
+    Args:
+        df (pd.DataFrame): 数据
+        path (Path): 输出路径
+    """
+
+    with ReportWriter(path) as writer:
+        writer.write_sheet(df, "Sheet1", num_formats=dict())
+
+
+class DataGenerator():
+    """按配置文件的列名生成全部输入表格
+    """
+
+    config: Config = Config.instance()
+
+    def __init__(self, out: Path, rows: int, date: str = "2025-11-19", seed: int = 0, outlets: int = 5):
+        """初始化 DataGenerator 类实例
+
+        Args:
+            out (Path): 输出文件夹
+            rows (int): 明细表(未达成车签明细、线路罚款)的行数, 线路数按行数的 1/20 增长
+            date (str, optional): 数据日期. Defaults to "2025-11-19".
+            seed (int, optional): 随机数种子, 相同参数生成相同的数据. Defaults to 0.
+            outlets (int, optional): "交件"/"派签"中每条线路的网点数, 5 与导出截断后的形状一致, 更大时生成未截断的网点明细. Defaults to 5.
+        """
+
+        self.out: Path = Path(out)
+        self.rows: int = rows
+        self.outlet_count: int = outlets
+        self.date: pd.Timestamp = pd.Timestamp(date)
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        center = pd.read_excel("./config/城市对应中心基础表1119.xlsx")
+        self.cities: list[str] = center['城市'].astype(str).tolist()
+        self.centers: list[str] = sorted(center['发货中心'].astype(str).unique())
+
+        # 线路数随规模增长, 上限为城市两两组合的数量
+        n_routes = int(np.clip(rows // 20, 50, len(self.cities) * (len(self.cities) - 1)))
+        pairs: set[str] = set()
+        while len(pairs) < n_routes:
+            a, b = self.rng.choice(self.cities, 2, replace=False)
+            pairs.add(f"{a}-{b}")
+        self.routes: np.ndarray = np.array(sorted(pairs))
+
+        # 线路权重服从 Zipf 分布, 少数线路集中了大部分明细
+        weights = 1 / np.arange(1, len(self.routes) + 1) ** 0.8
+        self.weights: np.ndarray = self.rng.permutation(weights / weights.sum())
+
+
+    def yes_no(self, n: int, p: float = 0.1) -> np.ndarray:
+        """生成"是"/"否"列
+
+        Args:
+            n (int): 行数
+            p (float, optional): "是"的比例. Defaults to 0.1.
+
+        Returns:
+            np.ndarray: 数据
+        """
+
+        return np.where(self.rng.random(n) < p, "是", "否")
+
+
+    def timestamps(self, n: int, day_offset: int = 0) -> pd.DatetimeIndex:
+        """生成数据日期当天(或之后若干天)内均匀分布的时间
+
+        Args:
+            n (int): 行数
+            day_offset (int, optional): 相对数据日期的天数. Defaults to 0.
+
+        Returns:
+            pd.DatetimeIndex: 时间
+        """
+
+        seconds = self.rng.integers(0, 86400, n)
+        return self.date + pd.Timedelta(days=day_offset) + pd.to_timedelta(seconds, unit="s")
+
+
+    def gpt(self) -> None:
+        """生成"各环节延误量"与"城市线路汇总-日"
+        """
+
+        n = len(self.routes)
+        stages = self.config.gpt['计算列']
+        delay = pd.DataFrame({"城市线路名称": self.routes})
+        for col in stages:
+            delay[col] = self.rng.lognormal(4, 1.2, n).astype(int)
+        top3 = np.argsort(-delay[stages].to_numpy(), axis=1)[:, :3]
+        delay.insert(1, "延误量最大3环节", [",".join(stages[i][:-3] for i in row) for row in top3])
+        delay.insert(2, "线路未达成量", delay[stages].sum(axis=1))
+        write_excel(delay, self.out / "淘天平台线路时效分析-各环节延误量.xlsx")
+
+        rate = self.rng.beta(18, 2, n) * 100
+        summary = pd.DataFrame({
+            "日期": self.date.strftime("%Y-%m-%d"),
+            "揽收城市": [r.split("-")[0] for r in self.routes],
+            "签收城市": [r.split("-")[1] for r in self.routes],
+            "城市线路名称": self.routes,
+            "标准": self.rng.choice(["D1", "D2", "D3"], n, p=[0.5, 0.35, 0.15]),
+            "达成率(%)": rate.round(2),
+            "与第一差值(%)": (rate.max() - rate).round(2),
+            "影响量": self.rng.lognormal(5, 1, n).astype(int),
+        })
+        write_excel(summary, self.out / "淘天平台线路时效分析-城市线路汇总-日.xlsx")
+
+
+    def details(self) -> None:
+        """生成"未达成车签明细"与"线路罚款"
+        """
+
+        n = min(self.rows, EXCEL_MAX_ROWS)
+        if n < self.rows:
+            print(f"未达成车签明细超过 xlsx 行数上限, 截断为 {n} 行.")
+
+        tags = np.char.add("T", np.char.zfill(np.arange(self.rows).astype(str), 10))
+        depart = self.timestamps(n)
+        latest = depart - pd.to_timedelta(self.rng.integers(0, 6 * 3600, n), unit="s")
+        details = pd.DataFrame({
+            "城市到城市线路名称": self.rng.choice(self.routes, n, p=self.weights),
+            "车签": tags[:n],
+            "车型": self.rng.choice(["9.6米", "13米", "17.5米"], n, p=[0.3, 0.3, 0.4]),
+            "车签始发中心": self.rng.choice(self.centers, n),
+            "车签目的中心": self.rng.choice(self.centers, n),
+            "实际发车日期": depart,
+            "实际到达日期": depart + pd.to_timedelta(self.rng.integers(4 * 3600, 40 * 3600, n), unit="s"),
+            "最晚发车时间": latest.strftime("%Y-%m-%d %H:%M:%S"),
+            "未达成量": self.rng.lognormal(4, 1.3, n).astype(int),
+            "预计清场时间": self.timestamps(n, 1),
+            "事件类型": self.rng.choice(["晚发", "晚到", "拥堵", "天气"], n),
+            "始发影响清场": self.yes_no(n, 0.3),
+            "是否路由频次延误": self.yes_no(n),
+            "是否干线运输延误": self.yes_no(n),
+        })
+        write_excel(details, self.out / "淘天平台线路时效分析-未达成车签明细.xlsx")
+
+        fine = pd.DataFrame({
+            "线路名称": np.char.add("中心线路", self.rng.integers(0, max(10, self.rows // 200), self.rows).astype(str)),
+            "电子车签": tags,
+            "罚款金额": self.rng.integers(0, 500, self.rows),
+        })
+        with open(self.out / "线路罚款.csv", "w", encoding="gb18030", newline="") as f:
+            f.write("线路罚款明细导出\n")
+            fine.to_csv(f, index=False)
+
+
+    def inventory(self) -> None:
+        """生成"进港环节"/"出港环节"与两张超时库存表
+        """
+
+        n = len(self.routes)
+        m = len(self.centers)
+        for side in ("进港", "出港"):
+            write_excel(pd.DataFrame({
+                "城市线路名称": self.routes,
+                "揽收城市名称": [r.split("-")[0] for r in self.routes],
+                f"{side}超时库存": self.rng.poisson(20, n),
+            }), self.out / f"淘天平台线路时效分析-{side}环节.xlsx")
+
+        write_excel(pd.DataFrame({
+            "中心名称": self.centers,
+            "清场超时库存票数": self.rng.poisson(300, m),
+            "清场超时库存占比": self.rng.uniform(0, 5, m).round(2),
+        }), self.out / "进港超时库存.xlsx")
+        write_excel(pd.DataFrame({
+            "中心名称": self.centers,
+            "发车超时库存票数": self.rng.poisson(300, m),
+            "超时库存占比": self.rng.uniform(0, 5, m).round(2),
+        }), self.out / "出港超时库存.xlsx")
+
+
+    def outlets(self) -> None:
+        """生成"交件"与"派签", 每条线路 outlets 个网点; 不超过 5 时与导出一致按延误量降序, 否则为未截断的乱序明细
+        """
+
+        k = min(self.outlet_count, EXCEL_MAX_ROWS // len(self.routes))
+        n = len(self.routes) * k
+        for name, col in (("交件", "交件延误量"), ("派签", "延误量")):
+            delay = self.rng.lognormal(2.5, 1, (len(self.routes), k)).astype(int)
+            if k <= 5:
+                delay = -np.sort(-delay, axis=1)
+            write_excel(pd.DataFrame({
+                "城市线路名称": np.repeat(self.routes, k),
+                "责任网点": np.char.add("网点", self.rng.integers(0, max(20, len(self.routes) // 2), n).astype(str)),
+                "责任中心名称": self.rng.choice(self.centers, n),
+                col: delay.ravel(),
+            }), self.out / f"淘天平台线路时效分析-{name}.xlsx")
+
+
+    def run(self) -> None:
+        """生成全部表格
+        """
+
+        self.out.mkdir(parents=True, exist_ok=True)
+        for step in (self.gpt, self.details, self.inventory, self.outlets):
+            start = time.perf_counter()
+            step()
+            print(f"{step.__name__:<10} {time.perf_counter() - start:>8.2f} 秒")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="生成合成的输入表格")
+    parser.add_argument("--rows", type=int, default=10000, help="明细表的行数, 1000 至 5000000")
+    parser.add_argument("--out", type=Path, default=Path("./bench_data"), help="输出文件夹")
+    parser.add_argument("--date", default="2025-11-19", help="数据日期")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--outlets", type=int, default=5, help="交件/派签中每条线路的网点数, 大于 5 时生成未截断的明细")
+    args = parser.parse_args()
+
+    DataGenerator(args.out, args.rows, args.date, args.seed, args.outlets).run()
+    print(f"已生成 {args.rows} 行规模的数据: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""pandas 与可选后端(DuckDB、Polars)的报表一致性检查
+
+在项目根目录下运行:
+    python -m test.parity_backends --rows 20000
+    python -m test.parity_backends --data ./data --engines polars
+
+每个报表用同一份读取结果分别以 pandas 与各后端制作, 比较列、行顺序、类型与数值, 并输出各后端的耗时.
+有不一致或后端未安装时退出码为 1.
+自动化检查见 test/test_parity_backends.py, 随 python -m pytest 运行.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from pathlib import Path
+from typing import Any
+
+from src.dataprocess.Backend import Backend
+from src.dataprocess.DataProcess import DataRead
+from src.dataprocess.RouteIndex import RouteIndex
+from src.dataprocess.SourceStore import SourceStore
+from src.main_process import MainProcess
+from test.gen_data import DataGenerator
+
+
+# 后端名称对应的报表制作方法
+METHODS: dict[str, str] = {
+    "pandas": "report_production",
+    "duckdb": "report_production_sql",
+    "polars": "report_production_lazy",
+}
+
+
+class BackendParity():
+    """用同一份数据比较各后端制作的报表
+    """
+
+    def __init__(self, data: Path):
+        """初始化 BackendParity 类实例
+
+        Args:
+            data (Path): 数据文件夹
+        """
+
+        self.data: Path = Path(data)
+        self.process: MainProcess = MainProcess()
+
+
+    def inputs(self) -> list[tuple[str, Any, Any]]:
+        """读取各报表的输入数据, GPT 报表与线路索引由 pandas 流程制作, 保证各后端的输入一致
+
+        Returns:
+            list[tuple[str, Any, Any]]: 报表名称、报表实例与 data_read 的结果
+        """
+
+        paths = DataRead(self.data).run()
+        store = SourceStore()
+        store.disk.enabled = False
+        reports = self.process.load_reports()
+
+        gpt_report = reports['gpt'](paths['gpt'], store)
+        gpt_input = gpt_report.data_read()
+        gpt = gpt_report.report_production(gpt_input)
+        index = RouteIndex.from_gpt(gpt)
+
+        inputs = [("gpt", gpt_report, gpt_input)]
+        for name in self.process.REPORTS:
+            report = reports[name](gpt, paths.get(name, list()), store, index)
+            inputs.append((name, report, report.data_read()))
+
+        return inputs
+
+
+    @staticmethod
+    def produce(report: Any, df_list: Any, engine: str) -> tuple[pd.DataFrame, float]:
+        """用指定后端制作报表
+
+        Args:
+            report (Any): 报表实例
+            df_list (Any): data_read 的结果
+            engine (str): 后端名称
+
+        Returns:
+            tuple[pd.DataFrame, float]: 报表与耗时(秒)
+        """
+
+        start = time.perf_counter()
+        result = getattr(report, METHODS[engine])(df_list)
+        return result.reset_index(drop=True), time.perf_counter() - start
+
+
+    def run(self, engines: list[str]) -> list[dict[str, Any]]:
+        """逐个报表比较 pandas 与各后端的结果
+
+        Args:
+            engines (list[str]): 需要比较的后端
+
+        Returns:
+            list[dict[str, Any]]: 每个报表与后端的比较结果
+        """
+
+        results: list[dict[str, Any]] = list()
+        for name, report, df_list in self.inputs():
+            expected, seconds = self.produce(report, df_list, "pandas")
+            results.append({"report": name, "engine": "pandas", "rows": len(expected), "seconds": seconds, "error": None})
+            for engine in engines:
+                actual, seconds = self.produce(report, df_list, engine)
+                try:
+                    pd.testing.assert_frame_equal(expected, actual)
+                    error = None
+                except AssertionError as e:
+                    error = str(e)
+                results.append({"report": name, "engine": engine, "rows": len(actual), "seconds": seconds, "error": error})
+
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pandas 与可选后端的报表一致性检查")
+    parser.add_argument("--rows", type=int, default=10000, help="生成数据时明细表的行数")
+    parser.add_argument("--data", type=Path, default=None, help="使用已有的数据文件夹, 不再生成")
+    parser.add_argument("--engines", nargs="+", default=["duckdb", "polars"], choices=["duckdb", "polars"],
+                        help="需要比较的后端")
+    args = parser.parse_args()
+
+    missing = [engine for engine in args.engines if Backend.resolve(engine) != engine]
+    if missing:
+        print(f"后端未安装: {missing}")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = args.data
+        if data is None:
+            data = Path(tmp) / "data"
+            DataGenerator(data, args.rows).run()
+        results = BackendParity(data).run(args.engines)
+
+    print(f"\n{'报表':<16}{'后端':<10}{'行数':>10}{'耗时(秒)':>10}  结果")
+    for r in results:
+        status = "-" if r['engine'] == "pandas" else ("一致" if r['error'] is None else "不一致")
+        print(f"{r['report']:<16}{r['engine']:<10}{r['rows']:>10}{r['seconds']:>10.3f}  {status}")
+
+    failed = [r for r in results if r['error'] is not None]
+    for r in failed:
+        print(f"\n{r['report']} ({r['engine']}):\n{r['error']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dataprocess.ColumnSchema import ColumnSchema
+
+
+def schema(strict: bool = False) -> ColumnSchema:
+    return ColumnSchema({
+        "strict": strict,
+        "columns": {
+            "车签": "string",
+            "车型": "category",
+            "未达成量": "int32",
+            "达成率(%)": "percent",
+            "最晚发车时间": {"type": "datetime", "format": "mixed"},
+        },
+    })
+
+
+def test_non_strict_coerces_bad_values_to_null_and_warns(caplog):
+    df = pd.DataFrame({"未达成量": ["1", "x", "3.5", None], "最晚发车时间": ["2025-11-19 08:00:00", "不是时间", None, "2025/11/19"]})
+
+    with caplog.at_level(logging.WARNING, logger="TaotianReport"):
+        result = schema().apply(df, "明细.xlsx")
+
+    assert result["未达成量"].dtype == "Int32"
+    assert result["未达成量"].tolist()[0] == 1
+    assert result["未达成量"].isna().tolist() == [False, True, True, True]
+    assert pd.api.types.is_datetime64_any_dtype(result["最晚发车时间"])
+    assert result["最晚发车时间"].isna().tolist() == [False, True, True, False]
+    assert "未达成量" in caplog.text and "最晚发车时间" in caplog.text
+
+
+def test_strict_raises_on_bad_values():
+    df = pd.DataFrame({"未达成量": ["1", "x"]})
+    with pytest.raises(ValueError, match="无法转换"):
+        schema(strict=True).apply(df)
+
+
+def test_valid_int_column_stays_numpy_int32():
+    result = schema().apply(pd.DataFrame({"未达成量": [1.0, 2.0]}))
+    assert result["未达成量"].dtype == np.int32
+
+
+def test_int32_out_of_range_is_null():
+    result = schema().apply(pd.DataFrame({"未达成量": [1, 2**31]}))
+    assert result["未达成量"].isna().tolist() == [False, True]
+
+
+def test_percent_text_keeps_scale():
+    result = schema().apply(pd.DataFrame({"达成率(%)": ["95.5%", " 80% ", 70]}))
+    assert result["达成率(%)"].tolist() == [95.5, 80.0, 70.0]
+
+
+def test_string_from_float_drops_trailing_zero():
+    result = schema().apply(pd.DataFrame({"车签": [123.0, np.nan, 4.5]}))
+    assert result["车签"].tolist()[0] == "123"
+    assert pd.isna(result["车签"].iloc[1])
+    assert result["车签"].iloc[2] == "4.5"
+
+
+def test_undeclared_columns_and_input_are_untouched():
+    df = pd.DataFrame({"车型": ["9.6米", "17.5米"], "其他": ["1", "2"]})
+
+    result = schema().apply(df)
+
+    assert isinstance(result["车型"].dtype, pd.CategoricalDtype)
+    assert result["其他"].dtype == df["其他"].dtype
+    assert not isinstance(df["车型"].dtype, pd.CategoricalDtype)
+
+
+def test_unknown_type_raises():
+    with pytest.raises(ValueError, match="不受支持"):
+        ColumnSchema({"columns": {"车签": "uuid"}})
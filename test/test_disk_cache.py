@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from pathlib import Path
+
+from src.dataprocess.DiskCache import DiskCache
+
+
+PARSE: dict = {"dtype": {"车签": "str"}, "engine": "calamine"}
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "线路罚款.csv"
+    path.write_text("车签,线路名称\n001,A\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    return pd.DataFrame({"车签": ["001"], "线路名称": ["A"]})
+
+
+def test_same_request_hits(config, source, frame):
+    cache = DiskCache()
+    cache.save(source, frame, ["线路名称", "车签"], None, {}, PARSE)
+
+    cached = DiskCache().load(source, ["线路名称", "车签"], None, {}, PARSE)
+
+    pd.testing.assert_frame_equal(cached, frame)
+    assert not list(cache.dir_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("parse", [
+    {**PARSE, "dtype": {}},
+    {**PARSE, "engine": "openpyxl"},
+])
+def test_changed_parse_settings_miss(config, source, frame, parse):
+    DiskCache().save(source, frame, ["线路名称", "车签"], None, {}, PARSE)
+
+    assert DiskCache().load(source, ["线路名称", "车签"], None, {}, parse) is None
+
+
+def test_changed_file_misses(config, source, frame):
+    DiskCache().save(source, frame, ["线路名称", "车签"], None, {}, PARSE)
+
+    source.write_text("车签,线路名称\n002,B\n", encoding="utf-8")
+
+    assert DiskCache().load(source, ["线路名称", "车签"], None, {}, PARSE) is None
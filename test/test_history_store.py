@@ -0,0 +1,88 @@
+import pandas as pd
+
+from pathlib import Path
+
+from src.dataprocess.HistoryStore import HistoryStore
+from src.dataprocess.SourceStore import SourceStore
+from src.main_process import MainProcess
+
+
+def frames() -> dict[str, pd.DataFrame]:
+    return {"gpt": pd.DataFrame({"城市线路名称": ["A"], "影响量": [1]}), "dispatch": pd.DataFrame({"延误量": [26]})}
+
+
+def test_stamp_is_recorded_with_the_partitions(tmp_path: Path):
+    history = HistoryStore(tmp_path / ".history")
+
+    history.save("2025-11-19", frames(), "s1")
+
+    assert history.has("2025-11-19", ["gpt", "dispatch"])
+    assert history.stamp("2025-11-19") == "s1"
+    assert history.stamp("2025-11-20") is None
+    pd.testing.assert_frame_equal(history.read_partition("dispatch", "2025-11-19"), frames()["dispatch"])
+
+
+def test_rerun_replaces_partitions_and_stamp(tmp_path: Path):
+    history = HistoryStore(tmp_path / ".history")
+    history.save("2025-11-19", frames(), "s1")
+
+    corrected = {**frames(), "dispatch": pd.DataFrame({"延误量": [260]})}
+    history.save("2025-11-19", corrected, "s2")
+
+    assert history.stamp("2025-11-19") == "s2"
+    assert history.read_partition("dispatch", "2025-11-19")["延误量"].tolist() == [260]
+
+
+def test_save_without_stamp_keeps_the_report_stamp(tmp_path: Path):
+    history = HistoryStore(tmp_path / ".history")
+    history.save("2025-11-19", frames(), "s1")
+
+    history.save("2025-11-19", {"source-派签": pd.DataFrame({"延误量": [1]})})
+
+    assert history.stamp("2025-11-19") == "s1"
+    assert "source-派签" in history.tables()
+
+
+def test_failed_table_drops_the_stamp(tmp_path: Path):
+    history = HistoryStore(tmp_path / ".history")
+    history.save("2025-11-19", frames(), "s1")
+
+    # 列名不是字符串, Parquet 写入失败
+    history.save("2025-11-19", {**frames(), "bad": pd.DataFrame({1: [object()]})}, "s2")
+
+    assert history.stamp("2025-11-19") is None
+
+
+def test_input_stamp_follows_file_content_and_config(config, tmp_path: Path, monkeypatch):
+    path = tmp_path / "淘天平台线路时效分析-派签.csv"
+    path.write_text("延误量\n26\n", encoding="utf-8")
+    report_path = {"dispatch": [path]}
+    process = MainProcess()
+    store = SourceStore()
+
+    stamp = process.input_stamp(report_path, store)
+    assert process.input_stamp(report_path, store) == stamp
+
+    path.write_text("延误量\n260\n", encoding="utf-8")
+    changed = process.input_stamp(report_path, store)
+    assert changed != stamp
+
+    monkeypatch.setitem(config.top_n, "dispatch", 3)
+    assert process.input_stamp(report_path, store) != changed
+
+
+def test_dated_exports_of_one_source_share_a_table(config, tmp_path: Path):
+    history = HistoryStore(tmp_path / ".history")
+    store = SourceStore()
+    for date, name, value in (("2025-10-18", "10-18线路罚款.csv", "A"), ("2025-10-19", "10-19线路罚款.csv", "B")):
+        path = tmp_path / name
+        path.write_text(f"线路名称,电子车签\n{value},001\n", encoding="utf-8")
+        store.declare([path], {"线路罚款": {"columns": ["线路名称", "电子车签"]}})
+        store.read(path, ["线路名称", "电子车签"])
+
+        history.save(date, {f"source-{table}": df for table, df in store.snapshot([path]).items()})
+        store.release([path])
+
+    assert history.tables() == ["source-线路罚款"]
+    assert history.read_partition("source-线路罚款", "2025-10-18")["线路名称"].tolist() == ["A"]
+    assert history.read_partition("source-线路罚款", "2025-10-19")["线路名称"].tolist() == ["B"]
@@ -0,0 +1,66 @@
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dataprocess.LookupIndex import LookupIndex
+
+
+def reference() -> pd.DataFrame:
+    return pd.DataFrame({"电子车签": ["A", "B", "A", None], "线路名称": ["甲", "乙", "丙", "丁"]})
+
+
+def test_first_keeps_first_duplicate_and_warns(caplog):
+    with caplog.at_level(logging.WARNING, logger="TaotianReport"):
+        index = LookupIndex(reference(), "电子车签", "线路罚款", duplicates="first")
+
+    assert len(index) == 2
+    assert "重复" in caplog.text
+    result = index.lookup(pd.Series(["A", "B"]), ["线路名称"])
+    assert result["线路名称"].tolist() == ["甲", "乙"]
+
+
+def test_error_raises_on_duplicate():
+    with pytest.raises(ValueError, match="重复"):
+        LookupIndex(reference(), "电子车签", duplicates="error")
+
+
+def test_unknown_policy_raises():
+    with pytest.raises(ValueError, match="不支持"):
+        LookupIndex(reference(), "电子车签", duplicates="last")
+
+
+def test_unique_keys_do_not_warn(caplog):
+    table = reference().iloc[:2]
+    with caplog.at_level(logging.WARNING, logger="TaotianReport"):
+        LookupIndex(table, "电子车签", duplicates="error")
+    assert caplog.text == ""
+
+
+def test_missing_and_null_keys_do_not_match():
+    index = LookupIndex(reference(), "电子车签", duplicates="first")
+
+    assert index.positions(pd.Series(["B", "Z", None])).tolist() == [1, -1, -1]
+    codes = pd.Series(pd.Categorical(["Z", None, "A"], categories=["A", "Z"]))
+    assert index.positions(codes).tolist() == [-1, -1, 0]
+
+
+def test_join_keeps_row_count_and_order():
+    index = LookupIndex(reference(), "电子车签", duplicates="first")
+    details = pd.DataFrame({"电子车签": ["B", "A", "A", "C"], "量": [1, 2, 3, 4]}, index=[10, 11, 12, 13])
+
+    joined = index.join(details, "电子车签")
+
+    assert joined["量"].tolist() == [1, 2, 3, 4]
+    assert joined["线路名称"].tolist()[:3] == ["乙", "甲", "甲"]
+    assert pd.isna(joined["线路名称"].iloc[3])
+
+
+def test_take_promotes_int_columns_with_misses_to_float():
+    table = pd.DataFrame({"k": ["a", "b"], "v": np.array([1, 2], dtype="int64")})
+    index = LookupIndex(table, "k")
+
+    result = index.lookup(pd.Series(["b", "x"]), ["v"])
+
+    assert result["v"].dtype == np.float64
+    assert result["v"].iloc[0] == 2 and np.isnan(result["v"].iloc[1])
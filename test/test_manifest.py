@@ -0,0 +1,49 @@
+import os
+
+from pathlib import Path
+
+from src.dataprocess.Manifest import Manifest
+
+
+def write(path: Path, text: str) -> Path:
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_change_detection(tmp_path: Path):
+    a = write(tmp_path / "派签.csv", "a")
+    b = write(tmp_path / "交件.csv", "b")
+    manifest = Manifest(tmp_path / ".manifest.json")
+
+    first = manifest.update([a, b])
+    assert len(first["new"]) == 2 and not first["changed"] and not first["missing"]
+
+    assert not any(Manifest(tmp_path / ".manifest.json").update([a, b]).values())
+
+    write(a, "a2")
+    changes = Manifest(tmp_path / ".manifest.json").update([a, b])
+    assert [Path(p).name for p in changes["changed"]] == ["派签.csv"]
+
+    changes = Manifest(tmp_path / ".manifest.json").update([a])
+    assert [Path(p).name for p in changes["missing"]] == ["交件.csv"]
+
+
+def test_touch_without_content_change_is_not_a_change(tmp_path: Path):
+    a = write(tmp_path / "派签.csv", "a")
+    Manifest(tmp_path / ".manifest.json").update([a])
+
+    stat = a.stat()
+    os.utime(a, (stat.st_atime + 100, stat.st_mtime + 100))
+    manifest = Manifest(tmp_path / ".manifest.json")
+
+    assert not any(manifest.update([a]).values())
+    assert manifest.entries[str(a.resolve())].mtime == stat.st_mtime + 100
+
+
+def test_corrupt_manifest_counts_as_first_run(tmp_path: Path):
+    a = write(tmp_path / "派签.csv", "a")
+    write(tmp_path / ".manifest.json", "{")
+
+    changes = Manifest(tmp_path / ".manifest.json").update([a])
+
+    assert [Path(p).name for p in changes["new"]] == ["派签.csv"]
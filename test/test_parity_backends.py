@@ -0,0 +1,52 @@
+import importlib.util
+import pandas as pd
+import pytest
+
+from typing import Any, Iterator
+
+from config.config import Config
+from src.main_process import MainProcess
+from test.gen_data import DataGenerator
+from test.parity_backends import BackendParity
+
+
+REPORTS: list[str] = ["gpt", *MainProcess.REPORTS]
+ENGINES: list[str] = ["duckdb", "polars"]
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory: pytest.TempPathFactory) -> Iterator[dict[str, tuple[Any, Any, pd.DataFrame]]]:
+    """生成一份小数据集, 读取各报表的输入并用 pandas 制作基准结果
+
+    交件/派签每条线路 8 个网点, 覆盖 TopN 的选择.
+
+    Yields:
+        dict[str, tuple[Any, Any, pd.DataFrame]]: 报表名称对应的报表实例、data_read 的结果与 pandas 的结果
+    """
+
+    tmp = tmp_path_factory.mktemp("parity")
+    with pytest.MonkeyPatch.context() as mp:
+        config = Config.instance()
+        mp.setattr(config, "datapath", str(tmp / "data"))
+        mp.setitem(config.backend, "temp_directory", str(tmp / ".duckdb"))
+
+        DataGenerator(tmp / "data", 2000, outlets=8).run()
+        parity = BackendParity(tmp / "data")
+        result = dict()
+        for name, report, df_list in parity.inputs():
+            expected, _ = parity.produce(report, df_list, "pandas")
+            result[name] = (report, df_list, expected)
+        yield result
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", REPORTS)
+def test_backend_matches_pandas(inputs, name: str, engine: str):
+    if importlib.util.find_spec(engine) is None:
+        pytest.skip(f"未安装 {engine}")
+
+    report, df_list, expected = inputs[name]
+    actual, _ = BackendParity.produce(report, df_list, engine)
+
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
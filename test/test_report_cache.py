@@ -0,0 +1,129 @@
+import pandas as pd
+import pytest
+
+from pathlib import Path
+
+from src.dataprocess.ReportCache import ReportCache
+
+
+class Report():
+    """只声明配置项的报表, 供缓存测试使用"""
+
+    value: int = 5
+
+    @classmethod
+    def settings(cls) -> dict[str, object]:
+        return {"top_n": cls.value}
+
+
+class Producer():
+    """记录调用次数的报表制作函数"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.calls = 0
+
+    def __call__(self) -> pd.DataFrame:
+        self.calls += 1
+        return self.df
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "淘天平台线路时效分析-派签.csv"
+    path.write_text("延误量\n26\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def report() -> pd.DataFrame:
+    return pd.DataFrame({
+        "城市线路名称": pd.Categorical(["B", "A"], categories=["B", "A"]),
+        "Top5网点延误量总计": pd.array([26, None], dtype="Int32"),
+        "责任网点": pd.array(["网点0", None], dtype="string"),
+    })
+
+
+def test_second_run_hits_and_round_trips_dtypes(config, source, report, caplog):
+    produce = Producer(report)
+
+    ReportCache().run("dispatch", Report, [source], produce)
+    with caplog.at_level("INFO", logger="TaotianReport"):
+        cached = ReportCache().run("dispatch", Report, [source], produce)
+
+    assert produce.calls == 1
+    assert "报表缓存命中: dispatch" in caplog.text
+    pd.testing.assert_frame_equal(cached, report)
+
+
+def test_changed_file_misses(config, source, report):
+    produce = Producer(report)
+    ReportCache().run("dispatch", Report, [source], produce)
+
+    source.write_text("延误量\n260\n", encoding="utf-8")
+    ReportCache().run("dispatch", Report, [source], produce)
+
+    assert produce.calls == 2
+
+
+def test_changed_settings_and_shared_config_miss(config, source, report, monkeypatch):
+    produce = Producer(report)
+    ReportCache().run("dispatch", Report, [source], produce)
+
+    monkeypatch.setattr(Report, "value", 3)
+    ReportCache().run("dispatch", Report, [source], produce)
+    assert produce.calls == 2
+
+    monkeypatch.setitem(config.backend, "engine", "duckdb")
+    ReportCache().run("dispatch", Report, [source], produce)
+    assert produce.calls == 3
+
+
+def test_changed_gpt_frame_misses(config, source, report):
+    produce = Producer(report)
+    gpt = pd.DataFrame({"城市线路名称": ["A"], "影响量": [1]})
+    ReportCache().run("dispatch", Report, [source], produce, gpt)
+    ReportCache().run("dispatch", Report, [source], produce, gpt.copy())
+    assert produce.calls == 1
+
+    ReportCache().run("dispatch", Report, [source], produce, gpt.assign(影响量=2))
+    assert produce.calls == 2
+
+
+def test_changed_dependency_code_misses(config, source, report, monkeypatch):
+    produce = Producer(report)
+    ReportCache().run("dispatch", Report, [source], produce)
+
+    # 模拟修改了 src/dataprocess 下的模块(如 TopN.py)
+    digests = {key: f"{value}-changed" if key.endswith("TopN.py") else value for key, value in ReportCache._sources.items()}
+    monkeypatch.setattr(ReportCache, "_sources", digests)
+    ReportCache().run("dispatch", Report, [source], produce)
+
+    assert produce.calls == 2
+
+
+def test_disabled_cache_always_produces(config, source, report, monkeypatch):
+    monkeypatch.setitem(config.memo, "enabled", False)
+    produce = Producer(report)
+
+    ReportCache().run("dispatch", Report, [source], produce)
+    ReportCache().run("dispatch", Report, [source], produce)
+
+    assert produce.calls == 2
+
+
+def test_evict_removes_least_recently_used_entries(config, source, report, monkeypatch):
+    cache = ReportCache()
+    for value in (1, 2, 3):
+        monkeypatch.setattr(Report, "value", value)
+        cache.run("dispatch", Report, [source], Producer(report))
+    assert len(list(cache.dir_path.glob("*.parquet"))) == 3
+
+    size = max(p.stat().st_size for p in cache.dir_path.glob("*.parquet"))
+    monkeypatch.setitem(config.memo, "max_size_mb", 1.5 * size / 1024 / 1024)
+    cache.evict()
+
+    assert len(list(cache.dir_path.glob("*.parquet"))) == 1
+    produce = Producer(report)
+    cache.run("dispatch", Report, [source], produce)
+    assert produce.calls == 0
@@ -0,0 +1,52 @@
+import threading
+import pytest
+
+from src.scheduler import Scheduler, Stage, StageError
+
+
+def test_dependency_results_are_passed_by_name():
+    stages = [
+        Stage("gpt", lambda: 2),
+        Stage("routing", lambda gpt: gpt * 10, deps=["gpt"]),
+        Stage("dispatch", lambda gpt: gpt + 1, deps=["gpt"]),
+        Stage("total", lambda routing, dispatch: routing + dispatch, deps=["routing", "dispatch"]),
+    ]
+
+    scheduler = Scheduler(stages, workers=2)
+    results = scheduler.run()
+
+    assert results == {"gpt": 2, "routing": 20, "dispatch": 3, "total": 23}
+    assert set(scheduler.timings) == set(results)
+
+
+def test_failure_raises_stage_error_and_skips_dependents():
+    ran = threading.Event()
+
+    def fail():
+        raise KeyError("派签")
+
+    stages = [
+        Stage("gpt", fail),
+        Stage("dispatch", lambda gpt: ran.set(), deps=["gpt"]),
+    ]
+
+    with pytest.raises(StageError) as info:
+        Scheduler(stages, workers=2).run()
+
+    assert info.value.stage == "gpt"
+    assert isinstance(info.value.error, KeyError)
+    assert isinstance(info.value.__cause__, KeyError)
+    assert not ran.is_set()
+
+
+def test_cycle_is_rejected():
+    stages = [Stage("a", lambda b: b, deps=["b"]), Stage("b", lambda a: a, deps=["a"])]
+    with pytest.raises(ValueError, match="循环依赖"):
+        Scheduler(stages, workers=1)
+
+
+def test_missing_dependency_and_duplicate_names_are_rejected():
+    with pytest.raises(ValueError, match="不存在"):
+        Scheduler([Stage("a", lambda gpt: gpt, deps=["gpt"])], workers=1)
+    with pytest.raises(ValueError, match="重复"):
+        Scheduler([Stage("a", lambda: 1), Stage("a", lambda: 2)], workers=1)
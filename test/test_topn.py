@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dataprocess.TopN import TopN
+
+
+def reference(keys: pd.Series, values: pd.Series, n: int) -> np.ndarray:
+    """逐条线路排序取前 N 行的朴素实现, 延误量相同时靠前的行优先, 空值视为最小"""
+
+    frame = pd.DataFrame({"key": keys.to_numpy(), "value": values.astype("float64").fillna(-np.inf).to_numpy()})
+    frame["pos"] = np.arange(len(frame))
+    frame = frame.loc[frame["key"].notna()]
+    ranked = frame.sort_values(["value", "pos"], ascending=[False, True], kind="stable").groupby("key").head(n)
+    mask = np.zeros(len(keys), dtype=bool)
+    mask[ranked["pos"].to_numpy()] = True
+    return mask
+
+
+def test_ties_keep_earlier_rows():
+    keys = pd.Series(["A"] * 5)
+    values = pd.Series([3, 5, 3, 3, 1])
+
+    assert TopN(3).select(keys, values).tolist() == [True, True, True, False, False]
+
+
+def test_null_values_rank_last_and_null_routes_are_dropped():
+    keys = pd.Series(["A", "A", "A", None, "B"])
+    values = pd.Series([None, 2, 1, 9, None], dtype="Int32")
+
+    assert TopN(2).select(keys, values).tolist() == [False, True, True, False, True]
+
+
+def test_small_routes_are_kept_whole():
+    keys = pd.Series(pd.Categorical(["A", "B", "B"], categories=["A", "B", "C"]))
+    values = pd.Series([1, 2, 3])
+
+    assert TopN(2).select(keys, values).all()
+
+
+@pytest.mark.parametrize("categorical", [True, False])
+def test_matches_reference_on_random_data(categorical: bool):
+    rng = np.random.default_rng(0)
+    keys = pd.Series(rng.integers(0, 40, 2000).astype(str)).where(rng.random(2000) > 0.02)
+    if categorical:
+        keys = keys.astype("category")
+    values = pd.Series(rng.integers(0, 6, 2000), dtype="Int32").mask(rng.random(2000) < 0.05)
+
+    assert (TopN(5).select(keys, values) == reference(keys, values, 5)).all()
+
+
+def test_apply_inserts_route_total_as_second_column():
+    details = pd.DataFrame({
+        "城市线路名称": ["B", "A", "B", "A", "B"],
+        "责任网点": ["b1", "a1", "b2", "a2", "b3"],
+        "延误量": [1, 4, 3, 2, 3],
+    })
+
+    top = TopN(2).apply(details)
+
+    assert list(top.columns) == ["城市线路名称", "Top2网点延误量总计", "责任网点", "延误量"]
+    assert top["责任网点"].tolist() == ["a1", "a2", "b2", "b3"]
+    assert top["Top2网点延误量总计"].tolist() == [6, 6, 6, 6]
+
+
+@pytest.mark.parametrize("n", [0, -1, 2.5, "5"])
+def test_invalid_n_raises(n):
+    with pytest.raises(ValueError):
+        TopN(n)